@@ -0,0 +1,65 @@
+#include "creditcard.h"
+
+/**
+ * @file batch_stats_json.c
+ * @brief Implementation of the function to write the statistics of a batch run as JSON.
+ */
+
+/**
+ * @brief Names of the batch stages, as written in the JSON, indexed by batch_stage.
+ */
+static const char *stage_names[STAGE_COUNT] = {"trim", "length", "luhn", "issuer", "output"};
+
+/**
+ * @brief Writes the statistics of a batch run as one JSON object.
+ *
+ * The object holds the totals, the elapsed time and rate, a count per rejection
+ * reason (keyed by card_reason_name(), "OK" counting valid cards) and per network
+ * (keyed by card_network_name()), and, when the batch was timed, the nanoseconds
+ * spent in each stage in total and per card.
+ *
+ * @param stats The statistics filled in by validate_batch() or validate_parallel().
+ * @param out The stream to write the JSON to.
+ * @return 0 on success, 1 if writing failed.
+ */
+int batch_stats_write_json(const batch_stats *stats, FILE *out)
+{
+    double rate = stats->seconds > 0 ? stats->total / stats->seconds : 0;
+
+    fprintf(out, "{\n  \"total\": %llu,\n  \"valid\": %llu,\n  \"invalid\": %llu,\n", stats->total, stats->valid,
+            stats->total - stats->valid);
+    fprintf(out, "  \"seconds\": %.6f,\n  \"numbers_per_second\": %.0f,\n", stats->seconds, rate);
+
+    fprintf(out, "  \"reasons\": {");
+    for (int i = 0; i < REASON_COUNT; i++)
+    {
+        fprintf(out, "%s\"%s\": %llu", i > 0 ? ", " : "", card_reason_name((card_reason) i), stats->reasons[i]);
+    }
+
+    fprintf(out, "},\n  \"networks\": {");
+    for (int i = 0; i < CARD_NETWORK_COUNT; i++)
+    {
+        fprintf(out, "%s\"%s\": %llu", i > 0 ? ", " : "", card_network_name((card_network) i), stats->networks[i]);
+    }
+    fprintf(out, "}");
+
+    if (stats->timing)
+    {
+        unsigned long long cards = stats->total > 0 ? stats->total : 1;
+
+        fprintf(out, ",\n  \"stage_ns\": {");
+        for (int i = 0; i < STAGE_COUNT; i++)
+        {
+            fprintf(out, "%s\"%s\": %llu", i > 0 ? ", " : "", stage_names[i], stats->stage_ns[i]);
+        }
+        fprintf(out, "},\n  \"stage_ns_per_card\": {");
+        for (int i = 0; i < STAGE_COUNT; i++)
+        {
+            fprintf(out, "%s\"%s\": %.1f", i > 0 ? ", " : "", stage_names[i], (double) stats->stage_ns[i] / cards);
+        }
+        fprintf(out, "}");
+    }
+    fprintf(out, "\n}\n");
+
+    return ferror(out) ? 1 : 0;
+}
@@ -0,0 +1,199 @@
+#include "creditcard.h"
+
+#include <stdlib.h>
+#include <string.h>
+
+/**
+ * @file bin_table.c
+ * @brief Implementation of the issuer (BIN/IIN) prefix trie.
+ */
+
+/**
+ * @brief Appends an empty node to the trie.
+ *
+ * @param table The trie.
+ * @return The index of the new node, or -1 if memory could not be allocated.
+ */
+static int new_node(bin_table *table)
+{
+    if (table->count == table->capacity)
+    {
+        int capacity = table->capacity ? table->capacity * 2 : 1024;
+        bin_node *nodes = realloc(table->nodes, (size_t) capacity * sizeof(bin_node));
+        if (nodes == NULL)
+        {
+            return -1;
+        }
+        table->nodes = nodes;
+        table->capacity = capacity;
+    }
+
+    memset(&table->nodes[table->count], 0, sizeof(bin_node));
+    return table->count++;
+}
+
+/**
+ * @brief Initializes an empty trie holding only the root node.
+ *
+ * @param table The trie to initialize.
+ * @return 0 on success, 1 if memory could not be allocated.
+ */
+int bin_table_init(bin_table *table)
+{
+    table->nodes = NULL;
+    table->count = 0;
+    table->capacity = 0;
+
+    return new_node(table) < 0 ? 1 : 0;
+}
+
+/**
+ * @brief Releases the memory held by a trie.
+ *
+ * @param table The trie to release.
+ */
+void bin_table_free(bin_table *table)
+{
+    free(table->nodes);
+    table->nodes = NULL;
+    table->count = 0;
+    table->capacity = 0;
+}
+
+/**
+ * @brief Checks whether every character of a string is the given character.
+ */
+static int all_of(const char *text, int length, char c)
+{
+    for (int i = 0; i < length; i++)
+    {
+        if (text[i] != c)
+        {
+            return 0;
+        }
+    }
+    return 1;
+}
+
+/**
+ * @brief Marks the subtrees covering [low, high] below a node.
+ *
+ * The range is split into the fewest whole subtrees: a node is marked as soon as
+ * the remaining suffixes of the range cover every digit string below it.
+ * `tight_low` and `tight_high` tell whether the path so far still equals the prefix
+ * of low and high; otherwise that bound no longer restricts the digits below.
+ */
+static int insert_range(bin_table *table, int node, const char *low, const char *high, int depth, int width,
+                        int tight_low, int tight_high, card_network network, unsigned int lengths)
+{
+    int rest = width - depth;
+
+    if ((!tight_low || all_of(low + depth, rest, '0')) && (!tight_high || all_of(high + depth, rest, '9')))
+    {
+        table->nodes[node].network = (unsigned char) network;
+        table->nodes[node].lengths = lengths;
+        return 0;
+    }
+
+    int first = tight_low ? low[depth] - '0' : 0;
+    int last = tight_high ? high[depth] - '0' : 9;
+
+    for (int digit = first; digit <= last; digit++)
+    {
+        int child = table->nodes[node].child[digit];
+        if (child == 0)
+        {
+            child = new_node(table);
+            if (child < 0)
+            {
+                return 1;
+            }
+            table->nodes[node].child[digit] = child;
+        }
+
+        if (insert_range(table, child, low, high, depth + 1, width, tight_low && digit == first,
+                         tight_high && digit == last, network, lengths) != 0)
+        {
+            return 1;
+        }
+    }
+
+    return 0;
+}
+
+/**
+ * @brief Adds an issuer range to the trie.
+ *
+ * Both bounds are digit strings of the same width, so "2221" to "2720" covers
+ * every card number starting with 2221 through 2720. The range is stored as the
+ * fewest trie nodes that cover it, and bin_table_lookup() reports the deepest node
+ * on a card's prefix that has a network and issues the card's length. A longer
+ * prefix therefore wins over a shorter one whatever order the ranges were added
+ * in, even when the shorter one was added later. A range added later only
+ * replaces an earlier one, network and lengths both, on the nodes both of them
+ * mark, that is where they cover the same prefixes at the same depth.
+ *
+ * @param table The trie.
+ * @param low The first prefix of the range.
+ * @param high The last prefix of the range.
+ * @param network The network issuing the range.
+ * @param lengths Bit mask of the card lengths issued in the range (bit n for n digits).
+ * @return 0 on success, 1 if the range is malformed or memory could not be allocated.
+ */
+int bin_table_add_range(bin_table *table, const char *low, const char *high, card_network network, unsigned int lengths)
+{
+    int width = (int) strlen(low);
+
+    if (width == 0 || width > BIN_PREFIX_MAX || (int) strlen(high) != width || strcmp(low, high) > 0)
+    {
+        return 1;
+    }
+    if (network <= CARD_INVALID || network >= CARD_NETWORK_COUNT || lengths == 0)
+    {
+        return 1;
+    }
+    for (int i = 0; i < width; i++)
+    {
+        if (low[i] < '0' || low[i] > '9' || high[i] < '0' || high[i] > '9')
+        {
+            return 1;
+        }
+    }
+
+    return insert_range(table, 0, low, high, 0, width, 1, 1, network, lengths);
+}
+
+/**
+ * @brief Finds the network that issued a card number.
+ *
+ * This function follows the card's digits down the trie, so the cost is bounded by
+ * the depth of the trie rather than the number of ranges. The longest matching
+ * prefix that allows the card's length wins.
+ *
+ * @param table The trie.
+ * @param digits The credit card number as ASCII digits, most significant first.
+ * @param count The number of digits.
+ * @return The issuing network, or CARD_INVALID if no range matches.
+ */
+card_network bin_table_lookup(const bin_table *table, const char *digits, int count)
+{
+    card_network network = CARD_INVALID;
+    int node = 0;
+
+    for (int i = 0; i < count; i++)
+    {
+        node = table->nodes[node].child[digits[i] - '0'];
+        if (node == 0)
+        {
+            break;
+        }
+
+        const bin_node *match = &table->nodes[node];
+        if (match->network != CARD_INVALID && (match->lengths >> count) & 1)
+        {
+            network = (card_network) match->network;
+        }
+    }
+
+    return network;
+}
@@ -0,0 +1,55 @@
+#include "creditcard.h"
+
+/**
+ * @file bin_table_defaults.c
+ * @brief Implementation of the function to load the built-in issuer ranges.
+ */
+
+/**
+ * @brief Built-in issuer ranges: low prefix, high prefix, network and card lengths.
+ */
+static const struct
+{
+    const char *low;
+    const char *high;
+    card_network network;
+    unsigned int lengths;
+} default_ranges[] = {
+    {"34", "34", CARD_AMEX, 1u << 15},
+    {"37", "37", CARD_AMEX, 1u << 15},
+    {"4", "4", CARD_VISA, 1u << 13 | 1u << 16 | 1u << 19},
+    {"51", "55", CARD_MASTERCARD, 1u << 16},
+    {"2221", "2720", CARD_MASTERCARD, 1u << 16},
+    {"6011", "6011", CARD_DISCOVER, 0xfu << 16},
+    {"644", "649", CARD_DISCOVER, 0xfu << 16},
+    {"65", "65", CARD_DISCOVER, 0xfu << 16},
+    {"3528", "3589", CARD_JCB, 0xfu << 16},
+    {"62", "62", CARD_UNIONPAY, 0xfu << 16},
+    {"300", "305", CARD_DINERS, 0x3fu << 14},
+    {"3095", "3095", CARD_DINERS, 0x3fu << 14},
+    {"36", "36", CARD_DINERS, 0x3fu << 14},
+    {"38", "39", CARD_DINERS, 0x3fu << 14},
+};
+
+/**
+ * @brief Adds the built-in issuer ranges to a trie.
+ *
+ * These are used when no binary range file is given. The same ranges are listed in
+ * bin_ranges.txt, which can be edited and compiled with bin_table_compile().
+ *
+ * @param table The trie, initialized with bin_table_init().
+ * @return 0 on success, 1 if memory could not be allocated.
+ */
+int bin_table_load_defaults(bin_table *table)
+{
+    for (size_t i = 0; i < sizeof(default_ranges) / sizeof(default_ranges[0]); i++)
+    {
+        if (bin_table_add_range(table, default_ranges[i].low, default_ranges[i].high, default_ranges[i].network,
+                                default_ranges[i].lengths) != 0)
+        {
+            return 1;
+        }
+    }
+
+    return 0;
+}
@@ -0,0 +1,256 @@
+#include "creditcard.h"
+
+#include <stdlib.h>
+#include <string.h>
+#include <sys/stat.h>
+
+/**
+ * @file bin_table_file.c
+ * @brief Implementation of the functions to compile and load binary issuer range files.
+ *
+ * A binary range file starts with a 12-byte header: the magic "CCBN", the format
+ * version and the number of records, both as little-endian 32-bit integers. Each
+ * 22-byte record holds the prefix width (1 byte), the network (1 byte), the
+ * length mask (4 bytes) and the low and high prefixes (8 bytes each), all
+ * little-endian.
+ */
+
+#define BIN_FILE_MAGIC "CCBN"
+#define BIN_FILE_VERSION 1
+#define BIN_RECORD_SIZE 22
+
+/**
+ * @brief Writes an unsigned integer as `size` little-endian bytes.
+ */
+static void put_le(unsigned char *out, unsigned long long value, int size)
+{
+    for (int i = 0; i < size; i++)
+    {
+        out[i] = (unsigned char) (value >> (8 * i));
+    }
+}
+
+/**
+ * @brief Reads an unsigned integer stored as `size` little-endian bytes.
+ */
+static unsigned long long get_le(const unsigned char *in, int size)
+{
+    unsigned long long value = 0;
+
+    for (int i = size - 1; i >= 0; i--)
+    {
+        value = (value << 8) | in[i];
+    }
+    return value;
+}
+
+/**
+ * @brief Parses a length specification such as "16", "16-19" or "13,16,19" into a bit mask.
+ *
+ * @return The bit mask, or 0 if the specification is malformed.
+ */
+static unsigned int parse_lengths(const char *text)
+{
+    unsigned int lengths = 0;
+
+    while (*text != '\0')
+    {
+        char *end;
+        long first = strtol(text, &end, 10);
+        long last = first;
+
+        if (end == text)
+        {
+            return 0;
+        }
+        if (*end == '-')
+        {
+            text = end + 1;
+            last = strtol(text, &end, 10);
+            if (end == text)
+            {
+                return 0;
+            }
+        }
+        if (first < 1 || last > 31 || first > last)
+        {
+            return 0;
+        }
+        for (long length = first; length <= last; length++)
+        {
+            lengths |= 1u << length;
+        }
+
+        text = end;
+        if (*text == ',')
+        {
+            text++;
+        }
+        else if (*text != '\0')
+        {
+            return 0;
+        }
+    }
+
+    return lengths;
+}
+
+/**
+ * @brief Compiles a text file of issuer ranges into the binary range format.
+ *
+ * Each non-empty line of the text file that does not start with '#' holds the low
+ * prefix, the high prefix, the network name and the card lengths, for example
+ * "2221 2720 MASTERCARD 16" or "6011 6011 DISCOVER 16-19".
+ *
+ * @param text_path The text file to read.
+ * @param binary_path The binary file to write.
+ * On any failure a regular binary file is removed, so a partial file is never
+ * left behind; a device or pipe given as the output is left alone.
+ *
+ * @return 0 on success, or the line number of the first malformed line, or -1 if a file could not be
+ *         opened or written.
+ */
+int bin_table_compile(const char *text_path, const char *binary_path)
+{
+    FILE *in = fopen(text_path, "r");
+    if (in == NULL)
+    {
+        return -1;
+    }
+    FILE *out = fopen(binary_path, "wb");
+    if (out == NULL)
+    {
+        fclose(in);
+        return -1;
+    }
+
+    struct stat info;
+    int regular = fstat(fileno(out), &info) == 0 && S_ISREG(info.st_mode);
+    unsigned char record[BIN_RECORD_SIZE];
+    char line[256];
+    unsigned long records = 0;
+    int line_number = 0;
+    int result = 0;
+
+    // Reserve the header; the record count is filled in once it is known.
+    memset(record, 0, 12);
+    if (fwrite(record, 1, 12, out) != 12)
+    {
+        result = -1;
+    }
+
+    while (result == 0 && fgets(line, sizeof(line), in) != NULL)
+    {
+        char low[32], high[32], name[32], lengths_text[64];
+
+        line_number++;
+        if (line[0] == '#' || strspn(line, " \t\r\n") == strlen(line))
+        {
+            continue;
+        }
+
+        unsigned int lengths = 0;
+        card_network network = CARD_INVALID;
+        int width = 0;
+        if (sscanf(line, "%31s %31s %31s %63s", low, high, name, lengths_text) == 4)
+        {
+            width = (int) strlen(low);
+            network = card_network_from_name(name);
+            lengths = parse_lengths(lengths_text);
+        }
+        if (width == 0 || width > BIN_PREFIX_MAX || (int) strlen(high) != width || strspn(low, "0123456789") != strlen(low) ||
+            strspn(high, "0123456789") != strlen(high) || strcmp(low, high) > 0 || network == CARD_INVALID || lengths == 0)
+        {
+            result = line_number;
+            break;
+        }
+
+        record[0] = (unsigned char) width;
+        record[1] = (unsigned char) network;
+        put_le(record + 2, lengths, 4);
+        put_le(record + 6, strtoull(low, NULL, 10), 8);
+        put_le(record + 14, strtoull(high, NULL, 10), 8);
+        if (fwrite(record, 1, BIN_RECORD_SIZE, out) != BIN_RECORD_SIZE)
+        {
+            result = -1;
+            break;
+        }
+        records++;
+    }
+
+    if (result == 0)
+    {
+        unsigned char header[12];
+        memcpy(header, BIN_FILE_MAGIC, 4);
+        put_le(header + 4, BIN_FILE_VERSION, 4);
+        put_le(header + 8, records, 4);
+        if (fseek(out, 0, SEEK_SET) != 0 || fwrite(header, 1, sizeof(header), out) != sizeof(header))
+        {
+            result = -1;
+        }
+    }
+
+    fclose(in);
+    if (fclose(out) != 0 && result == 0)
+    {
+        result = -1;
+    }
+    if (result != 0 && regular)
+    {
+        remove(binary_path);
+    }
+
+    return result;
+}
+
+/**
+ * @brief Adds every issuer range of a binary range file to a trie.
+ *
+ * @param table The trie, initialized with bin_table_init().
+ * @param path The binary range file written by bin_table_compile().
+ * @return 0 on success, 1 if the file could not be read or is malformed.
+ */
+int bin_table_load(bin_table *table, const char *path)
+{
+    FILE *in = fopen(path, "rb");
+    if (in == NULL)
+    {
+        return 1;
+    }
+
+    unsigned char header[12];
+    if (fread(header, 1, sizeof(header), in) != sizeof(header) || memcmp(header, BIN_FILE_MAGIC, 4) != 0 ||
+        get_le(header + 4, 4) != BIN_FILE_VERSION)
+    {
+        fclose(in);
+        return 1;
+    }
+
+    unsigned long long records = get_le(header + 8, 4);
+    unsigned char record[BIN_RECORD_SIZE];
+    int result = 0;
+
+    for (unsigned long long i = 0; i < records; i++)
+    {
+        char low[BIN_PREFIX_MAX + 1], high[BIN_PREFIX_MAX + 1];
+
+        if (fread(record, 1, BIN_RECORD_SIZE, in) != BIN_RECORD_SIZE || record[0] == 0 || record[0] > BIN_PREFIX_MAX)
+        {
+            result = 1;
+            break;
+        }
+
+        int width = record[0];
+        snprintf(low, sizeof(low), "%0*llu", width, get_le(record + 6, 8));
+        snprintf(high, sizeof(high), "%0*llu", width, get_le(record + 14, 8));
+
+        if (bin_table_add_range(table, low, high, (card_network) record[1], (unsigned int) get_le(record + 2, 4)) != 0)
+        {
+            result = 1;
+            break;
+        }
+    }
+
+    fclose(in);
+    return result;
+}
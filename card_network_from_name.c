@@ -0,0 +1,27 @@
+#include "creditcard.h"
+
+#include <string.h>
+
+/**
+ * @file card_network_from_name.c
+ * @brief Implementation of the function to look up a card network by its printable name.
+ */
+
+/**
+ * @brief Looks up a card network by the name card_network_name() prints for it.
+ *
+ * @param name The network name, such as "VISA".
+ * @return The card network, or CARD_INVALID if the name is unknown.
+ */
+card_network card_network_from_name(const char *name)
+{
+    for (int network = CARD_INVALID + 1; network < CARD_NETWORK_COUNT; network++)
+    {
+        if (strcmp(name, card_network_name((card_network) network)) == 0)
+        {
+            return (card_network) network;
+        }
+    }
+
+    return CARD_INVALID;
+}
@@ -0,0 +1,35 @@
+#include "creditcard.h"
+
+/**
+ * @file card_network_name.c
+ * @brief Implementation of the function to get the printable name of a card network.
+ */
+
+/**
+ * @brief Gets the printable name of a card network.
+ *
+ * @param network The card network.
+ * @return The name printed for the network, such as "VISA", or "INVALID".
+ */
+const char *card_network_name(card_network network)
+{
+    switch (network)
+    {
+        case CARD_AMEX:
+            return "AMEX";
+        case CARD_MASTERCARD:
+            return "MASTERCARD";
+        case CARD_VISA:
+            return "VISA";
+        case CARD_DISCOVER:
+            return "DISCOVER";
+        case CARD_JCB:
+            return "JCB";
+        case CARD_UNIONPAY:
+            return "UNIONPAY";
+        case CARD_DINERS:
+            return "DINERS";
+        default:
+            return "INVALID";
+    }
+}
@@ -0,0 +1,29 @@
+#include "creditcard.h"
+
+/**
+ * @file card_reason_name.c
+ * @brief Implementation of the function to get the printable name of a rejection reason.
+ */
+
+/**
+ * @brief Gets the printable name of a rejection reason.
+ *
+ * @param reason The reason.
+ * @return The name printed for the reason, such as "CHECKSUM", or "OK" for a valid card.
+ */
+const char *card_reason_name(card_reason reason)
+{
+    switch (reason)
+    {
+        case REASON_FORMAT:
+            return "FORMAT";
+        case REASON_LENGTH:
+            return "LENGTH";
+        case REASON_CHECKSUM:
+            return "CHECKSUM";
+        case REASON_ISSUER:
+            return "ISSUER";
+        default:
+            return "OK";
+    }
+}
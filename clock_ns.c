@@ -0,0 +1,21 @@
+#include "creditcard.h"
+
+#include <time.h>
+
+/**
+ * @file clock_ns.c
+ * @brief Implementation of the function to read the monotonic clock in nanoseconds.
+ */
+
+/**
+ * @brief Reads the monotonic clock in nanoseconds.
+ *
+ * @return Nanoseconds since an arbitrary fixed point, for measuring intervals.
+ */
+unsigned long long clock_ns(void)
+{
+    struct timespec now;
+
+    clock_gettime(CLOCK_MONOTONIC, &now);
+    return (unsigned long long) now.tv_sec * 1000000000ULL + (unsigned long long) now.tv_nsec;
+}
@@ -0,0 +1,163 @@
+#include "creditcard.h"
+
+#include <stdlib.h>
+#include <string.h>
+
+/**
+ * @file columnar_writer.c
+ * @brief Implementation of the functions to write batch results as a columnar results file.
+ *
+ * A columnar results file starts with a 64-byte header: the magic "CCRS", the
+ * format version (4 bytes), the number of records (8 bytes), the number of records
+ * per block, the size of a block in bytes and the offsets of the validity, network
+ * and reason columns within a block (4 bytes each), all little-endian, then zeros.
+ * The blocks follow, back to back. In each block, record i of the block is valid
+ * when bit (i % 8) of validity byte i / 8 is set, and its network and rejection
+ * reason are byte i of the network and reason columns. The last block is padded
+ * to full size with zeros, so record n of the file is always found at the same
+ * place and a reader can memory-map the file and use the columns in place.
+ */
+
+#define COLUMNAR_MAGIC "CCRS"
+#define COLUMNAR_VERSION 1
+#define COLUMNAR_HEADER_SIZE 64
+#define COLUMNAR_VALIDITY_OFFSET 0
+#define COLUMNAR_NETWORK_OFFSET (COLUMNAR_BLOCK_RECORDS / 8)
+#define COLUMNAR_REASON_OFFSET (COLUMNAR_NETWORK_OFFSET + COLUMNAR_BLOCK_RECORDS)
+#define COLUMNAR_BLOCK_SIZE (COLUMNAR_REASON_OFFSET + COLUMNAR_BLOCK_RECORDS)
+
+/**
+ * @brief Writes an unsigned integer as `size` little-endian bytes.
+ */
+static void put_le(unsigned char *out, unsigned long long value, int size)
+{
+    for (int i = 0; i < size; i++)
+    {
+        out[i] = (unsigned char) (value >> (8 * i));
+    }
+}
+
+/**
+ * @brief Writes the header for the records written so far at the current position.
+ *
+ * @return 0 on success, 1 if writing failed.
+ */
+static int write_header(columnar_writer *writer)
+{
+    unsigned char header[COLUMNAR_HEADER_SIZE] = {0};
+
+    memcpy(header, COLUMNAR_MAGIC, 4);
+    put_le(header + 4, COLUMNAR_VERSION, 4);
+    put_le(header + 8, writer->count, 8);
+    put_le(header + 16, COLUMNAR_BLOCK_RECORDS, 4);
+    put_le(header + 20, COLUMNAR_BLOCK_SIZE, 4);
+    put_le(header + 24, COLUMNAR_VALIDITY_OFFSET, 4);
+    put_le(header + 28, COLUMNAR_NETWORK_OFFSET, 4);
+    put_le(header + 32, COLUMNAR_REASON_OFFSET, 4);
+
+    return fwrite(header, 1, sizeof(header), writer->out) != sizeof(header);
+}
+
+/**
+ * @brief Writes the block being filled, padded to full size, and starts an empty one.
+ *
+ * @return 0 on success, 1 if writing failed.
+ */
+static int flush_block(columnar_writer *writer)
+{
+    if (fwrite(writer->block, 1, COLUMNAR_BLOCK_SIZE, writer->out) != COLUMNAR_BLOCK_SIZE)
+    {
+        return 1;
+    }
+    memset(writer->block, 0, COLUMNAR_BLOCK_SIZE);
+    writer->used = 0;
+    return 0;
+}
+
+/**
+ * @brief Starts a columnar results file.
+ *
+ * The header is reserved and filled in by columnar_writer_close() once the number
+ * of records is known, so the stream must be seekable: a file, not a pipe. The
+ * file is written from its start.
+ *
+ * @param writer The writer to set up.
+ * @param out The stream to write the file to, opened for writing in binary mode.
+ * @return 0 on success, 1 if the stream cannot be seeked, memory could not be
+ *         allocated or writing failed.
+ */
+int columnar_writer_open(columnar_writer *writer, FILE *out)
+{
+    writer->out = out;
+    writer->used = 0;
+    writer->count = 0;
+    writer->block = NULL;
+
+    if (fseek(out, 0, SEEK_SET) != 0)
+    {
+        return 1;
+    }
+    writer->block = calloc(1, COLUMNAR_BLOCK_SIZE);
+    if (writer->block == NULL)
+    {
+        return 1;
+    }
+    if (write_header(writer) != 0)
+    {
+        free(writer->block);
+        writer->block = NULL;
+        return 1;
+    }
+
+    return 0;
+}
+
+/**
+ * @brief Appends the result for one card number.
+ *
+ * @param writer The writer.
+ * @param network The network of the card, or CARD_INVALID.
+ * @param reason The reason the card was rejected, or REASON_NONE.
+ * @return 0 on success, 1 if writing a full block failed.
+ */
+int columnar_writer_append(columnar_writer *writer, card_network network, card_reason reason)
+{
+    size_t i = writer->used;
+
+    writer->block[COLUMNAR_VALIDITY_OFFSET + i / 8] |= (unsigned char) ((network != CARD_INVALID) << (i % 8));
+    writer->block[COLUMNAR_NETWORK_OFFSET + i] = (unsigned char) network;
+    writer->block[COLUMNAR_REASON_OFFSET + i] = (unsigned char) reason;
+    writer->count++;
+
+    if (++writer->used == COLUMNAR_BLOCK_RECORDS)
+    {
+        return flush_block(writer);
+    }
+    return 0;
+}
+
+/**
+ * @brief Writes the last block and the header, and frees the writer's buffer.
+ *
+ * The stream itself is left open.
+ *
+ * @param writer The writer.
+ * @return 0 on success, 1 if writing failed.
+ */
+int columnar_writer_close(columnar_writer *writer)
+{
+    int failed = 0;
+
+    if (writer->used > 0)
+    {
+        failed = flush_block(writer);
+    }
+    if (!failed)
+    {
+        failed = fseek(writer->out, 0, SEEK_SET) != 0 || write_header(writer) != 0 || fflush(writer->out) != 0;
+    }
+
+    free(writer->block);
+    writer->block = NULL;
+    return failed;
+}
@@ -1,11 +1,149 @@
 #ifndef CREDITCARD_H
 #define CREDITCARD_H
 
+#include <stdio.h>
+
 /**
  * @file creditcard.h
  * @brief Header file for checking credit card validity using Luhn's Algorithm.
  */
 
+/**
+ * @brief Card networks reported by the validator.
+ */
+typedef enum
+{
+    CARD_INVALID = 0,
+    CARD_AMEX,
+    CARD_MASTERCARD,
+    CARD_VISA,
+    CARD_DISCOVER,
+    CARD_JCB,
+    CARD_UNIONPAY,
+    CARD_DINERS,
+    CARD_NETWORK_COUNT
+} card_network;
+
+/**
+ * @brief Why a card number was rejected: the first check it failed.
+ */
+typedef enum
+{
+    REASON_NONE = 0,
+    REASON_FORMAT,
+    REASON_LENGTH,
+    REASON_CHECKSUM,
+    REASON_ISSUER,
+    REASON_COUNT
+} card_reason;
+
+/**
+ * @brief Stages of validating one line, timed when batch_stats.timing is set.
+ */
+typedef enum
+{
+    STAGE_TRIM = 0,
+    STAGE_LENGTH,
+    STAGE_LUHN,
+    STAGE_ISSUER,
+    STAGE_OUTPUT,
+    STAGE_COUNT
+} batch_stage;
+
+/**
+ * @brief Longest issuer prefix (in digits) accepted in a BIN range.
+ */
+#define BIN_PREFIX_MAX 12
+
+/**
+ * @brief A node of the issuer prefix trie.
+ *
+ * `lengths` has bit n set when card numbers of n digits are issued under the prefix.
+ * A child index of 0 means there is no child, since the root is never a child.
+ */
+typedef struct
+{
+    int child[10];
+    unsigned char network;
+    unsigned int lengths;
+} bin_node;
+
+/**
+ * @brief Issuer (BIN/IIN) ranges compiled into a prefix trie.
+ */
+typedef struct
+{
+    bin_node *nodes;
+    int count;
+    int capacity;
+} bin_table;
+
+/**
+ * @brief Counters collected while validating a batch of card numbers.
+ *
+ * `timing` is set by the caller to ask for the time spent in each stage, which
+ * costs a clock read per stage; every other field is filled in by the batch.
+ */
+typedef struct
+{
+    unsigned long long total;
+    unsigned long long valid;
+    double seconds;
+    unsigned long long reasons[REASON_COUNT];
+    unsigned long long networks[CARD_NETWORK_COUNT];
+    int timing;
+    unsigned long long stage_ns[STAGE_COUNT];
+} batch_stats;
+
+/**
+ * @brief Number of records in each block of a columnar results file.
+ */
+#define COLUMNAR_BLOCK_RECORDS 65536
+
+/**
+ * @brief Writes batch results to a columnar results file.
+ *
+ * `block` holds the columns of the block being filled: the validity bits, then a
+ * network byte and a rejection reason byte per record.
+ */
+typedef struct
+{
+    FILE *out;
+    unsigned char *block;
+    size_t used;
+    unsigned long long count;
+} columnar_writer;
+
+/**
+ * @brief The test card numbers generate_cards() should write.
+ *
+ * Either `prefix` is set and `length` gives the number of digits, or `prefix` is
+ * NULL (or empty) and the prefixes and lengths are drawn from the issuer ranges of
+ * `network`, limited to `length` unless it is 0. When `network` is not CARD_INVALID,
+ * every number validates as that network.
+ */
+typedef struct
+{
+    const char *prefix;
+    int length;
+    card_network network;
+    unsigned long long count;
+    unsigned long long seed;
+} card_request;
+
+/**
+ * @brief Shortest and longest card numbers (in digits) accepted by the validator.
+ */
+#define CARD_MIN_LENGTH 12
+#define CARD_MAX_LENGTH 19
+
+/**
+ * @brief Longest line (in characters) accepted by the batch validator.
+ */
+#define CARD_LINE_MAX 64
+
+extern const int luhn_double[10];
+
 long get_card_length(long card);
 int get_count_outcome(int count);
 int amex_first_digit(int count, long card);
@@ -16,4 +154,42 @@ int visa_first_digit(int count, long card);
 int second_to_last(int count, long card);
 int lasts(int count, long card);
 
+card_reason luhn_check_reason(const char *digits, int count);
+card_network validate_card_digits(const bin_table *bins, const char *digits, int count);
+card_network validate_card_reason(const bin_table *bins, const char *digits, int count, card_reason *reason);
+card_network validate_card_number(const bin_table *bins, long long card);
+const char *card_network_name(card_network network);
+const char *card_reason_name(card_reason reason);
+card_network card_network_from_name(const char *name);
+size_t luhn_check_records(const char *records, size_t stride, int length, size_t count, unsigned char *valid);
+size_t luhn_check_records_scalar(const char *records, size_t stride, int length, size_t count, unsigned char *valid);
+int trim_card_line(const char *line, size_t length, const char **digits);
+card_network validate_card_line(const bin_table *bins, const char *line, size_t length);
+card_network validate_card_line_reason(const bin_table *bins, const char *line, size_t length, card_reason *reason);
+card_network validate_card_line_timed(const bin_table *bins, const char *line, size_t length, card_reason *reason,
+                                      unsigned long long *stage_ns);
+size_t validate_card_records(const bin_table *bins, const char *records, size_t width, size_t count,
+                             unsigned char *networks);
+unsigned long long clock_ns(void);
+int validate_batch(const bin_table *bins, FILE *in, FILE *out, batch_stats *stats);
+int validate_parallel(const bin_table *bins, const char *path, FILE *out, int threads, batch_stats *stats);
+int validate_batch_columnar(const bin_table *bins, FILE *in, columnar_writer *columns, batch_stats *stats);
+int validate_parallel_columnar(const bin_table *bins, const char *path, columnar_writer *columns, int threads,
+                               batch_stats *stats);
+int batch_stats_write_json(const batch_stats *stats, FILE *out);
+int columnar_writer_open(columnar_writer *writer, FILE *out);
+int columnar_writer_append(columnar_writer *writer, card_network network, card_reason reason);
+int columnar_writer_close(columnar_writer *writer);
+int luhn_check_digit(const char *digits, int count);
+int generate_cards(const bin_table *bins, const card_request *request, FILE *out, batch_stats *stats);
+int serve_cards(const bin_table *bins, const char *address);
+
+int bin_table_init(bin_table *table);
+void bin_table_free(bin_table *table);
+int bin_table_add_range(bin_table *table, const char *low, const char *high, card_network network, unsigned int lengths);
+card_network bin_table_lookup(const bin_table *table, const char *digits, int count);
+int bin_table_load_defaults(bin_table *table);
+int bin_table_load(bin_table *table, const char *path);
+int bin_table_compile(const char *text_path, const char *binary_path);
+
 #endif
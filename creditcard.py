@@ -0,0 +1,217 @@
+import ctypes
+import os
+import struct
+
+
+class _BinTable(ctypes.Structure):
+    """
+    Mirror of the C `bin_table` struct: the issuer prefix trie.
+    """
+
+    _fields_ = [
+        ("nodes", ctypes.c_void_p),
+        ("count", ctypes.c_int),
+        ("capacity", ctypes.c_int),
+    ]
+
+
+def _load_library():
+    """
+    Load the shared library built from the validator's C sources.
+
+    The library is looked up in the CREDITCARD_LIB environment variable first, then
+    next to this module as libcreditcard.so.
+
+    Returns:
+    - ctypes.CDLL: The loaded library, with argument and result types declared.
+    """
+    path = os.environ.get(
+        "CREDITCARD_LIB",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "libcreditcard.so"),
+    )
+    library = ctypes.CDLL(path)
+
+    table = ctypes.POINTER(_BinTable)
+    library.bin_table_init.argtypes = [table]
+    library.bin_table_init.restype = ctypes.c_int
+    library.bin_table_free.argtypes = [table]
+    library.bin_table_free.restype = None
+    library.bin_table_load.argtypes = [table, ctypes.c_char_p]
+    library.bin_table_load.restype = ctypes.c_int
+    library.bin_table_load_defaults.argtypes = [table]
+    library.bin_table_load_defaults.restype = ctypes.c_int
+    library.card_network_name.argtypes = [ctypes.c_int]
+    library.card_network_name.restype = ctypes.c_char_p
+    library.card_reason_name.argtypes = [ctypes.c_int]
+    library.card_reason_name.restype = ctypes.c_char_p
+    library.validate_card_line.argtypes = [table, ctypes.c_char_p, ctypes.c_size_t]
+    library.validate_card_line.restype = ctypes.c_int
+    library.validate_card_records.argtypes = [
+        table, ctypes.c_void_p, ctypes.c_size_t, ctypes.c_size_t, ctypes.c_void_p
+    ]
+    library.validate_card_records.restype = ctypes.c_size_t
+    return library
+
+
+_library = _load_library()
+
+# Network names indexed by the network codes returned by validate_batch().
+NETWORKS = ("INVALID",)
+while True:
+    _name = _library.card_network_name(len(NETWORKS)).decode()
+    if _name == "INVALID":
+        break
+    NETWORKS += (_name,)
+
+# Rejection reason names indexed by the reason codes in a columnar results file.
+REASONS = ("OK",)
+while True:
+    _name = _library.card_reason_name(len(REASONS)).decode()
+    if _name == "OK":
+        break
+    REASONS += (_name,)
+
+# Header of a columnar results file written by `creditcard_main --batch --columnar FILE`.
+_RESULTS_MAGIC = b"CCRS"
+_RESULTS_VERSION = 1
+_RESULTS_HEADER_SIZE = 64
+
+
+class BinTable:
+    """
+    Issuer (BIN/IIN) ranges used to find the network of a card.
+    """
+
+    def __init__(self, path=None):
+        """
+        Load the issuer ranges.
+
+        Parameters:
+        - path (str): A binary range file compiled with `creditcard_main --compile-bins`,
+          or None for the built-in ranges.
+        """
+        self._table = _BinTable()
+        if _library.bin_table_init(ctypes.byref(self._table)) != 0:
+            raise MemoryError("Could not allocate the issuer table.")
+        if path is None:
+            failed = _library.bin_table_load_defaults(ctypes.byref(self._table))
+        else:
+            failed = _library.bin_table_load(ctypes.byref(self._table), os.fsencode(path))
+        if failed:
+            _library.bin_table_free(ctypes.byref(self._table))
+            raise ValueError(f"Could not load issuer ranges from {path or 'the built-in table'}.")
+
+    def __del__(self):
+        if getattr(self, "_table", None) is not None:
+            _library.bin_table_free(ctypes.byref(self._table))
+            self._table = None
+
+
+_default_bins = None
+
+
+def _bins(bins):
+    """
+    Return the given issuer ranges, or the built-in ones loaded on first use.
+    """
+    global _default_bins
+    if bins is not None:
+        return bins
+    if _default_bins is None:
+        _default_bins = BinTable()
+    return _default_bins
+
+
+def validate(number, bins=None):
+    """
+    Validate one card number.
+
+    Parameters:
+    - number (str): The card number; surrounding whitespace is ignored.
+    - bins (BinTable): The issuer ranges, or None for the built-in ones.
+
+    Returns:
+    - tuple: (valid, network), where network is a name such as "VISA", or "INVALID".
+    """
+    line = number.encode() if isinstance(number, str) else bytes(number)
+    code = _library.validate_card_line(ctypes.byref(_bins(bins)._table), line, len(line))
+    return code != 0, NETWORKS[code]
+
+
+def validate_batch(numbers, bins=None):
+    """
+    Validate a whole array of card numbers in one call into the C validator.
+
+    Parameters:
+    - numbers: A NumPy array of fixed-width byte strings (such as dtype 'S19'), an
+      array of str, a 2-D uint8 matrix with one digit (0-9) per column, or any
+      sequence NumPy can turn into an array of byte strings.
+    - bins (BinTable): The issuer ranges, or None for the built-in ones.
+
+    Returns:
+    - tuple: (valid, networks), a bool array and a uint8 array of network codes
+      (indexes into NETWORKS, 0 when the number is not valid).
+    """
+    import numpy as np
+
+    array = np.asarray(numbers)
+    if array.dtype == np.uint8 and array.ndim == 2:
+        # One digit per column: turn every row into a record of ASCII digits.
+        records = np.ascontiguousarray(array + np.uint8(ord("0")))
+        count, width = records.shape
+        shape = (count,)
+    else:
+        if array.dtype.kind != "S":
+            array = array.astype("S")
+        records = np.ascontiguousarray(array.reshape(-1))
+        count, width = records.shape[0], records.dtype.itemsize
+        shape = array.shape
+
+    networks = np.zeros(count, dtype=np.uint8)
+    if count and width:
+        _library.validate_card_records(
+            ctypes.byref(_bins(bins)._table),
+            records.ctypes.data,
+            width,
+            count,
+            networks.ctypes.data,
+        )
+    networks = networks.reshape(shape)
+    return networks != 0, networks
+
+
+def read_results(path):
+    """
+    Read a columnar results file written by `creditcard_main --batch FILE --columnar RESULTS`.
+
+    The file is memory-mapped, and each column is read straight from the blocks
+    it is stored in, without parsing any text.
+
+    Parameters:
+    - path (str): The columnar results file.
+
+    Returns:
+    - tuple: (valid, networks, reasons), a bool array and uint8 arrays of network
+      codes (indexes into NETWORKS) and rejection reason codes (indexes into REASONS),
+      one entry per input line, in input order.
+    """
+    import numpy as np
+
+    with open(path, "rb") as file:
+        header = file.read(_RESULTS_HEADER_SIZE)
+    if len(header) < _RESULTS_HEADER_SIZE or header[:4] != _RESULTS_MAGIC:
+        raise ValueError(f"{path} is not a columnar results file.")
+    version, count, block_records, block_size, validity, network, reason = struct.unpack_from("<IQIIIII", header, 4)
+    if version != _RESULTS_VERSION:
+        raise ValueError(f"{path} has unsupported format version {version}.")
+
+    blocks = -(-count // block_records)
+    if blocks == 0:
+        return np.zeros(0, dtype=bool), np.zeros(0, dtype=np.uint8), np.zeros(0, dtype=np.uint8)
+    data = np.memmap(path, dtype=np.uint8, mode="r", offset=_RESULTS_HEADER_SIZE, shape=(blocks, block_size))
+
+    bits = np.unpackbits(data[:, validity:validity + block_records // 8], axis=1, bitorder="little")
+    valid = bits.reshape(-1)[:count].astype(bool)
+    networks = data[:, network:network + block_records].reshape(-1)[:count]
+    reasons = data[:, reason:reason + block_records].reshape(-1)[:count]
+    return valid, networks, reasons
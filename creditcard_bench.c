@@ -0,0 +1,446 @@
+#include "creditcard.h"
+
+#include <stdlib.h>
+#include <string.h>
+#include <time.h>
+
+/**
+ * @file creditcard_bench.c
+ * @brief Benchmark and differential test for the card validation hot path.
+ */
+
+/**
+ * @brief Size of one generated card number record: the digits, a newline and padding.
+ */
+#define RECORD_STRIDE 24
+
+/**
+ * @brief Number of mismatches printed before the differential test stays quiet.
+ */
+#define MISMATCHES_SHOWN 10
+
+/**
+ * @brief A generated card number.
+ */
+typedef struct
+{
+    char digits[RECORD_STRIDE];
+    int count;
+    long card;
+} corpus_card;
+
+/**
+ * @brief Issuer prefixes used to generate card numbers, known and unknown to the validator.
+ */
+static const char *corpus_prefixes[] = {"34", "37", "4", "51", "53", "55", "2221", "2720", "6011", "644", "65", "3528",
+                                        "3589", "62", "300", "36", "38", "1", "7", "8", "9", "50", "56", "35", "0"};
+
+/**
+ * @brief Gets the current time of the monotonic clock in nanoseconds.
+ */
+static double now_ns(void)
+{
+    struct timespec now;
+
+    clock_gettime(CLOCK_MONOTONIC, &now);
+    return (double) now.tv_sec * 1e9 + (double) now.tv_nsec;
+}
+
+/**
+ * @brief Returns the next number of a seeded xorshift64* sequence.
+ */
+static unsigned long long next_random(unsigned long long *state)
+{
+    *state ^= *state >> 12;
+    *state ^= *state << 25;
+    *state ^= *state >> 27;
+    return *state * 2685821657736338717ULL;
+}
+
+/**
+ * @brief Prints one line of the benchmark report.
+ */
+static void report(const char *name, double elapsed_ns, size_t count, long long sink)
+{
+    printf("%-28s %8.2f ns/card %14.0f cards/sec  (checksum %lld)\n", name, elapsed_ns / count,
+           count / (elapsed_ns / 1e9), sink);
+}
+
+/**
+ * @brief Textbook Luhn check, kept independent of every function under test.
+ */
+static int naive_luhn(const char *digits, int count)
+{
+    int sum = 0;
+
+    for (int i = 0; i < count; i++)
+    {
+        int digit = digits[count - 1 - i] - '0';
+        if (i % 2 == 1)
+        {
+            digit *= 2;
+            if (digit > 9)
+            {
+                digit -= 9;
+            }
+        }
+        sum += digit;
+    }
+
+    return sum % 10 == 0;
+}
+
+/**
+ * @brief The decision path of the original interactive program, built from the `long` helpers.
+ *
+ * 13-digit numbers that do not start with 4 printed nothing there; they count as
+ * INVALID here.
+ */
+static card_network reference_validate(long card)
+{
+    int count = get_card_length(card);
+
+    // The original get_count_outcome() accepted 13, 15 and 16 digits only.
+    if (count != 13 && count != 15 && count != 16)
+    {
+        return CARD_INVALID;
+    }
+    if ((second_to_last(count, card) + lasts(count, card)) % 10 != 0)
+    {
+        return CARD_INVALID;
+    }
+    if (count == 15)
+    {
+        int first = amex_first_digit(count, card);
+        int second = amex_second_digit(count, card);
+        return first == 3 && (second == 4 || second == 7) ? CARD_AMEX : CARD_INVALID;
+    }
+    if (count == 16)
+    {
+        int first = visa_master_first_digit(count, card);
+        int second = visa_master_second_digit(count, card);
+        if (first == 4)
+        {
+            return CARD_VISA;
+        }
+        return first == 5 && second >= 1 && second <= 5 ? CARD_MASTERCARD : CARD_INVALID;
+    }
+
+    return visa_first_digit(count, card) == 4 ? CARD_VISA : CARD_INVALID;
+}
+
+/**
+ * @brief Generates a reproducible corpus of card numbers.
+ *
+ * Lengths run from CARD_MIN_LENGTH to CARD_MAX_LENGTH and prefixes come from
+ * corpus_prefixes. Every other number gets a correct check digit; the rest get a
+ * wrong one.
+ *
+ * @param cards The corpus to fill.
+ * @param count The number of cards to generate.
+ * @param seed The seed of the random sequence.
+ */
+static void generate_corpus(corpus_card *cards, size_t count, unsigned long long seed)
+{
+    size_t prefixes = sizeof(corpus_prefixes) / sizeof(corpus_prefixes[0]);
+
+    seed = seed ? seed : 1;
+    for (size_t i = 0; i < count; i++)
+    {
+        corpus_card *card = &cards[i];
+        const char *prefix = corpus_prefixes[next_random(&seed) % prefixes];
+        int length = CARD_MIN_LENGTH + (int) (next_random(&seed) % (CARD_MAX_LENGTH - CARD_MIN_LENGTH + 1));
+        int prefix_length = (int) strlen(prefix);
+
+        memcpy(card->digits, prefix, (size_t) prefix_length);
+        for (int j = prefix_length; j < length; j++)
+        {
+            card->digits[j] = (char) ('0' + next_random(&seed) % 10);
+        }
+
+        // Try each check digit until the number passes, then break it for odd cards.
+        for (int check = 0; check < 10; check++)
+        {
+            card->digits[length - 1] = (char) ('0' + check);
+            if (naive_luhn(card->digits, length))
+            {
+                break;
+            }
+        }
+        if (i % 2 == 1)
+        {
+            card->digits[length - 1] = (char) ('0' + (card->digits[length - 1] - '0' + 1 + next_random(&seed) % 9) % 10);
+        }
+
+        card->digits[length] = '\n';
+        card->digits[length + 1] = '\0';
+        card->count = length;
+        card->card = length <= 18 && card->digits[0] != '0' ? strtol(card->digits, NULL, 10) : -1;
+    }
+}
+
+/**
+ * @brief Times every helper and each full validation path over the corpus.
+ */
+static void run_benchmarks(const bin_table *bins, const corpus_card *cards, size_t count)
+{
+    long long sink;
+    double start;
+    size_t legacy = 0;
+    long *numbers = malloc(count * sizeof(long));
+    int *lengths = malloc(count * sizeof(int));
+    char *records = malloc(count * 17);
+    size_t sixteen = 0;
+
+    if (numbers == NULL || lengths == NULL || records == NULL)
+    {
+        free(numbers);
+        free(lengths);
+        free(records);
+        return;
+    }
+
+    // The `long` helpers only handle the lengths the original program accepted.
+    for (size_t i = 0; i < count; i++)
+    {
+        if (cards[i].card >= 0 && (cards[i].count == 13 || cards[i].count == 15 || cards[i].count == 16))
+        {
+            numbers[legacy] = cards[i].card;
+            lengths[legacy] = cards[i].count;
+            legacy++;
+        }
+        if (cards[i].count == 16)
+        {
+            memcpy(records + sixteen * 17, cards[i].digits, 17);
+            sixteen++;
+        }
+    }
+
+    printf("Helpers over %zu cards of 13, 15 and 16 digits:\n", legacy);
+
+#define TIME_HELPER(name, call)                                                                                       \
+    do                                                                                                                 \
+    {                                                                                                                  \
+        sink = 0;                                                                                                      \
+        start = now_ns();                                                                                              \
+        for (size_t i = 0; i < legacy; i++)                                                                            \
+        {                                                                                                              \
+            sink += (call);                                                                                            \
+        }                                                                                                              \
+        report(name, now_ns() - start, legacy, sink);                                                                  \
+    }                                                                                                                  \
+    while (0)
+
+    TIME_HELPER("get_card_length", get_card_length(numbers[i]));
+    TIME_HELPER("get_count_outcome", get_count_outcome(lengths[i]));
+    TIME_HELPER("second_to_last", second_to_last(lengths[i], numbers[i]));
+    TIME_HELPER("lasts", lasts(lengths[i], numbers[i]));
+    TIME_HELPER("amex_first_digit", amex_first_digit(lengths[i], numbers[i]));
+    TIME_HELPER("amex_second_digit", amex_second_digit(lengths[i], numbers[i]));
+    TIME_HELPER("visa_master_first_digit", visa_master_first_digit(lengths[i], numbers[i]));
+    TIME_HELPER("visa_master_second_digit", visa_master_second_digit(lengths[i], numbers[i]));
+    TIME_HELPER("visa_first_digit", visa_first_digit(lengths[i], numbers[i]));
+    TIME_HELPER("original main decision path", reference_validate(numbers[i]));
+    TIME_HELPER("validate_card_number", validate_card_number(bins, numbers[i]));
+
+#undef TIME_HELPER
+
+    printf("\nFull validation over %zu cards of %d to %d digits:\n", count, CARD_MIN_LENGTH, CARD_MAX_LENGTH);
+
+    sink = 0;
+    start = now_ns();
+    for (size_t i = 0; i < count; i++)
+    {
+        sink += validate_card_digits(bins, cards[i].digits, cards[i].count);
+    }
+    report("validate_card_digits", now_ns() - start, count, sink);
+
+    sink = 0;
+    start = now_ns();
+    for (size_t i = 0; i < count; i++)
+    {
+        sink += validate_card_line(bins, cards[i].digits, (size_t) cards[i].count + 1);
+    }
+    report("validate_card_line", now_ns() - start, count, sink);
+
+    sink = 0;
+    start = now_ns();
+    for (size_t i = 0; i < count; i++)
+    {
+        sink += luhn_check_digit(cards[i].digits, cards[i].count - 1);
+    }
+    report("luhn_check_digit", now_ns() - start, count, sink);
+
+    if (sixteen > 0)
+    {
+        unsigned char *valid = malloc(sixteen);
+        if (valid != NULL)
+        {
+            printf("\nLuhn check over %zu records of 16 digits:\n", sixteen);
+
+            start = now_ns();
+            sink = (long long) luhn_check_records_scalar(records, 17, 16, sixteen, valid);
+            report("luhn_check_records_scalar", now_ns() - start, sixteen, sink);
+
+            start = now_ns();
+            sink = (long long) luhn_check_records(records, 17, 16, sixteen, valid);
+            report("luhn_check_records", now_ns() - start, sixteen, sink);
+
+            free(valid);
+        }
+    }
+
+    free(numbers);
+    free(lengths);
+    free(records);
+}
+
+/**
+ * @brief Prints a mismatch found by the differential test, up to MISMATCHES_SHOWN of them.
+ */
+static void mismatch(size_t *mismatches, const corpus_card *card, const char *what, int expected, int actual)
+{
+    if (++*mismatches <= MISMATCHES_SHOWN)
+    {
+        printf("MISMATCH %s: %.*s expected %d, got %d\n", what, card->count, card->digits, expected, actual);
+    }
+}
+
+/**
+ * @brief Checks every fast path against the reference implementations over the corpus.
+ *
+ * - validate_card_digits() must pass exactly the numbers the textbook Luhn check
+ *   passes, for every length, and only report networks for those.
+ * - For 13, 15 and 16 digits it must agree with the original program's decision
+ *   path on every AMEX, VISA and 51-55 MASTERCARD number; any other network it
+ *   reports must be one the original program rejected.
+ * - validate_card_number(), validate_card_line() and luhn_check_records() must agree
+ *   with validate_card_digits() and the textbook Luhn check.
+ * - validate_card_reason() must give a checksum reason exactly to the numbers that
+ *   fail the textbook Luhn check, and validate_card_line_timed() must give the same
+ *   network and reason.
+ * - luhn_check_digit() must give back the last digit of exactly the numbers that
+ *   pass the textbook Luhn check.
+ *
+ * @return The number of mismatches.
+ */
+static size_t run_verify(const bin_table *bins, const corpus_card *cards, size_t count)
+{
+    size_t mismatches = 0;
+    unsigned char valid;
+    unsigned long long stage_ns[STAGE_COUNT] = {0};
+
+    for (size_t i = 0; i < count; i++)
+    {
+        const corpus_card *card = &cards[i];
+        int luhn = naive_luhn(card->digits, card->count);
+        card_network fast = validate_card_digits(bins, card->digits, card->count);
+
+        if (fast != CARD_INVALID && !luhn)
+        {
+            mismatch(&mismatches, card, "validate_card_digits passed a bad checksum", CARD_INVALID, fast);
+        }
+
+        if (card->card >= 0 && (card->count == 13 || card->count == 15 || card->count == 16))
+        {
+            card_network reference = reference_validate(card->card);
+            int legacy_network = fast == CARD_AMEX || fast == CARD_VISA || (fast == CARD_MASTERCARD && card->digits[0] == '5');
+
+            // Networks the original program knew must match; the others must have been rejected by it.
+            if ((reference != CARD_INVALID || legacy_network) && fast != reference)
+            {
+                mismatch(&mismatches, card, "validate_card_digits vs original program", reference, fast);
+            }
+        }
+
+        if (card->card >= 0 && validate_card_number(bins, card->card) != fast)
+        {
+            mismatch(&mismatches, card, "validate_card_number vs validate_card_digits", fast,
+                     validate_card_number(bins, card->card));
+        }
+
+        card_network line = validate_card_line(bins, card->digits, (size_t) card->count + 1);
+        if (line != fast)
+        {
+            mismatch(&mismatches, card, "validate_card_line vs validate_card_digits", fast, line);
+        }
+
+        card_reason reason, timed_reason;
+        card_network with_reason = validate_card_reason(bins, card->digits, card->count, &reason);
+        if (with_reason != fast || (reason == REASON_CHECKSUM) != !luhn || (reason == REASON_NONE) != (fast != CARD_INVALID))
+        {
+            mismatch(&mismatches, card, "validate_card_reason vs validate_card_digits", fast, reason);
+        }
+
+        card_network timed = validate_card_line_timed(bins, card->digits, (size_t) card->count + 1, &timed_reason, stage_ns);
+        if (timed != fast || timed_reason != reason)
+        {
+            mismatch(&mismatches, card, "validate_card_line_timed reason", reason, timed_reason);
+        }
+
+        int check = luhn_check_digit(card->digits, card->count - 1);
+        if ((check == card->digits[card->count - 1] - '0') != luhn)
+        {
+            mismatch(&mismatches, card, "luhn_check_digit vs textbook Luhn", luhn, check);
+        }
+
+        luhn_check_records(card->digits, RECORD_STRIDE, card->count, 1, &valid);
+        if (valid != luhn)
+        {
+            mismatch(&mismatches, card, "luhn_check_records vs textbook Luhn", luhn, valid);
+        }
+    }
+
+    return mismatches;
+}
+
+/**
+ * @brief Benchmarks or verifies the card validation hot path.
+ *
+ * Usage: creditcard_bench [--verify] [COUNT [SEED]]. A reproducible corpus of COUNT
+ * valid and invalid numbers of every length and many networks is generated from
+ * SEED. Without --verify, the report gives the time per card of each helper and
+ * validation path; with --verify, the fast paths are checked against the original
+ * program and a textbook Luhn check instead.
+ *
+ * @return 0 on success, 1 if the differential test found a mismatch.
+ */
+int main(int argc, char *argv[])
+{
+    int verify = argc > 1 && strcmp(argv[1], "--verify") == 0;
+    int first = verify ? 2 : 1;
+    size_t count = argc > first ? strtoull(argv[first], NULL, 10) : (verify ? 10000000 : 2000000);
+    unsigned long long seed = argc > first + 1 ? strtoull(argv[first + 1], NULL, 10) : 1;
+    corpus_card *cards = count > 0 ? malloc(count * sizeof(corpus_card)) : NULL;
+    bin_table bins;
+
+    if (cards == NULL)
+    {
+        fprintf(stderr, "Usage: %s [--verify] [COUNT [SEED]]\n", argv[0]);
+        return 1;
+    }
+    if (bin_table_init(&bins) != 0 || bin_table_load_defaults(&bins) != 0)
+    {
+        fprintf(stderr, "Could not load the built-in issuer ranges\n");
+        free(cards);
+        return 1;
+    }
+
+    generate_corpus(cards, count, seed);
+
+    int result = 0;
+    if (verify)
+    {
+        size_t mismatches = run_verify(&bins, cards, count);
+        printf("%zu cards checked, %zu mismatches\n", count, mismatches);
+        result = mismatches > 0;
+    }
+    else
+    {
+        run_benchmarks(&bins, cards, count);
+    }
+
+    bin_table_free(&bins);
+    free(cards);
+    return result;
+}
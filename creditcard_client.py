@@ -0,0 +1,230 @@
+import argparse
+import collections
+import random
+import socket
+import sys
+import threading
+import time
+
+# Numbers sent before their answers are read; small enough that the requests and
+# answers in flight always fit in the socket buffers, so neither side blocks.
+PIPELINE_WINDOW = 1024
+
+
+def connect(address, timeout=None):
+    """
+    Open a connection to a validator started with `creditcard_main --serve ADDRESS`.
+
+    Parameters:
+    - address (str): "unix:PATH", "tcp:PORT" (localhost) or "tcp:HOST:PORT".
+    - timeout (float): Socket timeout in seconds, or None to block.
+
+    Returns:
+    - socket.socket: The connected socket.
+    """
+    if address.startswith("unix:"):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        sock.connect(address[len("unix:"):])
+        return sock
+    if address.startswith("tcp:"):
+        host, _, port = address[len("tcp:"):].rpartition(":")
+        sock = socket.create_connection((host or "127.0.0.1", int(port)), timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return sock
+    raise ValueError(f"Unknown address '{address}': expected unix:PATH or tcp:[HOST:]PORT.")
+
+
+def _parse(line):
+    """
+    Turn one answer line ("VALID VISA" or "INVALID") into (valid, network).
+    """
+    if not line:
+        raise ConnectionError("The validator closed the connection.")
+    answer = line.decode().strip()
+    if answer.startswith("VALID "):
+        return True, answer[len("VALID "):]
+    return False, "INVALID"
+
+
+class CardClient:
+    """
+    Client for the resident validator, keeping one connection open across requests.
+    """
+
+    def __init__(self, address, timeout=None):
+        """
+        Parameters:
+        - address (str): "unix:PATH", "tcp:PORT" (localhost) or "tcp:HOST:PORT".
+        - timeout (float): Socket timeout in seconds, or None to block.
+        """
+        self.sock = connect(address, timeout)
+        self.reader = self.sock.makefile("rb")
+
+    def close(self):
+        self.reader.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def validate(self, number):
+        """
+        Validate one card number.
+
+        Parameters:
+        - number (str): The card number.
+
+        Returns:
+        - tuple: (valid, network), where network is a name such as "VISA", or "INVALID".
+        """
+        return self.validate_many([number])[0]
+
+    def validate_many(self, numbers):
+        """
+        Validate many card numbers over the connection, pipelining the requests.
+
+        Parameters:
+        - numbers (iterable): The card numbers, as str.
+
+        Returns:
+        - list: A (valid, network) tuple per number, in order.
+        """
+        results = []
+        pending = 0
+        batch = []
+        for number in numbers:
+            batch.append(number)
+            if len(batch) == PIPELINE_WINDOW:
+                self.sock.sendall(("\n".join(batch) + "\n").encode())
+                # Keep one window in flight while the next one is sent.
+                results.extend(_parse(self.reader.readline()) for _ in range(pending))
+                pending = len(batch)
+                batch = []
+        if batch:
+            self.sock.sendall(("\n".join(batch) + "\n").encode())
+        results.extend(_parse(self.reader.readline()) for _ in range(pending + len(batch)))
+        return results
+
+
+def make_test_number(rng, prefix="4", length=16):
+    """
+    Make a random card number with a correct Luhn check digit.
+
+    Parameters:
+    - rng (random.Random): The random generator.
+    - prefix (str): The leading digits.
+    - length (int): The number of digits.
+
+    Returns:
+    - str: The card number.
+    """
+    digits = prefix + "".join(rng.choice("0123456789") for _ in range(length - len(prefix) - 1))
+    total = 0
+    for position, digit in enumerate(reversed(digits)):
+        value = int(digit) * (2 if position % 2 == 0 else 1)
+        total += value - 9 if value > 9 else value
+    return digits + str((10 - total % 10) % 10)
+
+
+def _run_connection(address, requests, batch, depth, numbers, latencies, errors):
+    """
+    Send `requests` requests of `batch` numbers each over one connection, keeping up
+    to `depth` of them in flight, and record the latency of each.
+    """
+    # Requests are built up front and reused, so timing measures the server, not the encoding.
+    payloads = [
+        "".join(numbers[(first * batch + offset) % len(numbers)] + "\n" for offset in range(batch)).encode()
+        for first in range(min(requests, 256))
+    ]
+    try:
+        with CardClient(address) as client:
+            in_flight = collections.deque()
+            sent = 0
+            answered = 0
+            while answered < requests:
+                while sent < requests and len(in_flight) < depth:
+                    in_flight.append(time.perf_counter())
+                    client.sock.sendall(payloads[sent % len(payloads)])
+                    sent += 1
+                for _ in range(batch):
+                    if not client.reader.readline():
+                        raise ConnectionError("The validator closed the connection.")
+                latencies.append(time.perf_counter() - in_flight.popleft())
+                answered += 1
+    except (OSError, ConnectionError) as e:
+        errors.append(e)
+
+
+def _percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main(argv):
+    """
+    Load-test a running validator and report its throughput and latency percentiles.
+
+    Parameters:
+    - argv (list): The command-line arguments, without the program name.
+
+    Returns:
+    - int: The exit status.
+    """
+    parser = argparse.ArgumentParser(description="Load generator for `creditcard_main --serve`.")
+    parser.add_argument("address", help="unix:PATH, tcp:PORT or tcp:HOST:PORT")
+    parser.add_argument("-c", "--connections", type=int, default=4, help="concurrent connections (default: 4)")
+    parser.add_argument("-n", "--requests", type=int, default=10000, help="requests per connection (default: 10000)")
+    parser.add_argument("-b", "--batch", type=int, default=1, help="card numbers per request (default: 1)")
+    parser.add_argument("-d", "--depth", type=int, default=1,
+                        help="requests each connection keeps in flight (default: 1, no pipelining)")
+    parser.add_argument("--numbers", help="file of card numbers to send (default: generated VISA numbers)")
+    parser.add_argument("--seed", type=int, default=1, help="seed for the generated numbers")
+    args = parser.parse_args(argv)
+    if min(args.connections, args.requests, args.batch, args.depth) < 1:
+        parser.error("--connections, --requests, --batch and --depth must be positive")
+    if args.batch * args.depth > 4 * PIPELINE_WINDOW:
+        # Beyond this, the server could block writing answers while this side blocks sending.
+        parser.error(f"--batch times --depth must be at most {4 * PIPELINE_WINDOW} numbers in flight")
+
+    if args.numbers is not None:
+        with open(args.numbers) as file:
+            numbers = [line.strip() for line in file if line.strip()]
+        if not numbers:
+            parser.error(f"no card numbers in {args.numbers}")
+    else:
+        rng = random.Random(args.seed)
+        numbers = [make_test_number(rng) for _ in range(10000)]
+
+    latencies = []
+    errors = []
+    threads = [
+        threading.Thread(target=_run_connection,
+                         args=(args.address, args.requests, args.batch, args.depth, numbers, latencies, errors))
+        for _ in range(args.connections)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    if errors:
+        print(f"An error occurred: {errors[0]}", file=sys.stderr)
+    if not latencies:
+        return 1
+
+    latencies.sort()
+    print(f"{len(latencies)} requests of {args.batch} number(s) over {args.connections} connection(s), "
+          f"depth {args.depth}, in {elapsed:.3f}s")
+    print(f"throughput: {len(latencies) / elapsed:.0f} requests/s, {len(latencies) * args.batch / elapsed:.0f} numbers/s")
+    print(f"latency: p50 {_percentile(latencies, 0.50) * 1e6:.1f} us, p99 {_percentile(latencies, 0.99) * 1e6:.1f} us, "
+          f"max {latencies[-1] * 1e6:.1f} us")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,6 +1,9 @@
 #include "creditcard.h"
 #include <cs50.h>
 #include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <sys/stat.h>
 
 /**
  * @file creditcard_main.c
@@ -8,95 +11,378 @@
  */
 
 /**
- * @brief Main function to check the validity of a credit card number.
+ * @brief Prints the command-line usage.
  *
- * This function prompts the user for a credit card number, performs various checks
- * using helper functions, and prints the type of the credit card if it's valid.
+ * @param program The name the program was started as.
+ */
+static void usage(const char *program)
+{
+    fprintf(stderr, "Usage: %s [--bins FILE] [--batch [FILE] [--threads N] [--stats FILE] [--timing] [--columnar FILE]]\n", program);
+    fprintf(stderr, "       %s [--bins FILE] --generate COUNT [--prefix DIGITS] [--length N] [--network NAME] [--seed N]\n",
+            program);
+    fprintf(stderr, "       %s [--bins FILE] --serve unix:PATH|tcp:[HOST:]PORT\n", program);
+    fprintf(stderr, "       %s --compile-bins TEXT_FILE BINARY_FILE\n", program);
+}
+
+/**
+ * @brief Loads the issuer ranges from a binary range file, or the built-in ranges.
  *
- * @return 0 if the program executes successfully.
+ * @param bins The trie to fill.
+ * @param path The binary range file, or NULL for the built-in ranges.
+ * @return 0 on success, 1 if the ranges could not be loaded.
  */
-int main(void)
+static int load_bins(bin_table *bins, const char *path)
 {
-    long long int card;
+    if (bin_table_init(bins) != 0)
+    {
+        fprintf(stderr, "Out of memory\n");
+        return 1;
+    }
 
-    // Prompt the user for a credit card number.
-    do
+    if ((path != NULL ? bin_table_load(bins, path) : bin_table_load_defaults(bins)) != 0)
     {
-        card = get_long("Number: ");
+        fprintf(stderr, "Could not load issuer ranges from %s\n", path != NULL ? path : "the built-in table");
+        bin_table_free(bins);
+        return 1;
     }
-    while (card < 0);
 
-    // Get the length of the credit card number.
-    int count = get_card_length(card);
+    return 0;
+}
+
+/**
+ * @brief Compiles a text file of issuer ranges into a binary range file.
+ *
+ * @param text_path The text file to read.
+ * @param binary_path The binary file to write.
+ * @return 0 on success, 1 on failure.
+ */
+static int compile_bins(const char *text_path, const char *binary_path)
+{
+    int result = bin_table_compile(text_path, binary_path);
 
-    // Check if the length is valid.
-    int outcome = get_count_outcome(count);
-    if (outcome == 1)
+    if (result < 0)
     {
-        printf("INVALID\n");
-        return 0;
+        perror("compile-bins");
+        return 1;
     }
+    if (result > 0)
+    {
+        fprintf(stderr, "%s:%d: malformed issuer range\n", text_path, result);
+        return 1;
+    }
+
+    return 0;
+}
+
+/**
+ * @brief Validates newline-delimited card numbers from a file or stdin.
+ *
+ * One result line is written to stdout per input line, and the throughput is
+ * reported on stderr. A file is validated on `threads` threads when that is not 1;
+ * stdin is always read on one thread. With `stats_path`, the counts per network and
+ * rejection reason (and the time per stage, with `timing`) are written there as JSON.
+ * With `columnar_path`, the results are written to that file in the columnar
+ * results format instead of as text on stdout.
+ *
+ * @param bins The issuer ranges.
+ * @param path The file to read, or NULL or "-" for stdin.
+ * @param threads The number of worker threads, or 0 for one per online CPU.
+ * @param stats_path The file to write the statistics to, "-" for stderr, or NULL for none.
+ * @param timing 1 to time each validation stage.
+ * @param columnar_path The columnar results file to write, or NULL for text on stdout.
+ * @return 0 on success, 1 if the input could not be read or the results or statistics not written.
+ */
+static int run_batch(const bin_table *bins, const char *path, int threads, const char *stats_path, int timing,
+                     const char *columnar_path)
+{
+    FILE *in = stdin;
+    FILE *columnar_out = NULL;
+    columnar_writer columns;
+    batch_stats stats = {0};
+    int parallel = path != NULL && strcmp(path, "-") != 0 && threads != 1;
+    int failed;
 
-    // Calculate the sum of second-to-last and last digits.
-    int second_to_lasts = second_to_last(count, card);
-    int last = lasts(count, card);
-    int total_sum = second_to_lasts + last;
+    stats.timing = timing;
 
-    // Check if the total sum is divisible by 10.
-    if (total_sum % 10 != 0)
+    if (!parallel && path != NULL && strcmp(path, "-") != 0)
     {
-        printf("INVALID\n");
-        return 0;
+        in = fopen(path, "r");
+        if (in == NULL)
+        {
+            perror(path);
+            return 1;
+        }
     }
 
-    // Check the type of credit card and print the result.
-    if (count == 15)
+    if (columnar_path != NULL)
     {
-        int amex_first = amex_first_digit(count, card);
-        int amex_second = amex_second_digit(count, card);
-        if (amex_first == 3 && (amex_second == 4 || amex_second == 7))
+        columnar_out = fopen(columnar_path, "wb");
+        if (columnar_out == NULL || columnar_writer_open(&columns, columnar_out) != 0)
         {
-            printf("AMEX\n");
+            perror(columnar_path);
+            if (columnar_out != NULL)
+            {
+                fclose(columnar_out);
+            }
+            if (in != stdin)
+            {
+                fclose(in);
+            }
+            return 1;
         }
-        else
+    }
+
+    if (parallel)
+    {
+        failed = columnar_out != NULL ? validate_parallel_columnar(bins, path, &columns, threads, &stats)
+                                      : validate_parallel(bins, path, stdout, threads, &stats);
+        if (failed && stats.total == 0)
         {
-            printf("INVALID\n");
-            return 0;
+            perror(path);
+            if (columnar_out != NULL)
+            {
+                // Only a file created for the results is removed, never a device such as /dev/null.
+                struct stat info;
+                int regular = fstat(fileno(columnar_out), &info) == 0 && S_ISREG(info.st_mode);
+                columnar_writer_close(&columns);
+                fclose(columnar_out);
+                if (regular)
+                {
+                    remove(columnar_path);
+                }
+            }
+            return 1;
+        }
+    }
+    else
+    {
+        failed = columnar_out != NULL ? validate_batch_columnar(bins, in, &columns, &stats)
+                                      : validate_batch(bins, in, stdout, &stats);
+
+        if (in != stdin)
+        {
+            fclose(in);
+        }
+    }
+    fflush(stdout);
+
+    if (columnar_out != NULL)
+    {
+        // Both must run: the writer frees its buffer, and the file must be closed.
+        int close_failed = columnar_writer_close(&columns);
+        if (fclose(columnar_out) != 0 || close_failed)
+        {
+            perror(columnar_path);
+            failed = 1;
+        }
+    }
+
+    double rate = stats.seconds > 0 ? stats.total / stats.seconds : 0;
+    fprintf(stderr, "Validated %llu numbers (%llu valid) in %.3f s: %.0f numbers/sec\n", stats.total, stats.valid,
+            stats.seconds, rate);
+
+    if (stats_path != NULL)
+    {
+        FILE *stats_out = strcmp(stats_path, "-") == 0 ? stderr : fopen(stats_path, "w");
+        if (stats_out == NULL || batch_stats_write_json(&stats, stats_out) != 0)
+        {
+            perror(stats_path);
+            failed = 1;
+        }
+        if (stats_out != NULL && stats_out != stderr && fclose(stats_out) != 0)
+        {
+            perror(stats_path);
+            failed = 1;
         }
     }
-    else if (count == 16)
+
+    return failed;
+}
+
+/**
+ * @brief Writes generated test card numbers to stdout, one per line.
+ *
+ * The generation rate is reported on stderr.
+ *
+ * @param bins The issuer ranges.
+ * @param request The numbers to generate.
+ * @return 0 on success, 1 if the request is invalid or writing failed.
+ */
+static int run_generate(const bin_table *bins, const card_request *request)
+{
+    batch_stats stats = {0};
+    int result = generate_cards(bins, request, stdout, &stats);
+
+    if (result > 0)
+    {
+        fprintf(stderr, "No valid card number matches the requested prefix, length and network\n");
+        return 1;
+    }
+    if (fflush(stdout) != 0 || result < 0)
     {
-        int visa_master = visa_master_first_digit(count, card);
-        if (visa_master == 4)
+        perror("generate");
+        return 1;
+    }
+
+    double rate = stats.seconds > 0 ? stats.total / stats.seconds : 0;
+    fprintf(stderr, "Generated %llu numbers in %.3f s: %.0f numbers/sec\n", stats.total, stats.seconds, rate);
+
+    return 0;
+}
+
+/**
+ * @brief Main function to check the validity of a credit card number.
+ *
+ * This function prompts the user for a credit card number of up to CARD_MAX_LENGTH
+ * digits, validates it, and prints the type of the credit card if it's valid, or
+ * INVALID otherwise. The number is read as a string, so it is not limited to what
+ * fits in a `long`. When started as `creditcard_main --batch [FILE]`, it validates one
+ * number per line of FILE (or stdin) instead, using the issuer ranges given with
+ * `--bins FILE` or the built-in ones, on the number of threads given with `--threads`;
+ * `--stats FILE` writes the counts per network and rejection reason as JSON, and
+ * `--timing` adds the time spent in each validation stage. `--columnar FILE` writes the
+ * results to FILE in the columnar results format instead of as text.
+ * With `--generate COUNT`, it writes COUNT valid test card numbers instead, for the
+ * prefix and length given with `--prefix` and `--length`, or for the network given
+ * with `--network`, seeded with `--seed`. With `--serve ADDRESS`, it stays resident
+ * and answers card numbers sent over a Unix domain or TCP socket.
+ *
+ * @param argc The number of command-line arguments.
+ * @param argv The command-line arguments.
+ * @return 0 if the program executes successfully.
+ */
+int main(int argc, string argv[])
+{
+    const char *bins_path = NULL;
+    const char *batch_path = NULL;
+    int batch = 0;
+    int threads = 1;
+    const char *stats_path = NULL;
+    int timing = 0;
+    const char *columnar_path = NULL;
+    int generate = 0;
+    const char *serve_address = NULL;
+    card_request request = {NULL, 0, CARD_INVALID, 0, 1};
+
+    for (int i = 1; i < argc; i++)
+    {
+        if (strcmp(argv[i], "--compile-bins") == 0 && i + 2 < argc)
+        {
+            return compile_bins(argv[i + 1], argv[i + 2]);
+        }
+        else if (strcmp(argv[i], "--bins") == 0 && i + 1 < argc)
+        {
+            bins_path = argv[++i];
+        }
+        else if (strcmp(argv[i], "--threads") == 0 && i + 1 < argc)
+        {
+            threads = atoi(argv[++i]);
+        }
+        else if (strcmp(argv[i], "--stats") == 0 && i + 1 < argc)
+        {
+            stats_path = argv[++i];
+        }
+        else if (strcmp(argv[i], "--columnar") == 0 && i + 1 < argc)
+        {
+            columnar_path = argv[++i];
+        }
+        else if (strcmp(argv[i], "--timing") == 0)
+        {
+            timing = 1;
+        }
+        else if (strcmp(argv[i], "--generate") == 0 && i + 1 < argc)
         {
-            printf("VISA\n");
+            generate = 1;
+            request.count = strtoull(argv[++i], NULL, 10);
         }
-        else if (visa_master == 5)
+        else if (strcmp(argv[i], "--serve") == 0 && i + 1 < argc)
         {
-            int visa_master_second = visa_master_second_digit(count, card);
-            if (visa_master_second != 1 && visa_master_second != 2 && visa_master_second != 3 && visa_master_second != 4 &&
-                visa_master_second != 5)
+            serve_address = argv[++i];
+        }
+        else if (strcmp(argv[i], "--prefix") == 0 && i + 1 < argc)
+        {
+            request.prefix = argv[++i];
+        }
+        else if (strcmp(argv[i], "--length") == 0 && i + 1 < argc)
+        {
+            request.length = atoi(argv[++i]);
+        }
+        else if (strcmp(argv[i], "--network") == 0 && i + 1 < argc)
+        {
+            request.network = card_network_from_name(argv[++i]);
+            if (request.network == CARD_INVALID)
+            {
+                fprintf(stderr, "Unknown network: %s\n", argv[i]);
+                return 1;
+            }
+        }
+        else if (strcmp(argv[i], "--seed") == 0 && i + 1 < argc)
+        {
+            request.seed = strtoull(argv[++i], NULL, 10);
+        }
+        else if (strcmp(argv[i], "--batch") == 0)
+        {
+            batch = 1;
+            if (i + 1 < argc && strncmp(argv[i + 1], "--", 2) != 0)
             {
-                printf("INVALID\n");
-                return 0;
+                batch_path = argv[++i];
             }
-            printf("MASTERCARD\n");
         }
         else
         {
-            printf("INVALID\n");
-            return 0;
+            usage(argv[0]);
+            return 1;
         }
     }
-    else
+
+    bin_table bins;
+    if (load_bins(&bins, bins_path) != 0)
+    {
+        return 1;
+    }
+
+    if (serve_address != NULL)
+    {
+        int result = serve_cards(&bins, serve_address);
+        if (result != 0)
+        {
+            perror(serve_address);
+        }
+        bin_table_free(&bins);
+        return result;
+    }
+
+    if (generate)
+    {
+        int result = run_generate(&bins, &request);
+        bin_table_free(&bins);
+        return result;
+    }
+
+    if (batch)
+    {
+        int result = run_batch(&bins, batch_path, threads, stats_path, timing, columnar_path);
+        bin_table_free(&bins);
+        return result;
+    }
+
+    // Prompt the user for a credit card number, as digits only.
+    string number;
+    do
     {
-        int visa_first = visa_first_digit(count, card);
-        if (visa_first == 4)
+        number = get_string("Number: ");
+        if (number == NULL)
         {
-            printf("VISA\n");
+            bin_table_free(&bins);
+            return 0;
         }
-        return 0;
     }
+    while (number[0] == '\0' || number[strspn(number, "0123456789")] != '\0');
+
+    // Check the length, the Luhn sum and the issuer, and print the result.
+    card_network network = validate_card_digits(&bins, number, (int) strlen(number));
+    printf("%s\n", card_network_name(network));
 
+    bin_table_free(&bins);
     return 0;
 }
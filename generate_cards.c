@@ -0,0 +1,335 @@
+#include "creditcard.h"
+
+#include <errno.h>
+#include <stdlib.h>
+#include <string.h>
+#include <time.h>
+
+/**
+ * @file generate_cards.c
+ * @brief Implementation of the function to generate valid test card numbers.
+ */
+
+/**
+ * @brief Size of the output buffer, flushed with one fwrite() whenever it fills up.
+ */
+#define GENERATE_BUFFER_SIZE (1 << 16)
+
+/**
+ * @brief Attempts at drawing a number of the requested network before giving up.
+ */
+#define GENERATE_ATTEMPTS 1000
+
+/**
+ * @brief A prefix and length that generated numbers are drawn from.
+ */
+typedef struct
+{
+    char prefix[CARD_MAX_LENGTH];
+    int prefix_length;
+    int length;
+    unsigned long long weight_end;
+} card_template;
+
+/**
+ * @brief The templates a request draws from.
+ */
+typedef struct
+{
+    card_template *items;
+    size_t count;
+    size_t capacity;
+    unsigned long long total_weight;
+} template_list;
+
+/**
+ * @brief Returns the next number of a seeded splitmix64 sequence.
+ */
+static unsigned long long next_random(unsigned long long *state)
+{
+    unsigned long long z = (*state += 0x9E3779B97F4A7C15ULL);
+
+    z = (z ^ (z >> 30)) * 0xBF58476D1CE4E5B9ULL;
+    z = (z ^ (z >> 27)) * 0x94D049BB133111EBULL;
+    return z ^ (z >> 31);
+}
+
+/**
+ * @brief Fills a run of random decimal digits.
+ *
+ * Each 32-bit half of a random number is read as a binary fraction, and multiplying
+ * it by 10 moves its next decimal digit above bit 32, so eight digits come out of
+ * each half without any division.
+ */
+static void random_digits(char *digits, int count, unsigned long long *state)
+{
+    while (count > 0)
+    {
+        unsigned long long bits = next_random(state);
+
+        for (int half = 0; half < 2 && count > 0; half++, bits >>= 32)
+        {
+            unsigned long long fraction = bits & 0xFFFFFFFFULL;
+
+            for (int i = 0; i < 8 && count > 0; i++, count--)
+            {
+                fraction *= 10;
+                *digits++ = (char) ('0' + (fraction >> 32));
+                fraction &= 0xFFFFFFFFULL;
+            }
+        }
+    }
+}
+
+/**
+ * @brief Appends a template to the list.
+ *
+ * A template is weighted by the share of the number space its prefix covers, so a
+ * network's numbers are spread over its ranges as they would be over real cards
+ * rather than over the trie nodes the ranges happen to be split into.
+ *
+ * @return 0 on success, 1 if memory could not be allocated.
+ */
+static int add_template(template_list *list, const char *prefix, int prefix_length, int length)
+{
+    unsigned long long weight = 1;
+
+    for (int i = prefix_length; i < BIN_PREFIX_MAX; i++)
+    {
+        weight *= 10;
+    }
+
+    if (list->count == list->capacity)
+    {
+        size_t capacity = list->capacity ? list->capacity * 2 : 64;
+        card_template *items = realloc(list->items, capacity * sizeof(card_template));
+        if (items == NULL)
+        {
+            return 1;
+        }
+        list->items = items;
+        list->capacity = capacity;
+    }
+
+    card_template *item = &list->items[list->count++];
+    memcpy(item->prefix, prefix, (size_t) prefix_length);
+    item->prefix_length = prefix_length;
+    item->length = length;
+    list->total_weight += weight;
+    item->weight_end = list->total_weight;
+    return 0;
+}
+
+/**
+ * @brief Draws a template at random, in proportion to its weight.
+ */
+static const card_template *pick_template(const template_list *list, unsigned long long *state)
+{
+    unsigned long long target = next_random(state) % list->total_weight;
+    size_t low = 0, high = list->count - 1;
+
+    // Find the first template whose cumulative weight passes the target.
+    while (low < high)
+    {
+        size_t middle = low + (high - low) / 2;
+        if (list->items[middle].weight_end > target)
+        {
+            high = middle;
+        }
+        else
+        {
+            low = middle + 1;
+        }
+    }
+
+    return &list->items[low];
+}
+
+/**
+ * @brief Collects every prefix of the trie issued to a network, with each of its card lengths.
+ *
+ * @param bins The issuer ranges.
+ * @param node The node reached by `path`.
+ * @param path The digits leading to the node.
+ * @param depth The number of digits in `path`.
+ * @param network The network to collect.
+ * @param length The only card length to collect, or 0 for every length.
+ * @param list The templates found so far.
+ * @return 0 on success, 1 if memory could not be allocated.
+ */
+static int collect_templates(const bin_table *bins, int node, char *path, int depth, card_network network, int length,
+                             template_list *list)
+{
+    const bin_node *current = &bins->nodes[node];
+
+    if (depth > 0 && current->network == network)
+    {
+        for (int count = CARD_MIN_LENGTH; count <= CARD_MAX_LENGTH; count++)
+        {
+            if ((current->lengths >> count) & 1 && (length == 0 || length == count) && depth < count &&
+                add_template(list, path, depth, count) != 0)
+            {
+                return 1;
+            }
+        }
+    }
+
+    for (int digit = 0; digit < 10 && depth < BIN_PREFIX_MAX; digit++)
+    {
+        if (current->child[digit] != 0)
+        {
+            path[depth] = (char) ('0' + digit);
+            if (collect_templates(bins, current->child[digit], path, depth + 1, network, length, list) != 0)
+            {
+                return 1;
+            }
+        }
+    }
+
+    return 0;
+}
+
+/**
+ * @brief Writes randomly generated card numbers that pass the Luhn check, one per line.
+ *
+ * Each number is the prefix, random digits and the check digit from
+ * luhn_check_digit(), so it costs one pass over its digits. With a prefix, every
+ * number starts with it and has `length` digits. Without one, a prefix and length
+ * that the issuer ranges give to `network` is drawn for each number, weighted by
+ * how many numbers the prefix covers; when `length` is not 0, only that length is
+ * drawn. When `network` is set, a number that a longer issuer prefix assigns to
+ * another network is drawn again, so every number validates as `network`. The
+ * same request and seed always produce the same numbers.
+ *
+ * @param bins The issuer ranges.
+ * @param request The prefix, length, network, count and seed of the numbers to generate.
+ * @param out The stream to write the numbers to.
+ * @param stats Filled with the number of cards written and elapsed time; may be NULL.
+ * @return 0 on success, 1 if the request cannot produce a valid number, -1 if memory
+ *         could not be allocated or writing failed (errno is set).
+ */
+int generate_cards(const bin_table *bins, const card_request *request, FILE *out, batch_stats *stats)
+{
+    template_list templates = {NULL, 0, 0, 0};
+    unsigned long long state = request->seed;
+    unsigned long long written = 0;
+    struct timespec start, end;
+    char *buffer = NULL;
+    size_t used = 0;
+    int result = 0;
+
+    clock_gettime(CLOCK_MONOTONIC, &start);
+
+    if (request->length != 0 && (request->length < CARD_MIN_LENGTH || request->length > CARD_MAX_LENGTH))
+    {
+        return 1;
+    }
+
+    if (request->prefix != NULL && request->prefix[0] != '\0')
+    {
+        int prefix_length = (int) strlen(request->prefix);
+
+        if (request->length == 0 || prefix_length >= request->length)
+        {
+            return 1;
+        }
+        for (int i = 0; i < prefix_length; i++)
+        {
+            if (request->prefix[i] < '0' || request->prefix[i] > '9')
+            {
+                return 1;
+            }
+        }
+        if (add_template(&templates, request->prefix, prefix_length, request->length) != 0)
+        {
+            errno = ENOMEM;
+            return -1;
+        }
+    }
+    else
+    {
+        char path[BIN_PREFIX_MAX];
+
+        if (request->network == CARD_INVALID)
+        {
+            return 1;
+        }
+        if (collect_templates(bins, 0, path, 0, request->network, request->length, &templates) != 0)
+        {
+            free(templates.items);
+            errno = ENOMEM;
+            return -1;
+        }
+        if (templates.count == 0)
+        {
+            return 1;
+        }
+    }
+
+    buffer = malloc(GENERATE_BUFFER_SIZE);
+    if (buffer == NULL)
+    {
+        free(templates.items);
+        errno = ENOMEM;
+        return -1;
+    }
+
+    while (written < request->count)
+    {
+        char *card = buffer + used;
+        const card_template *template;
+        int attempt;
+
+        for (attempt = 0; attempt < GENERATE_ATTEMPTS; attempt++)
+        {
+            template = templates.count > 1 ? pick_template(&templates, &state) : &templates.items[0];
+
+            memcpy(card, template->prefix, (size_t) template->prefix_length);
+            random_digits(card + template->prefix_length, template->length - template->prefix_length - 1, &state);
+            card[template->length - 1] = (char) ('0' + luhn_check_digit(card, template->length - 1));
+
+            if (request->network == CARD_INVALID || bin_table_lookup(bins, card, template->length) == request->network)
+            {
+                break;
+            }
+        }
+        if (attempt == GENERATE_ATTEMPTS)
+        {
+            result = 1;
+            break;
+        }
+
+        card[template->length] = '\n';
+        used += (size_t) template->length + 1;
+        written++;
+
+        if (used > GENERATE_BUFFER_SIZE - (CARD_MAX_LENGTH + 1))
+        {
+            if (fwrite(buffer, 1, used, out) != used)
+            {
+                result = -1;
+                break;
+            }
+            used = 0;
+        }
+    }
+
+    if (result != -1 && used > 0 && fwrite(buffer, 1, used, out) != used)
+    {
+        result = -1;
+    }
+
+    free(buffer);
+    free(templates.items);
+
+    clock_gettime(CLOCK_MONOTONIC, &end);
+
+    if (stats != NULL)
+    {
+        stats->total = written;
+        stats->valid = written;
+        stats->seconds = (double) (end.tv_sec - start.tv_sec) + (double) (end.tv_nsec - start.tv_nsec) / 1e9;
+    }
+
+    return result;
+}
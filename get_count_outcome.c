@@ -9,15 +9,17 @@
  * @brief Checks the outcome of the credit card number length.
  *
  * This function checks whether the provided credit card number length is valid.
- * It returns 1 if the length is not 13, 15, or 16; otherwise, it returns 0.
+ * It returns 1 if the length is outside CARD_MIN_LENGTH to CARD_MAX_LENGTH (12 to 19);
+ * otherwise, it returns 0. The lengths each network issues are checked against the
+ * issuer ranges.
  *
  * @param count The length of the credit card number.
- * @return 1 if the length is not 13, 15, or 16; otherwise, 0.
+ * @return 1 if the length is outside 12 to 19; otherwise, 0.
  */
 int get_count_outcome(int count)
 {
-    // Check if the count is not 13, 15, or 16.
-    if (count != 13 && count != 15 && count != 16)
+    // Check if the count is outside 12 to 19.
+    if (count < CARD_MIN_LENGTH || count > CARD_MAX_LENGTH)
     {
         return 1;
     }
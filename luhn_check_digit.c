@@ -0,0 +1,37 @@
+#include "creditcard.h"
+
+/**
+ * @file luhn_check_digit.c
+ * @brief Implementation of the function to compute the Luhn check digit of a card number.
+ */
+
+/**
+ * @brief Computes the check digit that completes a card number.
+ *
+ * The payload is every digit of the card number except the check digit. Walking it
+ * once from right to left, its last digit and every second digit before it are the
+ * ones validation doubles, so the same luhn_double table gives the sum the check
+ * digit has to round up to a multiple of 10.
+ *
+ * @param digits The payload as ASCII digits, most significant first.
+ * @param count The number of payload digits.
+ * @return The check digit (0 to 9), or -1 if the payload holds a character that is not a digit.
+ */
+int luhn_check_digit(const char *digits, int count)
+{
+    int sum = 0;
+
+    for (int i = count - 1, doubled = 1; i >= 0; --i, doubled ^= 1)
+    {
+        unsigned int digit = (unsigned int) (digits[i] - '0');
+
+        if (digit > 9)
+        {
+            return -1;
+        }
+
+        sum += doubled ? luhn_double[digit] : (int) digit;
+    }
+
+    return (10 - sum % 10) % 10;
+}
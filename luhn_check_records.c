@@ -0,0 +1,118 @@
+#include "creditcard.h"
+
+/**
+ * @file luhn_check_records.c
+ * @brief Implementation of the functions to run the Luhn check over many fixed-width records.
+ */
+
+#if defined(__GNUC__) && (defined(__x86_64__) || defined(__i386__))
+#include <tmmintrin.h>
+#define LUHN_HAVE_SSSE3 1
+#endif
+
+/**
+ * @brief Runs the Luhn check over fixed-width records, one digit at a time.
+ *
+ * This is the portable version of luhn_check_records(), used for lengths other than
+ * 16 and on CPUs without SSSE3.
+ *
+ * @param records The first record; each holds `length` ASCII digits.
+ * @param stride The distance in bytes from one record to the next.
+ * @param length The number of digits in each record.
+ * @param count The number of records.
+ * @param valid Set to 1 for each record that passes the Luhn check, 0 otherwise.
+ * @return The number of records that pass the Luhn check.
+ */
+size_t luhn_check_records_scalar(const char *records, size_t stride, int length, size_t count, unsigned char *valid)
+{
+    size_t passed = 0;
+
+    for (size_t i = 0; i < count; i++, records += stride)
+    {
+        int sum = 0;
+        int ok = length > 0;
+
+        for (int j = length - 1, doubled = 0; j >= 0; --j, doubled ^= 1)
+        {
+            unsigned int digit = (unsigned int) (records[j] - '0');
+            if (digit > 9)
+            {
+                ok = 0;
+                break;
+            }
+            sum += doubled ? luhn_double[digit] : (int) digit;
+        }
+
+        valid[i] = (unsigned char) (ok && sum % 10 == 0);
+        passed += valid[i];
+    }
+
+    return passed;
+}
+
+#ifdef LUHN_HAVE_SSSE3
+/**
+ * @brief Runs the Luhn check over 16-digit records, a whole record per instruction.
+ *
+ * Each record is loaded as one 16-byte vector. The digits in even positions from the
+ * left are the ones doubled in a 16-digit number, so they are replaced through a
+ * byte shuffle with the luhn_double table, and all 16 digits are summed with a sum
+ * of absolute differences.
+ */
+__attribute__((target("ssse3"))) static size_t luhn_check16_ssse3(const char *records, size_t stride, size_t count,
+                                                                   unsigned char *valid)
+{
+    const __m128i zero = _mm_set1_epi8('0');
+    const __m128i nine = _mm_set1_epi8(9);
+    const __m128i doubled_table = _mm_setr_epi8((char) luhn_double[0], (char) luhn_double[1], (char) luhn_double[2],
+                                                (char) luhn_double[3], (char) luhn_double[4], (char) luhn_double[5],
+                                                (char) luhn_double[6], (char) luhn_double[7], (char) luhn_double[8],
+                                                (char) luhn_double[9], 0, 0, 0, 0, 0, 0);
+    const __m128i doubled_mask = _mm_setr_epi8(-1, 0, -1, 0, -1, 0, -1, 0, -1, 0, -1, 0, -1, 0, -1, 0);
+    size_t passed = 0;
+
+    for (size_t i = 0; i < count; i++, records += stride)
+    {
+        __m128i digits = _mm_sub_epi8(_mm_loadu_si128((const __m128i *) records), zero);
+
+        // Every byte is a digit when its unsigned value is at most 9.
+        int all_digits = _mm_movemask_epi8(_mm_cmpeq_epi8(_mm_max_epu8(digits, nine), nine)) == 0xffff;
+
+        __m128i doubled = _mm_shuffle_epi8(doubled_table, digits);
+        __m128i mixed = _mm_or_si128(_mm_and_si128(doubled_mask, doubled), _mm_andnot_si128(doubled_mask, digits));
+        __m128i sums = _mm_sad_epu8(mixed, _mm_setzero_si128());
+        int sum = _mm_cvtsi128_si32(sums) + _mm_extract_epi16(sums, 4);
+
+        valid[i] = (unsigned char) (all_digits && sum % 10 == 0);
+        passed += valid[i];
+    }
+
+    return passed;
+}
+#endif
+
+/**
+ * @brief Runs the Luhn check over many fixed-width records.
+ *
+ * Records of 16 digits use a vectorized kernel on CPUs with SSSE3; every other case
+ * uses luhn_check_records_scalar(). Only the checksum is checked, not the length or
+ * issuer. Records of 16 digits must each have 16 readable bytes.
+ *
+ * @param records The first record; each holds `length` ASCII digits.
+ * @param stride The distance in bytes from one record to the next, such as 17 for newline-terminated records.
+ * @param length The number of digits in each record.
+ * @param count The number of records.
+ * @param valid Set to 1 for each record that passes the Luhn check, 0 otherwise.
+ * @return The number of records that pass the Luhn check.
+ */
+size_t luhn_check_records(const char *records, size_t stride, int length, size_t count, unsigned char *valid)
+{
+#ifdef LUHN_HAVE_SSSE3
+    if (length == 16 && __builtin_cpu_supports("ssse3"))
+    {
+        return luhn_check16_ssse3(records, stride, count, valid);
+    }
+#endif
+
+    return luhn_check_records_scalar(records, stride, length, count, valid);
+}
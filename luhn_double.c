@@ -0,0 +1,14 @@
+#include "creditcard.h"
+
+/**
+ * @file luhn_double.c
+ * @brief Lookup table for the doubled digits in Luhn's Algorithm.
+ */
+
+/**
+ * @brief Digit sum of twice each digit.
+ *
+ * Entry d holds the sum of the digits of d * 2, so every second digit can be
+ * added to the Luhn total without the `two_product > 9` branch or divisions.
+ */
+const int luhn_double[10] = {0, 2, 4, 6, 8, 1, 3, 5, 7, 9};
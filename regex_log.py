@@ -1,215 +1,939 @@
 #!/usr/bin/env python3
 
+import argparse
+import collections
+import concurrent.futures
+import csv
+import gzip
+import io
+import heapq
+import json
+import math
+import os
 import sys
 import re
+import time
 
-if len(sys.argv) == 3:
-    if sys.argv[2] == "ipaddress":
-        try:
-            with open(sys.argv[1], 'r') as file:
-                file_contents = file.read()
-            ipaddresses = re.findall(r'(?P<ipaddresses>^\d\S+)', file_contents, re.MULTILINE)
-            response = input("Do you want to view or save? ").strip()
-            if response.lower() == "save":
-                filename = input("Enter a file name: ").strip()
-                with open(filename, 'w') as outfile:
-                    outfile.write('\n'.join(ipaddresses))
-            elif response.lower() == "view":
-                print('\n'.join(ipaddresses))
-            else:
-                print('\n'.join(ipaddresses))
-        except FileNotFoundError as e:
-            print(f"An error occurred: {e}")
-        except PermissionError as e:
-            print(f"An error occurred: {e}")
-        except Exception as e:
-            print(f"An error occurred: {e}")
-    elif sys.argv[2] == "timestamp":
-        try:
-            with open(sys.argv[1], 'r') as file:
-                file_contents = file.read()
-            timestamps = re.findall(r'(?P<timestamp>.{26})(?<=\d)\]', file_contents)
-            response = input("Do you want to view or save? ").strip()
-            if response.lower() == "save":
-                filename = input("Enter a file name: ").strip()
-                with open(filename, 'w') as outfile:
-                    outfile.write('\n'.join(timestamps))
-            elif response.lower() == "view":
-                print('\n'.join(timestamps))
-            else:
-                print('\n'.join(timestamps))
-        except FileNotFoundError as e:
-            print(f"An error occurred: {e}")
-        except PermissionError as e:
-            print(f"An error occurred: {e}")
-        except Exception as e:
-            print(f"An error occurred: {e}")
-    elif sys.argv[2] == "httpmethod":
-        try:
-            with open(sys.argv[1], 'r') as file:
-                file_contents = file.read()
-            httpmethods = re.findall(r'"(?=\w)(?P<httpmethod>\w+.*?\w)"', file_contents)
-            response = input("Do you want to view or save? ").strip()
-            if response.lower() == "save":
-                filename = input("Enter a file name: ").strip()
-                with open(filename, 'w') as outfile:
-                    outfile.write('\n'.join(httpmethods))
-            elif response.lower() == "view":
-                print('\n'.join(httpmethods))
-            else:
-                print('\n'.join(httpmethods))
-        except FileNotFoundError as e:
-            print(f"An error occurred: {e}")
-        except PermissionError as e:
-            print(f"An error occurred: {e}")
-        except Exception as e:
-            print(f"An error occurred: {e}")
-    elif sys.argv[2] == "statuscode":
-        try:
-            with open(sys.argv[1], 'r') as file:
-                file_contents = file.read()
-            statuscodes = re.findall(r'(?<=".\s)(?P<statuscode>\d+)', file_contents)
-            response = input("Do you want to view or save? ").strip()
-            if response.lower() == "save":
-                filename = input("Enter a file name: ").strip()
-                with open(filename, 'w') as outfile:
-                    outfile.write('\n'.join(statuscodes))
-            elif response.lower() == "view":
-                print('\n'.join(statuscodes))
-            else:
-                print('\n'.join(statuscodes))
-        except FileNotFoundError as e:
-            print(f"An error occurred: {e}")
-        except PermissionError as e:
-            print(f"An error occurred: {e}")
-        except Exception as e:
-            print(f"An error occurred: {e}")
-    elif sys.argv[2] == "responsesize":
-        try:
-            with open(sys.argv[1], 'r') as file:
-                file_contents = file.read()
-            response_sizes = re.findall(r'(?P<response_size>\d+$)', file_contents, re.MULTILINE)
-            response = input("Do you want to view or save? ").strip()
-            if response.lower() == "save":
-                filename = input("Enter a file name: ").strip()
-                with open(filename, 'w') as outfile:
-                    outfile.write('\n'.join(response_sizes))
-            elif response.lower() == "view":
-                print('\n'.join(response_sizes))
-            else:
-                print('\n'.join(response_sizes))
-        except FileNotFoundError as e:
-            print(f"An error occurred: {e}")
-        except PermissionError as e:
-            print(f"An error occurred: {e}")
-        except Exception as e:
-            print(f"An error occurred: {e}")
+# Per-line versions of the patterns used by the interactive mode, compiled once.
+FIELD_PATTERNS = {
+    "ipaddress": re.compile(r'(?P<ipaddresses>^\d\S+)', re.MULTILINE),
+    "timestamp": re.compile(r'(?P<timestamp>.{26})(?<=\d)\]'),
+    "httpmethod": re.compile(r'"(?=\w)(?P<httpmethod>\w+.*?\w)"'),
+    "statuscode": re.compile(r'(?<=".\s)(?P<statuscode>\d+)'),
+    "responsesize": re.compile(r'(?P<response_size>\d+$)', re.MULTILINE),
+}
+
+# One line of the Common Log Format, with the referrer and user agent of the
+# Combined Log Format when present. As in FIELD_PATTERNS, "httpmethod" is the
+# whole request line.
+LOG_LINE_PATTERN = re.compile(
+    r'(?P<ipaddress>\S+) (?P<ident>\S+) (?P<user>\S+) \[(?P<timestamp>[^\]]*)\] '
+    r'"(?P<httpmethod>[^"]*)" (?P<statuscode>\d{3}) (?P<responsesize>\d+|-)'
+    r'(?: "(?P<referrer>[^"]*)" "(?P<useragent>[^"]*)")?'
+)
+LOG_FIELDS = tuple(LOG_LINE_PATTERN.groupindex)
+
+# Size of the read and write buffers used when streaming a log.
+BUFFER_SIZE = 1 << 20
+
+# Bytes of a plain log, and lines of a compressed one, handed to a worker at a time.
+CHUNK_SIZE = 16 << 20
+CHUNK_LINES = 100_000
+
+# Chunks each worker may have queued or finished ahead of the writer.
+CHUNKS_AHEAD = 2
+
+
+def stream_field(lines, field):
+    """
+    Yield every value of a field, reading the log one line at a time.
+
+    Parameters:
+    - lines (iterable): The lines of the log, such as an open file.
+    - field (str): One of the keys of FIELD_PATTERNS.
+    """
+    findall = FIELD_PATTERNS[field].findall
+    for line in lines:
+        yield from findall(line)
+
+
+def parse_lines(lines, fields):
+    """
+    Yield the requested fields of every log line, parsing each line once.
+
+    Lines that are not in the Common or Combined Log Format are skipped.
+
+    Parameters:
+    - lines (iterable): The lines of the log, such as an open file.
+    - fields (sequence): Names from LOG_FIELDS, in output order.
+    """
+    indexes = [LOG_LINE_PATTERN.groupindex[field] for field in fields]
+    match = LOG_LINE_PATTERN.match
+    if len(indexes) == 1:
+        index = indexes[0]
+        for line in lines:
+            found = match(line)
+            if found:
+                yield (found.group(index),)
     else:
-        print(f"Log Data '{sys.argv[2]}' doesn't exist!!!")
-else:
-    file_name = input("Enter file name: ").strip()
-    print("Which type of information would you like to extract?")
-    print("ipaddress\ntimestamp\nhttpmethod\nstatuscode\nresponsesize")
-    log_data = input("Enter one of the options above: ").strip()
-    if log_data == "ipaddress":
-        try:
-            with open(file_name, 'r') as file:
-                file_contents = file.read()
-            ipaddresses = re.findall(r'(?P<ipaddresses>^\d\S+)', file_contents, re.MULTILINE)
-            response = input("Do you want to view or save? ").strip()
-            if response.lower() == "save":
-                filename = input("Enter a file name: ").strip()
-                with open(filename, 'w') as outfile:
-                    outfile.write('\n'.join(ipaddresses))
-            elif response.lower() == "view":
-                print('\n'.join(ipaddresses))
-            else:
-                print('\n'.join(ipaddresses))
-        except FileNotFoundError as e:
-            print(f"An error occurred: {e}")
-        except PermissionError as e:
-            print(f"An error occurred: {e}")
-        except Exception as e:
-            print(f"An error occurred: {e}")
-    elif log_data == "timestamp":
-        try:
-            with open(file_name, 'r') as file:
-                file_contents = file.read()
-            timestamps = re.findall(r'(?P<timestamp>.{26})(?<=\d)\]', file_contents)
-            response = input("Do you want to view or save? ").strip()
-            if response.lower() == "save":
-                filename = input("Enter a file name: ").strip()
-                with open(filename, 'w') as outfile:
-                    outfile.write('\n'.join(timestamps))
-            elif response.lower() == "view":
-                print('\n'.join(timestamps))
-            else:
-                print('\n'.join(timestamps))
-        except FileNotFoundError as e:
-            print(f"An error occurred: {e}")
-        except PermissionError as e:
-            print(f"An error occurred: {e}")
-        except Exception as e:
-            print(f"An error occurred: {e}")
-    elif log_data == "httpmethod":
-        try:
-            with open(file_name, 'r') as file:
-                file_contents = file.read()
-            httpmethods = re.findall(r'"(?=\w)(?P<httpmethod>\w+.*?\w)"', file_contents)
-            response = input("Do you want to view or save? ").strip()
-            if response.lower() == "save":
-                filename = input("Enter a file name: ").strip()
-                with open(filename, 'w') as outfile:
-                    outfile.write('\n'.join(httpmethods))
-            elif response.lower() == "view":
-                print('\n'.join(httpmethods))
-            else:
-                print('\n'.join(httpmethods))
-        except FileNotFoundError as e:
-            print(f"An error occurred: {e}")
-        except PermissionError as e:
-            print(f"An error occurred: {e}")
-        except Exception as e:
-            print(f"An error occurred: {e}")
-    elif log_data == "statuscode":
+        for line in lines:
+            found = match(line)
+            if found:
+                yield found.group(*indexes)
+
+
+class _Echo:
+    """
+    File-like object whose write() returns what it is given, so csv.writer can
+    format a single row.
+    """
+
+    def write(self, text):
+        return text
+
+
+def make_formatter(fields, output_format):
+    """
+    Return a function that turns a tuple of field values into one output line.
+
+    Parameters:
+    - fields (sequence): The names of the values, used as JSON keys.
+    - output_format (str): "tsv", "csv" or "json". Missing values are written as
+      "-" in TSV, empty in CSV and null in JSON.
+    """
+    if output_format == "json":
+        return lambda values: json.dumps(dict(zip(fields, values))) + '\n'
+    if output_format == "csv":
+        return csv.writer(_Echo(), lineterminator='\n').writerow
+    return lambda values: '\t'.join(value if value is not None else '-' for value in values) + '\n'
+
+
+def extract_lines(lines, field, fields, output_format):
+    """
+    Yield the output line of every value found in the log lines.
+
+    Parameters:
+    - lines (iterable): The lines of the log.
+    - field (str): The single field to extract with FIELD_PATTERNS, or None.
+    - fields (sequence): The fields to extract with LOG_LINE_PATTERN when field is None.
+    - output_format (str): The format used for fields, as in make_formatter().
+    """
+    if fields is None:
+        for value in stream_field(lines, field):
+            yield value + '\n'
+    else:
+        yield from map(make_formatter(fields, output_format), parse_lines(lines, fields))
+
+
+def is_gzip(path):
+    """
+    Check whether a file is gzip-compressed by looking at its magic number.
+    """
+    with open(path, 'rb') as file:
+        return file.read(2) == b'\x1f\x8b'
+
+
+def open_log(path):
+    """
+    Open a plain or gzip-compressed log for reading text line by line.
+
+    Bytes that are not valid UTF-8 are replaced rather than raising, as in every
+    other mode.
+    """
+    if is_gzip(path):
+        return gzip.open(path, 'rt', errors='replace')
+    return open(path, 'r', buffering=BUFFER_SIZE, errors='replace')
+
+
+def chunk_ranges(path, chunk_size=CHUNK_SIZE):
+    """
+    Split a plain log into byte ranges of about chunk_size that start and end on
+    line boundaries.
+
+    Returns:
+    - list: (start, end) byte offsets covering the whole file.
+    """
+    size = os.path.getsize(path)
+    offsets = [0]
+    with open(path, 'rb') as file:
+        position = chunk_size
+        while position < size:
+            file.seek(position)
+            file.readline()
+            position = file.tell()
+            if position >= size:
+                break
+            offsets.append(position)
+            position += chunk_size
+    offsets.append(size)
+    return list(zip(offsets, offsets[1:]))
+
+
+def extract_text(lines, field, fields, output_format):
+    """
+    Return the output of extract_lines() for a chunk of lines as one string.
+    """
+    return ''.join(extract_lines(lines, field, fields, output_format))
+
+
+def _process_range(task):
+    """
+    Worker: run a chunk function over one byte range of a plain log.
+    """
+    path, start, end, process, arguments = task
+    with open(path, 'rb') as file:
+        file.seek(start)
+        data = file.read(end - start)
+    return process(io.StringIO(data.decode(errors='replace'), newline=None), *arguments)
+
+
+def _process_batch(task):
+    """
+    Worker: run a chunk function over a list of lines read from a compressed log.
+    """
+    lines, process, arguments = task
+    return process(lines, *arguments)
+
+
+def _line_batches(file, size=CHUNK_LINES):
+    """
+    Yield lists of up to size lines read from an open log.
+    """
+    while True:
+        batch = [line for _, line in zip(range(size), file)]
+        if not batch:
+            return
+        yield batch
+
+
+def map_chunks(path, process, arguments, jobs):
+    """
+    Run a function over chunks of a log on a pool of worker processes, yielding
+    its result for each chunk in input order.
+
+    A plain log is split into line-aligned byte ranges that each worker reads
+    itself. A gzip-compressed log cannot be split that way, so it is decompressed
+    here and handed to the workers in batches of lines. Only a few chunks per
+    worker are in flight at once, so memory stays bounded.
+
+    Parameters:
+    - path (str): The log file.
+    - process (function): A module-level function called as process(lines, *arguments).
+    - arguments (tuple): The other arguments of process.
+    - jobs (int): The number of worker processes, or None for one per CPU.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+        if is_gzip(path):
+            file = gzip.open(path, 'rt', errors='replace')
+            tasks = ((batch, process, arguments) for batch in _line_batches(file))
+            worker = _process_batch
+        else:
+            file = None
+            tasks = ((path, start, end, process, arguments) for start, end in chunk_ranges(path))
+            worker = _process_range
+
         try:
-            with open(file_name, 'r') as file:
-                file_contents = file.read()
-            statuscodes = re.findall(r'(?<=".\s)(?P<statuscode>\d+)', file_contents)
-            response = input("Do you want to view or save? ").strip()
-            if response.lower() == "save":
-                filename = input("Enter a file name: ").strip()
-                with open(filename, 'w') as outfile:
-                    outfile.write('\n'.join(statuscodes))
-            elif response.lower() == "view":
-                print('\n'.join(statuscodes))
+            pending = collections.deque()
+            for task in tasks:
+                pending.append(executor.submit(worker, task))
+                if len(pending) >= jobs * CHUNKS_AHEAD:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            if file is not None:
+                file.close()
+
+
+class SpaceSaving:
+    """
+    Space-Saving sketch of the most frequent items of a stream, holding at most
+    `capacity` counters.
+
+    When a new item arrives and every counter is taken, the smallest counter is
+    handed over to it, so each reported count overestimates the true one by at most
+    the recorded error. A heap finds the smallest counter; it holds stale entries
+    for counters incremented since they were pushed, which are skipped when popped
+    and cleared when the heap grows too large.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self._heap = []
+
+    def add(self, item, count=1):
+        counts = self.counts
+        if item in counts:
+            counts[item] += count
+            return
+        error = 0
+        if len(counts) >= self.capacity:
+            error = self._evict()
+        counts[item] = error + count
+        self.errors[item] = error
+        heapq.heappush(self._heap, (counts[item], item))
+
+    def _evict(self):
+        """
+        Remove the item with the smallest count and return that count.
+        """
+        heap = self._heap
+        if len(heap) > 4 * self.capacity:
+            self._heap = heap = [(count, item) for item, count in self.counts.items()]
+            heapq.heapify(heap)
+        while True:
+            count, item = heapq.heappop(heap)
+            current = self.counts.get(item)
+            if current == count:
+                del self.counts[item]
+                del self.errors[item]
+                return count
+            if current is not None:
+                heapq.heappush(heap, (current, item))
+
+    def merge(self, other):
+        """
+        Add the counters of another sketch to this one.
+        """
+        for item, count in other.counts.items():
+            self.add(item, count)
+            self.errors[item] += other.errors[item]
+
+    def top(self, n):
+        """
+        Return the n items with the highest counts as (item, count, error) tuples.
+        """
+        best = heapq.nlargest(n, self.counts.items(), key=lambda entry: entry[1])
+        return [(item, count, self.errors[item]) for item, count in best]
+
+
+class TDigest:
+    """
+    Merging t-digest: approximate quantiles of a stream in bounded memory.
+
+    Values are buffered and periodically merged into at most about `compression`
+    centroids, which are kept small near the tails so extreme percentiles stay
+    accurate.
+    """
+
+    def __init__(self, compression=100):
+        self.compression = compression
+        self.centroids = []
+        self.count = 0
+        self._buffer = []
+
+    def add(self, value, weight=1):
+        self._buffer.append((value, weight))
+        self.count += weight
+        if len(self._buffer) >= 10 * self.compression:
+            self._compress()
+
+    def merge(self, other):
+        """
+        Add the values summarized by another digest to this one.
+        """
+        other._compress()
+        self._buffer.extend(other.centroids)
+        self.count += other.count
+        self._compress()
+
+    def _scale(self, quantile):
+        return self.compression / (2 * math.pi) * math.asin(2 * quantile - 1)
+
+    def _compress(self):
+        if not self._buffer:
+            return
+        items = sorted(self.centroids + self._buffer)
+        self._buffer = []
+        total = sum(weight for _, weight in items)
+        merged = []
+        mean, weight = items[0]
+        seen = 0
+        limit = self._scale(0) + 1
+        for value, value_weight in items[1:]:
+            if self._scale((seen + weight + value_weight) / total) <= limit:
+                mean += (value - mean) * value_weight / (weight + value_weight)
+                weight += value_weight
             else:
-                print('\n'.join(statuscodes))
-        except FileNotFoundError as e:
-            print(f"An error occurred: {e}")
-        except PermissionError as e:
-            print(f"An error occurred: {e}")
-        except Exception as e:
-            print(f"An error occurred: {e}")
-    elif log_data == "responsesize":
+                merged.append((mean, weight))
+                seen += weight
+                limit = self._scale(seen / total) + 1
+                mean, weight = value, value_weight
+        merged.append((mean, weight))
+        self.centroids = merged
+
+    def quantile(self, quantile):
+        """
+        Return the approximate value at a quantile between 0 and 1, or None if the
+        digest is empty.
+        """
+        self._compress()
+        if not self.centroids:
+            return None
+        target = quantile * self.count
+        seen = 0
+        previous_mean, previous_middle = self.centroids[0][0], 0
+        for mean, weight in self.centroids:
+            middle = seen + weight / 2
+            if target <= middle:
+                if middle == previous_middle:
+                    return mean
+                fraction = (target - previous_middle) / (middle - previous_middle)
+                return previous_mean + (mean - previous_mean) * max(0.0, fraction)
+            previous_mean, previous_middle = mean, middle
+            seen += weight
+        return self.centroids[-1][0]
+
+
+class LogAggregates:
+    """
+    Streaming aggregates of an access log, all kept in bounded memory: the top IP
+    addresses, the count of each status code, the sum and percentiles of response
+    sizes, and the number of requests per minute.
+    """
+
+    def __init__(self, top_capacity=1000):
+        self.requests = 0
+        self.ipaddresses = SpaceSaving(top_capacity)
+        self.statuscodes = collections.Counter()
+        self.size_sum = 0
+        self.sizes = TDigest()
+        self.minutes = collections.Counter()
+
+    def add_lines(self, lines):
+        """
+        Add every Common or Combined Log Format line to the aggregates.
+        """
+        add_ip = self.ipaddresses.add
+        add_size = self.sizes.add
+        statuscodes = self.statuscodes
+        minutes = self.minutes
+        for ipaddress, statuscode, responsesize, timestamp in parse_lines(
+                lines, ("ipaddress", "statuscode", "responsesize", "timestamp")):
+            self.requests += 1
+            add_ip(ipaddress)
+            statuscodes[statuscode] += 1
+            if responsesize != '-':
+                size = int(responsesize)
+                self.size_sum += size
+                add_size(size)
+            # "10/Oct/2023:13:55:36 +0000" falls in the minute "10/Oct/2023:13:55 +0000".
+            minutes[timestamp[:17] + timestamp[20:]] += 1
+        return self
+
+    def merge(self, other):
+        """
+        Add the aggregates of a later part of the log to these.
+        """
+        self.requests += other.requests
+        self.ipaddresses.merge(other.ipaddresses)
+        self.statuscodes.update(other.statuscodes)
+        self.size_sum += other.size_sum
+        self.sizes.merge(other.sizes)
+        self.minutes.update(other.minutes)
+        return self
+
+    def report(self, top):
+        """
+        Return the aggregates as a dictionary ready to be written as JSON.
+
+        Parameters:
+        - top (int): The number of IP addresses to list.
+        """
+        return {
+            "requests": self.requests,
+            "top_ipaddresses": [
+                {"ipaddress": ipaddress, "count": count, "max_overcount": error}
+                for ipaddress, count, error in self.ipaddresses.top(top)
+            ],
+            "statuscodes": dict(sorted(self.statuscodes.items())),
+            "responsesize": {
+                "count": self.sizes.count,
+                "sum": self.size_sum,
+                "p50": self.sizes.quantile(0.5),
+                "p90": self.sizes.quantile(0.9),
+                "p99": self.sizes.quantile(0.99),
+            },
+            "requests_per_minute": dict(self.minutes),
+        }
+
+
+def aggregate_lines(lines, top_capacity):
+    """
+    Return the LogAggregates of a chunk of lines.
+    """
+    return LogAggregates(top_capacity).add_lines(lines)
+
+
+def load_state(path):
+    """
+    Load the saved read positions of each log, or an empty state if none were saved.
+
+    Returns:
+    - dict: Maps the absolute path of each log to {"inode", "device", "offset"}.
+    """
+    try:
+        with open(path, 'r') as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+
+
+def save_state(path, state):
+    """
+    Save the read positions of each log, replacing the state file atomically.
+    """
+    temporary = f"{path}.tmp"
+    with open(temporary, 'w') as file:
+        json.dump(state, file)
+    os.replace(temporary, path)
+
+
+def resume_position(path, saved):
+    """
+    Decide where to resume reading a log from its saved position.
+
+    Reading starts over when the log was rotated (its inode changed) or truncated
+    (it is now shorter than the saved offset).
+
+    Parameters:
+    - path (str): The log file.
+    - saved (dict): The saved position of the log, or None.
+
+    Returns:
+    - dict: The position to resume from, updated as lines are read.
+    """
+    info = os.stat(path)
+    position = {"inode": info.st_ino, "device": info.st_dev, "offset": 0}
+    if (saved and saved.get("inode") == info.st_ino and saved.get("device") == info.st_dev
+            and saved.get("offset", 0) <= info.st_size):
+        position["offset"] = saved["offset"]
+    return position
+
+
+def read_complete_lines(file, position):
+    """
+    Yield the complete lines of an open binary log from its current position.
+
+    A final line without a newline is still being written, so it is left for the
+    next read. position["offset"] only moves past a line once the next one is
+    asked for, so a saved offset never skips a line that was not processed.
+    """
+    for raw in file:
+        if not raw.endswith(b'\n'):
+            file.seek(position["offset"])
+            return
+        line = raw.decode(errors='replace')
+        if line.endswith('\r\n'):
+            line = line[:-2] + '\n'
+        yield line
+        position["offset"] += len(raw)
+
+
+def read_new_lines(path, position):
+    """
+    Yield the complete lines appended to a log since the given position.
+    """
+    with open(path, 'rb') as file:
+        file.seek(position["offset"])
+        yield from read_complete_lines(file, position)
+
+
+def follow_log(path, position, interval, on_idle):
+    """
+    Yield the lines of a log from the given position, then wait for new lines
+    forever, like `tail -F`.
+
+    When the log is rotated, the rest of the old file is read before switching to
+    the new one; when it is truncated, reading starts over.
+
+    Parameters:
+    - path (str): The log file.
+    - position (dict): The position to start from, as returned by resume_position().
+    - interval (float): Seconds to wait between checks for new lines.
+    - on_idle (function): Called with no arguments each time all lines so far are read.
+    """
+    file = open(path, 'rb')
+    try:
+        file.seek(position["offset"])
+        while True:
+            yield from read_complete_lines(file, position)
+            on_idle()
+            time.sleep(interval)
+            try:
+                info = os.stat(path)
+            except FileNotFoundError:
+                continue
+            if (info.st_ino, info.st_dev) != (position["inode"], position["device"]):
+                yield from read_complete_lines(file, position)
+                file.close()
+                file = open(path, 'rb')
+                position.update(inode=info.st_ino, device=info.st_dev, offset=0)
+            elif info.st_size < position["offset"]:
+                file.seek(0)
+                position["offset"] = 0
+    finally:
+        file.close()
+
+
+def open_output(path):
+    """
+    Open the file results are written to, or return stdout when no path is given.
+    """
+    if path is None:
+        return sys.stdout
+    return open(path, 'w', buffering=BUFFER_SIZE)
+
+
+def main(argv):
+    """
+    Extract log fields as directed by command-line flags, without any prompts.
+
+    The log is streamed line by line, so memory use does not grow with its size.
+    With --jobs, it is parsed in chunks on a pool of processes instead, and the
+    output is still written in input order. Plain and gzip-compressed logs are
+    both accepted. With --state, only lines appended since the previous run are
+    read; with --follow, new lines keep being read until interrupted.
+
+    Parameters:
+    - argv (list): The command-line arguments, without the program name.
+
+    Returns:
+    - int: The exit status.
+    """
+    parser = argparse.ArgumentParser(description="Extract fields from an access log.")
+    parser.add_argument("logfile", help="the log file to read")
+    selection = parser.add_mutually_exclusive_group(required=True)
+    selection.add_argument("--field", choices=FIELD_PATTERNS, help="the field to extract")
+    selection.add_argument(
+        "--fields",
+        help="comma-separated fields to extract together from each line, parsed in a "
+        f"single pass: {', '.join(LOG_FIELDS)}",
+    )
+    selection.add_argument(
+        "--aggregate",
+        action="store_true",
+        help="in a single pass, report as JSON the top IP addresses, status code counts, "
+        "response size sum and percentiles, and requests per minute",
+    )
+    parser.add_argument("--top", type=int, default=10, help="number of IP addresses listed by --aggregate")
+    parser.add_argument("--format", choices=("tsv", "csv", "json"), default="tsv",
+                        help="output format for --fields (default: tsv)")
+    parser.add_argument("--header", action="store_true", help="start TSV or CSV output with the field names")
+    parser.add_argument("-o", "--output", help="write the values to this file instead of stdout")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="parse the log in chunks on this many processes (0: one per CPU)")
+    parser.add_argument("--state", help="only read lines appended since the last run, keeping the "
+                        "read position of each log in this file")
+    parser.add_argument("-f", "--follow", action="store_true",
+                        help="keep reading lines as they are appended, following rotation and truncation")
+    parser.add_argument("--interval", type=float, default=1.0,
+                        help="seconds between checks for new lines with --follow (default: 1)")
+    args = parser.parse_args(argv)
+    incremental = args.state is not None or args.follow
+    if incremental and args.jobs != 1:
+        parser.error("--state and --follow read the log in a single process")
+    if args.follow and args.aggregate:
+        parser.error("--aggregate cannot be combined with --follow")
+
+    fields = None
+    if args.fields is not None:
+        fields = [field.strip() for field in args.fields.split(',')]
+        unknown = [field for field in fields if field not in LOG_LINE_PATTERN.groupindex]
+        if unknown:
+            parser.error(f"unknown field(s): {', '.join(unknown)}")
+
+    options = (args.field, fields, args.format)
+    try:
+        # Fail before creating the output file if the log cannot be read.
+        with open(args.logfile, 'rb'):
+            pass
+        if incremental and is_gzip(args.logfile):
+            print("An error occurred: --state and --follow need a plain log, not a compressed one", file=sys.stderr)
+            return 1
+        outfile = open_output(args.output)
         try:
-            with open(file_name, 'r') as file:
-                file_contents = file.read()
-            response_sizes = re.findall(r'(?P<response_size>\d+$)', file_contents, re.MULTILINE)
-            response = input("Do you want to view or save? ").strip()
-            if response.lower() == "save":
-                filename = input("Enter a file name: ").strip()
-                with open(filename, 'w') as outfile:
-                    outfile.write('\n'.join(response_sizes))
-            elif response.lower() == "view":
-                print('\n'.join(response_sizes))
+            lines = None
+            if incremental:
+                state = load_state(args.state) if args.state is not None else {}
+                key = os.path.abspath(args.logfile)
+                position = state[key] = resume_position(args.logfile, state.get(key))
+
+                def checkpoint():
+                    outfile.flush()
+                    if args.state is not None:
+                        save_state(args.state, state)
+
+                if args.follow:
+                    lines = follow_log(args.logfile, position, args.interval, checkpoint)
+                else:
+                    lines = read_new_lines(args.logfile, position)
+
+            if args.aggregate:
+                # Track more candidates than are reported, so the top list is reliable.
+                capacity = max(1000, 10 * args.top)
+                if lines is not None:
+                    aggregates = aggregate_lines(lines, capacity)
+                elif args.jobs == 1:
+                    with open_log(args.logfile) as file:
+                        aggregates = aggregate_lines(file, capacity)
+                else:
+                    aggregates = LogAggregates(capacity)
+                    for chunk in map_chunks(args.logfile, aggregate_lines, (capacity,), args.jobs):
+                        aggregates.merge(chunk)
+                json.dump(aggregates.report(args.top), outfile, indent=2)
+                outfile.write('\n')
+                if lines is not None:
+                    checkpoint()
+                return 0
+            if fields is not None and args.header and args.format != "json":
+                outfile.write(make_formatter(fields, args.format)(fields))
+            if lines is not None:
+                try:
+                    outfile.writelines(extract_lines(lines, *options))
+                except KeyboardInterrupt:
+                    pass
+                checkpoint()
+            elif args.jobs == 1:
+                with open_log(args.logfile) as file:
+                    outfile.writelines(extract_lines(file, *options))
             else:
-                print('\n'.join(response_sizes))
-        except FileNotFoundError as e:
-            print(f"An error occurred: {e}")
-        except PermissionError as e:
-            print(f"An error occurred: {e}")
-        except Exception as e:
-            print(f"An error occurred: {e}")
+                outfile.writelines(map_chunks(args.logfile, extract_text, options, args.jobs))
+        finally:
+            if outfile is not sys.stdout:
+                outfile.close()
+    except BrokenPipeError:
+        # The reader went away (e.g. `| head`): stop quietly, and keep the final
+        # flush of stdout at exit from failing again.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    except Exception as e:
+        print(f"An error occurred: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def interactive_main():
+    """
+    Extract one field, asking for anything missing from the command line and
+    whether to view or save the values.
+    """
+    if len(sys.argv) == 3:
+        if sys.argv[2] == "ipaddress":
+            try:
+                with open(sys.argv[1], 'r') as file:
+                    file_contents = file.read()
+                ipaddresses = re.findall(r'(?P<ipaddresses>^\d\S+)', file_contents, re.MULTILINE)
+                response = input("Do you want to view or save? ").strip()
+                if response.lower() == "save":
+                    filename = input("Enter a file name: ").strip()
+                    with open(filename, 'w') as outfile:
+                        outfile.write('\n'.join(ipaddresses))
+                elif response.lower() == "view":
+                    print('\n'.join(ipaddresses))
+                else:
+                    print('\n'.join(ipaddresses))
+            except FileNotFoundError as e:
+                print(f"An error occurred: {e}")
+            except PermissionError as e:
+                print(f"An error occurred: {e}")
+            except Exception as e:
+                print(f"An error occurred: {e}")
+        elif sys.argv[2] == "timestamp":
+            try:
+                with open(sys.argv[1], 'r') as file:
+                    file_contents = file.read()
+                timestamps = re.findall(r'(?P<timestamp>.{26})(?<=\d)\]', file_contents)
+                response = input("Do you want to view or save? ").strip()
+                if response.lower() == "save":
+                    filename = input("Enter a file name: ").strip()
+                    with open(filename, 'w') as outfile:
+                        outfile.write('\n'.join(timestamps))
+                elif response.lower() == "view":
+                    print('\n'.join(timestamps))
+                else:
+                    print('\n'.join(timestamps))
+            except FileNotFoundError as e:
+                print(f"An error occurred: {e}")
+            except PermissionError as e:
+                print(f"An error occurred: {e}")
+            except Exception as e:
+                print(f"An error occurred: {e}")
+        elif sys.argv[2] == "httpmethod":
+            try:
+                with open(sys.argv[1], 'r') as file:
+                    file_contents = file.read()
+                httpmethods = re.findall(r'"(?=\w)(?P<httpmethod>\w+.*?\w)"', file_contents)
+                response = input("Do you want to view or save? ").strip()
+                if response.lower() == "save":
+                    filename = input("Enter a file name: ").strip()
+                    with open(filename, 'w') as outfile:
+                        outfile.write('\n'.join(httpmethods))
+                elif response.lower() == "view":
+                    print('\n'.join(httpmethods))
+                else:
+                    print('\n'.join(httpmethods))
+            except FileNotFoundError as e:
+                print(f"An error occurred: {e}")
+            except PermissionError as e:
+                print(f"An error occurred: {e}")
+            except Exception as e:
+                print(f"An error occurred: {e}")
+        elif sys.argv[2] == "statuscode":
+            try:
+                with open(sys.argv[1], 'r') as file:
+                    file_contents = file.read()
+                statuscodes = re.findall(r'(?<=".\s)(?P<statuscode>\d+)', file_contents)
+                response = input("Do you want to view or save? ").strip()
+                if response.lower() == "save":
+                    filename = input("Enter a file name: ").strip()
+                    with open(filename, 'w') as outfile:
+                        outfile.write('\n'.join(statuscodes))
+                elif response.lower() == "view":
+                    print('\n'.join(statuscodes))
+                else:
+                    print('\n'.join(statuscodes))
+            except FileNotFoundError as e:
+                print(f"An error occurred: {e}")
+            except PermissionError as e:
+                print(f"An error occurred: {e}")
+            except Exception as e:
+                print(f"An error occurred: {e}")
+        elif sys.argv[2] == "responsesize":
+            try:
+                with open(sys.argv[1], 'r') as file:
+                    file_contents = file.read()
+                response_sizes = re.findall(r'(?P<response_size>\d+$)', file_contents, re.MULTILINE)
+                response = input("Do you want to view or save? ").strip()
+                if response.lower() == "save":
+                    filename = input("Enter a file name: ").strip()
+                    with open(filename, 'w') as outfile:
+                        outfile.write('\n'.join(response_sizes))
+                elif response.lower() == "view":
+                    print('\n'.join(response_sizes))
+                else:
+                    print('\n'.join(response_sizes))
+            except FileNotFoundError as e:
+                print(f"An error occurred: {e}")
+            except PermissionError as e:
+                print(f"An error occurred: {e}")
+            except Exception as e:
+                print(f"An error occurred: {e}")
+        else:
+            print(f"Log Data '{sys.argv[2]}' doesn't exist!!!")
     else:
-        print(f"Log Data '{log_data}' doesn't exist!!!")
\ No newline at end of file
+        file_name = input("Enter file name: ").strip()
+        print("Which type of information would you like to extract?")
+        print("ipaddress\ntimestamp\nhttpmethod\nstatuscode\nresponsesize")
+        log_data = input("Enter one of the options above: ").strip()
+        if log_data == "ipaddress":
+            try:
+                with open(file_name, 'r') as file:
+                    file_contents = file.read()
+                ipaddresses = re.findall(r'(?P<ipaddresses>^\d\S+)', file_contents, re.MULTILINE)
+                response = input("Do you want to view or save? ").strip()
+                if response.lower() == "save":
+                    filename = input("Enter a file name: ").strip()
+                    with open(filename, 'w') as outfile:
+                        outfile.write('\n'.join(ipaddresses))
+                elif response.lower() == "view":
+                    print('\n'.join(ipaddresses))
+                else:
+                    print('\n'.join(ipaddresses))
+            except FileNotFoundError as e:
+                print(f"An error occurred: {e}")
+            except PermissionError as e:
+                print(f"An error occurred: {e}")
+            except Exception as e:
+                print(f"An error occurred: {e}")
+        elif log_data == "timestamp":
+            try:
+                with open(file_name, 'r') as file:
+                    file_contents = file.read()
+                timestamps = re.findall(r'(?P<timestamp>.{26})(?<=\d)\]', file_contents)
+                response = input("Do you want to view or save? ").strip()
+                if response.lower() == "save":
+                    filename = input("Enter a file name: ").strip()
+                    with open(filename, 'w') as outfile:
+                        outfile.write('\n'.join(timestamps))
+                elif response.lower() == "view":
+                    print('\n'.join(timestamps))
+                else:
+                    print('\n'.join(timestamps))
+            except FileNotFoundError as e:
+                print(f"An error occurred: {e}")
+            except PermissionError as e:
+                print(f"An error occurred: {e}")
+            except Exception as e:
+                print(f"An error occurred: {e}")
+        elif log_data == "httpmethod":
+            try:
+                with open(file_name, 'r') as file:
+                    file_contents = file.read()
+                httpmethods = re.findall(r'"(?=\w)(?P<httpmethod>\w+.*?\w)"', file_contents)
+                response = input("Do you want to view or save? ").strip()
+                if response.lower() == "save":
+                    filename = input("Enter a file name: ").strip()
+                    with open(filename, 'w') as outfile:
+                        outfile.write('\n'.join(httpmethods))
+                elif response.lower() == "view":
+                    print('\n'.join(httpmethods))
+                else:
+                    print('\n'.join(httpmethods))
+            except FileNotFoundError as e:
+                print(f"An error occurred: {e}")
+            except PermissionError as e:
+                print(f"An error occurred: {e}")
+            except Exception as e:
+                print(f"An error occurred: {e}")
+        elif log_data == "statuscode":
+            try:
+                with open(file_name, 'r') as file:
+                    file_contents = file.read()
+                statuscodes = re.findall(r'(?<=".\s)(?P<statuscode>\d+)', file_contents)
+                response = input("Do you want to view or save? ").strip()
+                if response.lower() == "save":
+                    filename = input("Enter a file name: ").strip()
+                    with open(filename, 'w') as outfile:
+                        outfile.write('\n'.join(statuscodes))
+                elif response.lower() == "view":
+                    print('\n'.join(statuscodes))
+                else:
+                    print('\n'.join(statuscodes))
+            except FileNotFoundError as e:
+                print(f"An error occurred: {e}")
+            except PermissionError as e:
+                print(f"An error occurred: {e}")
+            except Exception as e:
+                print(f"An error occurred: {e}")
+        elif log_data == "responsesize":
+            try:
+                with open(file_name, 'r') as file:
+                    file_contents = file.read()
+                response_sizes = re.findall(r'(?P<response_size>\d+$)', file_contents, re.MULTILINE)
+                response = input("Do you want to view or save? ").strip()
+                if response.lower() == "save":
+                    filename = input("Enter a file name: ").strip()
+                    with open(filename, 'w') as outfile:
+                        outfile.write('\n'.join(response_sizes))
+                elif response.lower() == "view":
+                    print('\n'.join(response_sizes))
+                else:
+                    print('\n'.join(response_sizes))
+            except FileNotFoundError as e:
+                print(f"An error occurred: {e}")
+            except PermissionError as e:
+                print(f"An error occurred: {e}")
+            except Exception as e:
+                print(f"An error occurred: {e}")
+        else:
+            print(f"Log Data '{log_data}' doesn't exist!!!")
+
+
+if __name__ == "__main__":
+    if any(arg.startswith("-") for arg in sys.argv[1:]):
+        sys.exit(main(sys.argv[1:]))
+    interactive_main()
@@ -1,50 +1,262 @@
+import heapq
 import json
 import os
+import sqlite3
+import threading
 from datetime import datetime, timedelta
 
-class TaskManager:
+class JsonFileStorage:
+    """Whole-file JSON: every change rewrites the file."""
+
     def __init__(self, filename='tasks.json'):
         self.filename = filename
-        self.tasks = self.load_tasks()
+        self.tasks = {}  # id -> task
+        self.next_id = None  # Next task id to hand out, once one has been stored
 
-    def load_tasks(self):
+    def load(self):
         # Change 'w' to 'r' to read from the file instead of overwriting it
         if os.path.exists(self.filename):
             try:
                 with open(self.filename, 'r') as file:
-                    return json.load(file)
+                    data = json.load(file)
+                # Files written before ids were persisted hold just the array of tasks
+                if isinstance(data, dict):
+                    self.next_id = data.get("next_id")
+                    data = data.get("tasks", [])
+                self.tasks = {task["id"]: task for task in data}
             except json.JSONDecodeError:
                 # Handle JSON decoding errors
-                return []
-        return []
+                self.tasks = {}
+        return list(self.tasks.values())
 
-    def save_tasks(self):
+    def put(self, task, next_id=None):
+        self.tasks[task["id"]] = task
+        self.save_all(list(self.tasks.values()), next_id)
+
+    def delete(self, task_id):
+        self.tasks.pop(task_id, None)
+        self.save_all(list(self.tasks.values()))
+
+    def save_all(self, tasks, next_id=None):
+        self.tasks = {task["id"]: task for task in tasks}
+        if next_id is not None:
+            self.next_id = next_id
+        data = tasks if self.next_id is None else {"next_id": self.next_id, "tasks": tasks}
         # Change 'r' to 'w' to write to the file instead of reading from it
         try:
             with open(self.filename, 'w') as file:
-                json.dump(self.tasks, file, indent=2)
+                json.dump(data, file, indent=2)
         except Exception as e:
             # Handle file writing errors
             print(f"Error saving tasks: {str(e)}")
 
+
+class JournalStorage:
+    """Append-only journal: one JSON line per change, compacted once mostly stale."""
+
+    def __init__(self, filename='tasks.journal', compact_after=1000):
+        self.filename = filename
+        self.compact_after = compact_after
+        self.tasks = {}
+        self.records = 0
+        self.next_id = None  # Carried by put records that add a task, and by the first compacted record
+        self.file = None
+
+    def load(self):
+        self.tasks = {}
+        self.records = 0
+        self.next_id = None
+        if os.path.exists(self.filename):
+            good_end = 0  # Offset just past the last intact record
+            with open(self.filename, 'rb') as file:
+                for line in file:
+                    if not line.endswith(b'\n'):
+                        break  # A torn final write, cut off before its newline
+                    if line.strip():
+                        try:
+                            record = json.loads(line)
+                        except (json.JSONDecodeError, UnicodeDecodeError):
+                            break  # A torn write; everything before it is intact
+                        if record["op"] == "put":
+                            self.tasks[record["task"]["id"]] = record["task"]
+                        elif record["op"] == "delete":
+                            self.tasks.pop(record["id"], None)
+                        if "next_id" in record:
+                            self.next_id = record["next_id"]
+                        self.records += 1
+                    good_end += len(line)
+            # Drop the torn tail, or records appended after it would be lost on the next load
+            if good_end < os.path.getsize(self.filename):
+                with open(self.filename, 'r+b') as file:
+                    file.truncate(good_end)
+        self.file = open(self.filename, 'a')
+        return list(self.tasks.values())
+
+    def _append(self, record):
+        self.file.write(json.dumps(record, separators=(',', ':')) + '\n')
+        self.file.flush()
+        self.records += 1
+        if self.records > self.compact_after and self.records > 2 * len(self.tasks):
+            self.compact()
+
+    def put(self, task, next_id=None):
+        self.tasks[task["id"]] = task
+        record = {"op": "put", "task": task}
+        if next_id is not None:
+            self.next_id = record["next_id"] = next_id  # Written with the task, so both land or neither does
+        self._append(record)
+
+    def delete(self, task_id):
+        self.tasks.pop(task_id, None)
+        self._append({"op": "delete", "id": task_id})
+
+    def save_all(self, tasks, next_id=None):
+        self.tasks = {task["id"]: task for task in tasks}
+        if next_id is not None:
+            self.next_id = next_id
+        self.compact()
+
+    def compact(self):
+        # Rewrite the journal with one record per live task, then swap it in atomically
+        temporary = self.filename + '.tmp'
+        with open(temporary, 'w') as file:
+            if self.next_id is not None:
+                file.write(json.dumps({"op": "meta", "next_id": self.next_id}, separators=(',', ':')) + '\n')
+            for task in self.tasks.values():
+                file.write(json.dumps({"op": "put", "task": task}, separators=(',', ':')) + '\n')
+        if self.file is not None:
+            self.file.close()
+        os.replace(temporary, self.filename)
+        self.file = open(self.filename, 'a')
+        self.records = len(self.tasks)
+
+
+class SQLiteStorage:
+    """SQLite file with one row per task, keyed by id."""
+
+    def __init__(self, filename='tasks.db'):
+        self.filename = filename
+        self.connection = sqlite3.connect(filename, check_same_thread=False)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS tasks (id INTEGER PRIMARY KEY, data TEXT NOT NULL)")
+        # One row holding the next task id to hand out
+        self.connection.execute("CREATE TABLE IF NOT EXISTS counters (next_id INTEGER NOT NULL)")
+        self.connection.commit()
+        self.next_id = None
+
+    def load(self):
+        row = self.connection.execute("SELECT next_id FROM counters").fetchone()
+        self.next_id = row[0] if row is not None else None
+        rows = self.connection.execute("SELECT data FROM tasks ORDER BY id")
+        return [json.loads(data) for (data,) in rows]
+
+    def _store_next_id(self, next_id):
+        self.next_id = next_id
+        self.connection.execute("DELETE FROM counters")
+        self.connection.execute("INSERT INTO counters (next_id) VALUES (?)", (next_id,))
+
+    def put(self, task, next_id=None):
+        with self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO tasks (id, data) VALUES (?, ?)",
+                                    (task["id"], json.dumps(task)))
+            if next_id is not None:
+                self._store_next_id(next_id)
+
+    def delete(self, task_id):
+        with self.connection:
+            self.connection.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+
+    def save_all(self, tasks, next_id=None):
+        with self.connection:
+            if next_id is not None:
+                self._store_next_id(next_id)
+            self.connection.execute("DELETE FROM tasks")
+            self.connection.executemany("INSERT INTO tasks (id, data) VALUES (?, ?)",
+                                        [(task["id"], json.dumps(task)) for task in tasks])
+
+
+def open_storage(filename):
+    # Pick the backend from the file extension; anything else is the original tasks.json format
+    extension = os.path.splitext(filename)[1].lower()
+    if extension in ('.db', '.sqlite', '.sqlite3'):
+        return SQLiteStorage(filename)
+    if extension in ('.journal', '.jsonl'):
+        return JournalStorage(filename)
+    return JsonFileStorage(filename)
+
+
+PRIORITIES = ("High", "Medium", "Low")  # Display order
+OVERDUE_AFTER = timedelta(minutes=3)
+
+
+class Task:
+    __slots__ = ("id", "title", "description", "completed", "created_at", "priority", "overdue")
+
+    def __init__(self, id, title, description="", completed=False, created_at=None, priority="Low", overdue=False):
+        self.id = id
+        self.title = title
+        self.description = description
+        self.completed = completed
+        self.created_at = created_at if created_at is not None else datetime.now().isoformat()
+        self.priority = priority
+        self.overdue = overdue
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["id"], data["title"], data.get("description", ""), data.get("completed", False),
+                   data.get("created_at"), data.get("priority", "Low"), data.get("overdue", False))
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class TaskManager:
+    def __init__(self, filename='tasks.json', storage=None):
+        self.filename = filename
+        self.storage = storage if storage is not None else open_storage(filename)
+        self.tasks = {}  # id -> Task, in insertion order
+        self.by_priority = {priority: {} for priority in PRIORITIES}  # priority -> {id: Task}
+        self.deadlines = []  # Min-heap of (overdue deadline, id) for tasks that may still become overdue
+        self.lock = threading.RLock()
+        self.wakeup = threading.Condition(self.lock)
+        self.scheduler = None
+        self.load_tasks()
+        # Ids are never reused: the counter is stored with the tasks, and only rebuilt from the
+        # highest id for storage written before it was kept
+        stored = self.storage.next_id
+        self.next_id = stored if stored is not None else max(self.tasks, default=0) + 1
+
+    def load_tasks(self):
+        for data in self.storage.load():
+            task = Task.from_dict(data)
+            if task.priority not in PRIORITIES:
+                # A priority this version does not know would file the task where it is never displayed
+                task.priority = self.assign_priority(task.title, task.description)
+            self._index(task)
+        return self.tasks
+
+    def save_tasks(self):
+        self.storage.save_all([task.to_dict() for task in self.tasks.values()], self.next_id)
+
+    def _index(self, task):
+        self.tasks[task.id] = task
+        self.by_priority[task.priority][task.id] = task
+        if not task.completed and not task.overdue:
+            deadline = datetime.fromisoformat(task.created_at) + OVERDUE_AFTER
+            heapq.heappush(self.deadlines, (deadline, task.id))
+
     def add_task(self, title, description=""):
-        # Check if title is not empty
-        if not title.strip():
-            print("Task title cannot be empty.")
-            return
-        
-        new_task = {
-            "id": self.tasks[-1]["id"] + 1 if self.tasks else 1,
-            "title": title,
-            "description": description,
-            "completed": False,
-            "created_at": datetime.now().isoformat(),
-            "priority": self.assign_priority(title, description),
-            "overdue": False
-        }
-        self.tasks.append(new_task)
-        self.save_tasks()
-        print(f"Task '{title}' added successfully with priority: {new_task['priority']}!")
+        with self.lock:
+            # Check if title is not empty
+            if not title.strip():
+                print("Task title cannot be empty.")
+                return
+
+            new_task = Task(self.next_id, title, description, priority=self.assign_priority(title, description))
+            self.next_id += 1
+            self._index(new_task)
+            self.wakeup.notify()  # The scheduler may be sleeping towards a later deadline
+            self.storage.put(new_task.to_dict(), self.next_id)
+            print(f"Task '{title}' added successfully with priority: {new_task.priority}!")
 
     def assign_priority(self, title, description):
         keywords = ["urgent", "important", "high"]
@@ -54,43 +266,74 @@ class TaskManager:
         return "Medium" if len(combined) > 20 else "Low"
 
     def check_overdue_tasks(self):
-        now = datetime.now()
-        for task in self.tasks:
-            created_time = datetime.fromisoformat(task["created_at"])
-            if not task["completed"] and now - created_time > timedelta(minutes=3):
-                task["overdue"] = True  # Set overdue to True
-                print(f"Notification: Task '{task['title']}' is overdue!")
-        self.save_tasks()
+        # Only pop deadlines that have passed; entries for deleted or completed tasks are dropped lazily
+        with self.lock:
+            now = datetime.now()
+            while self.deadlines and self.deadlines[0][0] <= now:
+                _, task_id = heapq.heappop(self.deadlines)
+                task = self.tasks.get(task_id)
+                if task is None or task.completed or task.overdue:
+                    continue
+                task.overdue = True  # Set overdue to True
+                self.storage.put(task.to_dict())  # Only write tasks that changed
+                print(f"Notification: Task '{task.title}' is overdue!")
+
+    def start_scheduler(self):
+        # Notify from a background thread as each deadline passes, without polling every task
+        with self.lock:
+            if self.scheduler is None:
+                self.scheduler = threading.Thread(target=self._run_scheduler, daemon=True)
+                self.scheduler.start()
+
+    def stop_scheduler(self):
+        with self.lock:
+            scheduler, self.scheduler = self.scheduler, None
+            self.wakeup.notify()
+        if scheduler is not None:
+            scheduler.join()
+
+    def _run_scheduler(self):
+        with self.lock:
+            while self.scheduler is threading.current_thread():
+                timeout = None
+                if self.deadlines:
+                    timeout = (self.deadlines[0][0] - datetime.now()).total_seconds()
+                    if timeout <= 0:
+                        self.check_overdue_tasks()
+                        continue
+                self.wakeup.wait(timeout)
 
     def display_tasks(self):
         if not self.tasks:
             print("No tasks available.")
         else:
-            # Sort tasks by priority before displaying
-            sorted_tasks = sorted(self.tasks, key=lambda x: ["Low", "Medium", "High"].index(x["priority"]), reverse=True)
-            for task in sorted_tasks:
-                status = "Completed" if task["completed"] else "Incomplete"
-                overdue = "Overdue" if task.get("overdue") else "On Time"
-                print(f"ID: {task['id']}, Title: {task['title']}, Status: {status}, Priority: {task['priority']}, {overdue}")
+            # Walk the priority buckets instead of sorting every task
+            for priority in PRIORITIES:
+                for task in self.by_priority[priority].values():
+                    status = "Completed" if task.completed else "Incomplete"
+                    overdue = "Overdue" if task.overdue else "On Time"
+                    print(f"ID: {task.id}, Title: {task.title}, Status: {status}, Priority: {task.priority}, {overdue}")
 
     def delete_task(self, task_id):
-        for i, task in enumerate(self.tasks):  # Iterate over self.tasks instead of task_id
-            if task['id'] == task_id:
-                del self.tasks[i]
-                self.save_tasks()
-                print(f"Task with ID {task_id} deleted.")
+        with self.lock:
+            task = self.tasks.pop(task_id, None)
+            if task is None:
+                print(f"Task with ID {task_id} not found.")
                 return
-        print(f"Task with ID {task_id} not found.")
+            del self.by_priority[task.priority][task_id]
+            self.storage.delete(task_id)
+            print(f"Task with ID {task_id} deleted.")
 
     def mark_task_completed(self, task_id):
-        for task in self.tasks:
-            if task['id'] == task_id:  # Compare with task_id instead of task["id"]
-                task['completed'] = True
-                task['overdue'] = False  # Set overdue to False
-                self.save_tasks()
-                print(f"Task with ID {task_id} marked as completed.")
+        with self.lock:
+            task = self.tasks.get(task_id)
+            if task is None:
+                print(f"Task with ID {task_id} not found.")
                 return
-        print(f"Task with ID {task_id} not found.")
+            task.completed = True
+            task.overdue = False  # Set overdue to False
+            self.storage.put(task.to_dict())
+            print(f"Task with ID {task_id} marked as completed.")
 
 def main():
     manager = TaskManager()
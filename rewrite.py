@@ -1,13 +1,108 @@
-import re
+import hashlib
+import sys
+from array import array
+from collections import OrderedDict
+from itertools import accumulate, islice, repeat
+from operator import add
+
+CHUNK_SIZE = 64 * 1024  # Characters read at a time when paginating lazily
+
+
+class LRUCache:
+    # Mapping that forgets its least recently used entries beyond a fixed size
+    def __init__(self, size):
+        self.size = size
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is not None:
+            self.entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+
+# Shared by every ArticleManager, so re-quoting an article reuses earlier work
+LAYOUT_CACHE = LRUCache(256)   # text hash -> word offsets
+PAGE_CACHE = LRUCache(4096)    # (text hash, words_per_line, lines_per_page, page index) -> page
+
+
+def word_offsets(text, start, end):
+    # Start offset of each word of re.split(' ', text[start:end]), followed by end + 1.
+    # Words are separated by exactly one space, so words a..b-1 are text[offsets[a]:offsets[b] - 1].
+    lengths = map(add, map(len, text[start:end].split(' ')), repeat(1))
+    return array('q', accumulate(lengths, initial=start))
+
+
+def iter_words(chunks):
+    # Same words as re.split(' ', text.strip()), read from text chunks one at a time.
+    # Whitespace-only words and the last word's trailing whitespace are held back
+    # until more text arrives, since strip() drops them at the end of the text.
+    pending = ''
+    previous = None
+    held = []
+    started = False
+    for chunk in chunks:
+        if not started:
+            chunk = chunk.lstrip()
+            if not chunk:
+                continue
+            started = True
+        parts = (pending + chunk).split(' ')
+        pending = parts.pop()
+        # Everything up to the chunk's last non-blank word is final already
+        last = len(parts) - 1
+        while last >= 0 and not parts[last].strip():
+            last -= 1
+        if last < 0:
+            held.extend(parts)
+            continue
+        if previous is not None:
+            yield previous
+            yield from held
+        yield from islice(parts, last)
+        previous = parts[last]
+        held = parts[last + 1:]
+    if pending.strip():
+        if previous is not None:
+            yield previous
+            yield from held
+        previous = pending
+    if previous is not None:
+        yield previous.rstrip()
+
+
+def iter_pages(words, words_per_line, lines_per_page):
+    # Group words into pages of lines, holding only the current page in memory.
+    words = iter(words)
+    words_per_page = words_per_line * lines_per_page
+    while True:
+        page_words = list(islice(words, words_per_page))
+        if not page_words:
+            return
+        yield '\n'.join(' '.join(page_words[j:j + words_per_line])
+                         for j in range(0, len(page_words), words_per_line))
+
 
 class ArticleManager:
     def __init__(self, article_text, options=None):
+        # article_text is a string, or an iterable of text chunks such as an open file
         if options is None:
             options = {}
         
         self.article_text = article_text
+        self.path = None
         self.pages = []
         self.words = []
+        self.page_count = 0
+        self.text_hash = None      # Digest of article_text, updated incrementally by append_text
+        self.hashed_text = None
+        self.hasher = None
         self.options = {
             'words_per_line': options['words_per_line'] or 12 if 'words_per_line' in options else 12,
             'lines_per_page': options['lines_per_page'] or 20 if 'lines_per_page' in options else 20,
@@ -20,30 +115,128 @@ class ArticleManager:
             })
         }
 
-    def split_into_pages(self):
+    @classmethod
+    def from_file(cls, path, options=None):
+        # Paginate a manuscript straight from disk; the text is never held in memory
+        manager = cls(None, options)
+        manager.path = path
+        return manager
+
+    def iter_chunks(self):
+        if self.path is not None:
+            with open(self.path) as file:
+                yield from iter(lambda: file.read(CHUNK_SIZE), '')
+        elif isinstance(self.article_text, str):
+            for start in range(0, len(self.article_text), CHUNK_SIZE):
+                yield self.article_text[start:start + CHUNK_SIZE]
+        else:
+            yield from self.article_text
+
+    def text_key(self):
+        # Hash of the text, recomputed only if article_text was replaced
+        if self.hashed_text is not self.article_text:
+            self.hasher = hashlib.blake2b(self.article_text.encode())
+            self.text_hash = self.hasher.hexdigest()
+            self.hashed_text = self.article_text
+        return self.text_hash
+
+    def layout(self):
+        # Word offsets are computed once per distinct text; page boundaries follow arithmetically
+        key = self.text_key()
+        offsets = LAYOUT_CACHE.get(key)
+        if offsets is None:
+            text = self.article_text
+            start = len(text) - len(text.lstrip())
+            end = len(text.rstrip())
+            offsets = word_offsets(text, start, end) if start < end else array('q', [0])
+            LAYOUT_CACHE.put(key, offsets)
+        return offsets
+
+    def total_pages(self):
+        words_per_page = self.options['words_per_line'] * self.options['lines_per_page']
+        return -(-(len(self.layout()) - 1) // words_per_page)
+
+    def get_page(self, index):
+        # Render one page on first access; later requests come from the page cache
         words_per_line = self.options['words_per_line']
         lines_per_page = self.options['lines_per_page']
+        key = (self.text_key(), words_per_line, lines_per_page, index)
+        page = PAGE_CACHE.get(key)
+        if page is None:
+            offsets = self.layout()
+            words = len(offsets) - 1
+            first = index * words_per_line * lines_per_page
+            last = min(first + words_per_line * lines_per_page, words)
+            if index < 0 or first >= last:
+                raise IndexError(f"page {index} is out of range")
+            text = self.article_text
+            page = '\n'.join(text[offsets[j]:offsets[min(j + words_per_line, last)] - 1]
+                             for j in range(first, last, words_per_line))
+            PAGE_CACHE.put(key, page)
+        return page
+
+    def append_text(self, text):
+        # Only words from the old last word onwards are re-tokenized, and only the
+        # pages from the one holding that word onwards will be rendered again
+        if not isinstance(self.article_text, str):
+            raise TypeError("append_text() needs an article held as a string")
+        old_key = self.text_key()
+        offsets = self.layout()
+        words = len(offsets) - 1
+        old_end = offsets[-1] - 1
+        self.article_text += text
+        self.hasher.update(text.encode())
+        self.text_hash = self.hasher.hexdigest()
+        self.hashed_text = self.article_text
+        if words == 0:
+            return
+        if text.strip():
+            end = len(self.article_text) - (len(text) - len(text.rstrip()))
+        else:
+            end = old_end
+        tail_start = offsets[words - 1]
+        new_offsets = offsets[:words - 1]
+        new_offsets.extend(word_offsets(self.article_text, tail_start, end))
+        LAYOUT_CACHE.put(self.text_hash, new_offsets)
 
-        self.words = re.split(' ', self.article_text.strip())
-        total_pages = -(-len(self.words) // (words_per_line * lines_per_page))  # equivalent to math.ceil
+        words_per_line = self.options['words_per_line']
+        lines_per_page = self.options['lines_per_page']
+        for index in range((words - 1) // (words_per_line * lines_per_page)):
+            page = PAGE_CACHE.get((old_key, words_per_line, lines_per_page, index))
+            if page is not None:
+                PAGE_CACHE.put((self.text_hash, words_per_line, lines_per_page, index), page)
 
-        for i in range(total_pages + 1):
-            page_words = self.words[i * words_per_line * lines_per_page:(i + 1) * words_per_line * lines_per_page]
-            page_lines = []
+    def iter_pages(self):
+        # Yield pages one at a time, keeping a running count for calculate_payment
+        self.page_count = 0
+        if isinstance(self.article_text, str) and self.path is None:
+            pages = (self.get_page(index) for index in range(self.total_pages()))
+        else:
+            pages = iter_pages(iter_words(self.iter_chunks()),
+                               self.options['words_per_line'], self.options['lines_per_page'])
+        for page in pages:
+            self.page_count += 1
+            yield page
 
-            # Split the page into lines
-            for j in range(0, len(page_words), words_per_line):
-                page_lines.append(' '.join(page_words[j:j + words_per_line]))
+    def split_into_pages(self):
+        self.pages = list(self.iter_pages())
 
-            # Join the lines into a single string
-            page = '\n'.join(page_lines)
+    def quote(self):
+        # Payment from the page boundaries alone, without rendering any page
+        if isinstance(self.article_text, str) and self.path is None:
+            return self.calculate_payment(self.total_pages())
+        return self.calculate_payment(self.count_pages())
 
-            # Add the page to the list of pages
-            self.pages.append(page)
+    def count_pages(self):
+        # Bill without keeping any page: only the running count survives
+        for _ in self.iter_pages():
+            pass
+        return self.page_count
 
-    def calculate_payment(self):
+    def calculate_payment(self, total_pages=None):
         payment_structure = self.options['payment_structure']
-        total_pages = len(self.pages)
+        if total_pages is None:
+            total_pages = self.page_count
 
         # Find the payment for the total number of pages
         payment = payment_structure.get(total_pages, payment_structure['default'])
@@ -63,6 +256,17 @@ class ArticleManager:
         self.split_into_pages()
         self.display_pages()
 
+    def stream_pages(self, out=None):
+        # Like process_article, but each page is written as soon as it is laid out,
+        # so the totals come last instead of first
+        if out is None:
+            out = sys.stdout
+        for index, page in enumerate(self.iter_pages()):
+            out.write(f"\nPage {index + 1}:\n{page}\n\n")
+        out.write(f"Total Pages: {self.page_count}\n")
+        out.write(f"Payment Due: ${self.calculate_payment()}\n")
+        return self.page_count
+
 # Example usage
 article_text = """Lorem ipsum dolor sit amet, consectetur adipiscing elit. Sed do eiusmod tempor incididunt ut labore 
 et dolore magna aliqua. Ut enim ad minim veniam, quis nostrud exercitation ullamco laboris nisi ut aliquip ex ea 
@@ -0,0 +1,432 @@
+#include "creditcard.h"
+
+#include <errno.h>
+#include <netdb.h>
+#include <netinet/in.h>
+#include <netinet/tcp.h>
+#include <pthread.h>
+#include <signal.h>
+#include <stdlib.h>
+#include <string.h>
+#include <sys/socket.h>
+#include <sys/un.h>
+#include <time.h>
+#include <unistd.h>
+
+/**
+ * @file serve_cards.c
+ * @brief Implementation of the validation server that answers card numbers sent over a socket.
+ */
+
+/**
+ * @brief Size of each connection's input and output buffers.
+ */
+#define SERVE_BUFFER_SIZE (1 << 16)
+
+/**
+ * @brief Longest response line: "VALID " and the longest network name, with the newline.
+ */
+#define SERVE_RESPONSE_MAX 24
+
+/**
+ * @brief Milliseconds to wait before accepting again after accept() fails, e.g. when out of file descriptors.
+ */
+#define SERVE_ACCEPT_BACKOFF_MS 100
+
+/**
+ * @brief A client connection and the issuer ranges it validates against.
+ *
+ * Live connections are kept in a list, so the server can shut them down and wait
+ * for their threads before the issuer ranges are freed.
+ */
+typedef struct serve_connection
+{
+    const bin_table *bins;
+    int fd;
+    struct serve_connection *previous;
+    struct serve_connection *next;
+} serve_connection;
+
+/**
+ * @brief The live connections, guarded by `connections_lock`.
+ */
+static pthread_mutex_t connections_lock = PTHREAD_MUTEX_INITIALIZER;
+static pthread_cond_t connections_closed = PTHREAD_COND_INITIALIZER;
+static serve_connection *connections = NULL;
+
+/**
+ * @brief Set by SIGINT or SIGTERM to stop accepting connections.
+ */
+static volatile sig_atomic_t stopping = 0;
+
+/**
+ * @brief Signal handler that asks the accept loop to stop.
+ */
+static void stop_serving(int signal_number)
+{
+    (void) signal_number;
+    stopping = 1;
+}
+
+/**
+ * @brief Writes a whole buffer to a socket.
+ *
+ * @return 0 on success, 1 if the client went away.
+ */
+static int write_all(int fd, const char *data, size_t length)
+{
+    while (length > 0)
+    {
+        ssize_t sent = write(fd, data, length);
+        if (sent < 0)
+        {
+            if (errno == EINTR)
+            {
+                continue;
+            }
+            return 1;
+        }
+        data += sent;
+        length -= (size_t) sent;
+    }
+
+    return 0;
+}
+
+/**
+ * @brief Appends the response line for one card number to the output buffer.
+ */
+static size_t append_response(char *output, size_t length, card_network network)
+{
+    const char *name = card_network_name(network);
+    size_t name_length = strlen(name);
+
+    if (network != CARD_INVALID)
+    {
+        memcpy(output + length, "VALID ", 6);
+        length += 6;
+    }
+    memcpy(output + length, name, name_length);
+    length += name_length;
+    output[length++] = '\n';
+    return length;
+}
+
+/**
+ * @brief Connection thread: answers every line a client sends, in order, until it disconnects.
+ *
+ * Each read is split into lines, and the responses to every complete line it
+ * holds are sent back with one write, so a client may pipeline as many numbers as
+ * it likes without waiting for the answers. A line longer than CARD_LINE_MAX
+ * characters is answered with INVALID without being buffered.
+ */
+static void *serve_client(void *argument)
+{
+    serve_connection *connection = argument;
+    char *input = malloc(SERVE_BUFFER_SIZE);
+    char *output = malloc(SERVE_BUFFER_SIZE);
+    size_t used = 0;
+    int skipping = 0;
+
+    while (input != NULL && output != NULL)
+    {
+        ssize_t received = read(connection->fd, input + used, SERVE_BUFFER_SIZE - used);
+        if (received < 0 && errno == EINTR)
+        {
+            continue;
+        }
+
+        int closed = received <= 0;
+        size_t output_length = 0;
+        char *line = input;
+        char *end = input + used + (closed ? 0 : (size_t) received);
+        char *newline;
+
+        // At end of input, an unterminated last line is answered like any other.
+        while ((newline = memchr(line, '\n', (size_t) (end - line))) != NULL || (closed && (line < end || skipping)))
+        {
+            char *next = newline != NULL ? newline + 1 : end;
+            card_network network = skipping ? CARD_INVALID : validate_card_line(connection->bins, line, (size_t) (next - line));
+
+            skipping = 0;
+            if (output_length + SERVE_RESPONSE_MAX > SERVE_BUFFER_SIZE)
+            {
+                if (write_all(connection->fd, output, output_length) != 0)
+                {
+                    closed = 1;
+                    line = end;
+                    output_length = 0;
+                    break;
+                }
+                output_length = 0;
+            }
+            output_length = append_response(output, output_length, network);
+            line = next;
+        }
+
+        if (output_length > 0 && write_all(connection->fd, output, output_length) != 0)
+        {
+            closed = 1;
+        }
+        if (closed)
+        {
+            break;
+        }
+
+        // Keep the partial last line, or drop it once it is too long to be a card number.
+        used = (size_t) (end - line);
+        if (used > CARD_LINE_MAX + 1)
+        {
+            skipping = 1;
+            used = 0;
+        }
+        else
+        {
+            memmove(input, line, used);
+        }
+    }
+
+    free(input);
+    free(output);
+
+    // Leave the list before closing, so shutdown never reaches a reused descriptor.
+    pthread_mutex_lock(&connections_lock);
+    if (connection->previous != NULL)
+    {
+        connection->previous->next = connection->next;
+    }
+    else
+    {
+        connections = connection->next;
+    }
+    if (connection->next != NULL)
+    {
+        connection->next->previous = connection->previous;
+    }
+    close(connection->fd);
+    pthread_cond_broadcast(&connections_closed);
+    pthread_mutex_unlock(&connections_lock);
+
+    free(connection);
+    return NULL;
+}
+
+/**
+ * @brief Opens a listening socket for an address.
+ *
+ * @param address "unix:PATH" for a Unix domain socket, "tcp:PORT" for TCP on
+ *                localhost, or "tcp:HOST:PORT".
+ * @param is_tcp Set to 1 for a TCP socket, 0 for a Unix domain socket.
+ * @return The socket, or -1 on failure (errno is set).
+ */
+static int open_listener(const char *address, int *is_tcp)
+{
+    int fd = -1;
+
+    if (strncmp(address, "unix:", 5) == 0)
+    {
+        struct sockaddr_un local;
+        const char *path = address + 5;
+
+        if (strlen(path) == 0 || strlen(path) >= sizeof(local.sun_path))
+        {
+            errno = EINVAL;
+            return -1;
+        }
+        memset(&local, 0, sizeof(local));
+        local.sun_family = AF_UNIX;
+        strcpy(local.sun_path, path);
+
+        fd = socket(AF_UNIX, SOCK_STREAM, 0);
+        if (fd < 0)
+        {
+            return -1;
+        }
+        // A socket file left by a previous run would make bind() fail.
+        unlink(path);
+        if (bind(fd, (struct sockaddr *) &local, sizeof(local)) != 0)
+        {
+            close(fd);
+            return -1;
+        }
+        *is_tcp = 0;
+    }
+    else if (strncmp(address, "tcp:", 4) == 0)
+    {
+        char host[256] = "127.0.0.1";
+        const char *port = address + 4;
+        const char *colon = strrchr(port, ':');
+        struct addrinfo hints, *found;
+        int one = 1;
+
+        if (colon != NULL)
+        {
+            if ((size_t) (colon - port) >= sizeof(host))
+            {
+                errno = EINVAL;
+                return -1;
+            }
+            memcpy(host, port, (size_t) (colon - port));
+            host[colon - port] = '\0';
+            port = colon + 1;
+        }
+
+        memset(&hints, 0, sizeof(hints));
+        hints.ai_family = AF_UNSPEC;
+        hints.ai_socktype = SOCK_STREAM;
+        hints.ai_flags = AI_PASSIVE;
+        if (getaddrinfo(host, port, &hints, &found) != 0)
+        {
+            errno = EINVAL;
+            return -1;
+        }
+
+        fd = socket(found->ai_family, found->ai_socktype, found->ai_protocol);
+        if (fd < 0)
+        {
+            freeaddrinfo(found);
+            return -1;
+        }
+        setsockopt(fd, SOL_SOCKET, SO_REUSEADDR, &one, sizeof(one));
+        if (bind(fd, found->ai_addr, found->ai_addrlen) != 0)
+        {
+            int error = errno;
+            freeaddrinfo(found);
+            close(fd);
+            errno = error;
+            return -1;
+        }
+        freeaddrinfo(found);
+        *is_tcp = 1;
+    }
+    else
+    {
+        errno = EINVAL;
+        return -1;
+    }
+
+    if (listen(fd, SOMAXCONN) != 0)
+    {
+        int error = errno;
+        close(fd);
+        errno = error;
+        return -1;
+    }
+
+    return fd;
+}
+
+/**
+ * @brief Serves card validation requests on a socket until interrupted.
+ *
+ * Clients send newline-framed card numbers and get one line back per number, in
+ * order: "VALID <NETWORK>" or "INVALID", exactly as with validate_batch(). Every
+ * connection is served by its own thread against the same issuer ranges, which
+ * stay loaded for the life of the server, and requests may be pipelined. SIGINT
+ * or SIGTERM stops accepting connections, shuts down the open ones and waits for
+ * their threads, so the issuer ranges may be freed once this returns, and removes
+ * a Unix domain socket file. When accept() fails for lack of descriptors or
+ * memory, the server waits a moment before accepting again.
+ *
+ * @param bins The issuer ranges.
+ * @param address "unix:PATH", "tcp:PORT" (localhost) or "tcp:HOST:PORT".
+ * @return 0 after a clean shutdown, 1 if the address could not be listened on (errno is set).
+ */
+int serve_cards(const bin_table *bins, const char *address)
+{
+    struct sigaction action;
+    pthread_attr_t attributes;
+    int is_tcp = 0;
+    int listener = open_listener(address, &is_tcp);
+
+    if (listener < 0)
+    {
+        return 1;
+    }
+
+    // Clients that disconnect early must not kill the server, and a stop signal
+    // must interrupt accept() instead of restarting it.
+    signal(SIGPIPE, SIG_IGN);
+    memset(&action, 0, sizeof(action));
+    action.sa_handler = stop_serving;
+    sigemptyset(&action.sa_mask);
+    sigaction(SIGINT, &action, NULL);
+    sigaction(SIGTERM, &action, NULL);
+
+    pthread_attr_init(&attributes);
+    pthread_attr_setdetachstate(&attributes, PTHREAD_CREATE_DETACHED);
+
+    fprintf(stderr, "Listening on %s\n", address);
+
+    while (!stopping)
+    {
+        int fd = accept(listener, NULL, NULL);
+        if (fd < 0)
+        {
+            if (errno != EINTR && errno != ECONNABORTED)
+            {
+                // Retrying at once would spin while the condition lasts.
+                struct timespec backoff = {0, SERVE_ACCEPT_BACKOFF_MS * 1000000L};
+                nanosleep(&backoff, NULL);
+            }
+            continue;
+        }
+
+        if (is_tcp)
+        {
+            int one = 1;
+            setsockopt(fd, IPPROTO_TCP, TCP_NODELAY, &one, sizeof(one));
+        }
+
+        serve_connection *connection = malloc(sizeof(serve_connection));
+        pthread_t thread;
+        if (connection == NULL)
+        {
+            close(fd);
+            continue;
+        }
+        connection->bins = bins;
+        connection->fd = fd;
+        connection->previous = NULL;
+
+        pthread_mutex_lock(&connections_lock);
+        connection->next = connections;
+        if (connections != NULL)
+        {
+            connections->previous = connection;
+        }
+        connections = connection;
+        if (pthread_create(&thread, &attributes, serve_client, connection) != 0)
+        {
+            connections = connection->next;
+            if (connections != NULL)
+            {
+                connections->previous = NULL;
+            }
+            close(fd);
+            free(connection);
+        }
+        pthread_mutex_unlock(&connections_lock);
+    }
+
+    // Wake every connection thread blocked on its client, and wait for all of them.
+    pthread_mutex_lock(&connections_lock);
+    for (serve_connection *connection = connections; connection != NULL; connection = connection->next)
+    {
+        shutdown(connection->fd, SHUT_RDWR);
+    }
+    while (connections != NULL)
+    {
+        pthread_cond_wait(&connections_closed, &connections_lock);
+    }
+    pthread_mutex_unlock(&connections_lock);
+
+    pthread_attr_destroy(&attributes);
+    close(listener);
+    if (!is_tcp)
+    {
+        unlink(address + 5);
+    }
+
+    return 0;
+}
@@ -0,0 +1,79 @@
+import contextlib
+import importlib.machinery
+import io
+import importlib.util
+import os
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_script(name):
+    # The task manager scripts carry a .c extension, so load them by path.
+    path = os.path.join(ROOT, name)
+    loader = importlib.machinery.SourceFileLoader(name.replace('.', '_'), path)
+    spec = importlib.util.spec_from_loader(loader.name, loader)
+    module = importlib.util.module_from_spec(spec)
+    loader.exec_module(module)
+    return module
+
+
+class JournalTornTailTest(unittest.TestCase):
+    def check_torn_tail(self, module, torn):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'tasks.journal')
+            storage = module.JournalStorage(filename)
+            storage.load()
+            storage.put({"id": 1, "title": "one"})
+            storage.put({"id": 2, "title": "two"})
+            storage.file.close()
+            with open(filename, 'ab') as file:
+                file.write(torn)
+
+            storage = module.JournalStorage(filename)
+            self.assertEqual(sorted(task["id"] for task in storage.load()), [1, 2])
+            storage.put({"id": 3, "title": "three"})
+            storage.put({"id": 4, "title": "four"})
+            storage.file.close()
+
+            storage = module.JournalStorage(filename)
+            self.assertEqual(sorted(task["id"] for task in storage.load()), [1, 2, 3, 4])
+            storage.file.close()
+
+    def test_torn_tail(self):
+        for name in ('response1.c', 'response2.c'):
+            module = load_script(name)
+            for torn in (b'{"op":"put","task":{"id":9', b'{"op":"put","task":{"id":9}}', b'\xff\xfe\n'):
+                with self.subTest(script=name, torn=torn):
+                    self.check_torn_tail(module, torn)
+
+
+class NextIdTest(unittest.TestCase):
+    def check_not_reused(self, module, filename):
+        with contextlib.redirect_stdout(io.StringIO()):
+            manager = module.TaskManager(filename)
+            manager.add_task("one", "first")
+            manager.add_task("two", "second")
+            manager.delete_task(2)
+            if isinstance(manager.storage, module.JournalStorage):
+                manager.storage.file.close()
+
+            manager = module.TaskManager(filename)
+            manager.add_task("three", "third")
+        self.assertEqual(sorted(manager.tasks), [1, 3])
+        if isinstance(manager.storage, module.JournalStorage):
+            manager.storage.file.close()
+        elif isinstance(manager.storage, module.SQLiteStorage):
+            manager.storage.connection.close()
+
+    def test_deleted_newest_id_not_reused(self):
+        for name in ('response1.c', 'response2.c'):
+            module = load_script(name)
+            for extension in ('.json', '.journal', '.db'):
+                with self.subTest(script=name, storage=extension), tempfile.TemporaryDirectory() as directory:
+                    self.check_not_reused(module, os.path.join(directory, 'tasks' + extension))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import contextlib
+import io
+import os
+import re
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_university_system():
+    # word2.py is a write-up with the program in a ```python block; run just that block.
+    with open(os.path.join(ROOT, 'word2.py'), encoding='utf-8') as file:
+        code = re.search(r"```python\n(.*?)```", file.read(), re.DOTALL).group(1)
+    namespace = {'__name__': 'word2'}
+    exec(compile(code, 'word2.py', 'exec'), namespace)
+    return namespace['UniversitySystem']
+
+
+class ImportCsvTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.system = load_university_system()(os.path.join(self.directory.name, 'data.json'))
+            self.system.students = {"s1": {"name": "Ann", "courses": {}}, "s2": {"name": "Bob", "courses": {}}}
+            self.system.courses = {"C1": {"name": "Maths"}}
+            self.system.rebuild_indexes()
+
+    def import_csv(self, kind, path):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            imported = self.system.import_csv(kind, path)
+        return imported, output.getvalue()
+
+    def test_short_row_is_skipped(self):
+        path = os.path.join(self.directory.name, 'enrollments.csv')
+        with open(path, 'w', newline='') as file:
+            file.write("student_id,course_id\ns1,C1\ns2\n")
+        imported, output = self.import_csv("enrollments", path)
+        self.assertEqual(imported, 1)
+        self.assertIn("Skipped 1 incomplete row(s)", output)
+        self.assertEqual(self.system.students_in_course("C1"), ["s1"])
+
+    def test_missing_file_prints_an_error(self):
+        imported, output = self.import_csv("students", os.path.join(self.directory.name, 'missing.csv'))
+        self.assertEqual(imported, 0)
+        self.assertTrue(output.startswith("Error: could not open"))
+
+
+if __name__ == '__main__':
+    unittest.main()
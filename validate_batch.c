@@ -0,0 +1,140 @@
+#include "creditcard.h"
+
+#include <string.h>
+#include <time.h>
+
+/**
+ * @file validate_batch.c
+ * @brief Implementation of the functions to validate newline-delimited credit card numbers.
+ */
+
+/**
+ * @brief Validates every line of a stream, writing the results as text or to a columnar file.
+ *
+ * @param columns The columnar writer to append results to, or NULL to write text to `out`.
+ * @return 0 on success, 1 if reading or writing failed.
+ */
+static int validate_stream(const bin_table *bins, FILE *in, FILE *out, columnar_writer *columns, batch_stats *stats)
+{
+    char line[CARD_LINE_MAX + 2];
+    unsigned long long total = 0, valid = 0;
+    unsigned long long reasons[REASON_COUNT] = {0};
+    unsigned long long networks[CARD_NETWORK_COUNT] = {0};
+    unsigned long long stage_ns[STAGE_COUNT] = {0};
+    int timing = stats != NULL && stats->timing;
+    int failed = 0;
+    struct timespec start, end;
+
+    clock_gettime(CLOCK_MONOTONIC, &start);
+
+    while (fgets(line, sizeof(line), in) != NULL)
+    {
+        size_t length = strlen(line);
+        card_network network = CARD_INVALID;
+        card_reason reason = REASON_LENGTH;
+        unsigned long long output_start = 0;
+
+        if (length > 0 && line[length - 1] != '\n' && !feof(in))
+        {
+            // The line is too long to be a card number: skip the rest of it.
+            int c;
+            while ((c = fgetc(in)) != EOF && c != '\n')
+            {
+            }
+        }
+        else if (timing)
+        {
+            network = validate_card_line_timed(bins, line, length, &reason, stage_ns);
+            output_start = clock_ns();
+        }
+        else
+        {
+            network = validate_card_line_reason(bins, line, length, &reason);
+        }
+
+        total++;
+        reasons[reason]++;
+        networks[network]++;
+        if (network != CARD_INVALID)
+        {
+            valid++;
+        }
+
+        if (columns != NULL)
+        {
+            if (columnar_writer_append(columns, network, reason) != 0)
+            {
+                failed = 1;
+                break;
+            }
+        }
+        else if (network != CARD_INVALID)
+        {
+            fputs("VALID ", out);
+            fputs(card_network_name(network), out);
+            fputc('\n', out);
+        }
+        else
+        {
+            fputs("INVALID\n", out);
+        }
+        if (output_start != 0)
+        {
+            stage_ns[STAGE_OUTPUT] += clock_ns() - output_start;
+        }
+    }
+
+    clock_gettime(CLOCK_MONOTONIC, &end);
+
+    if (stats != NULL)
+    {
+        stats->total = total;
+        stats->valid = valid;
+        memcpy(stats->reasons, reasons, sizeof(reasons));
+        memcpy(stats->networks, networks, sizeof(networks));
+        memcpy(stats->stage_ns, stage_ns, sizeof(stage_ns));
+        stats->seconds = (double) (end.tv_sec - start.tv_sec) + (double) (end.tv_nsec - start.tv_nsec) / 1e9;
+    }
+
+    return failed || ferror(in) || (out != NULL && ferror(out)) ? 1 : 0;
+}
+
+/**
+ * @brief Validates every credit card number read from a stream.
+ *
+ * This function reads one card number per line, validates it with a single pass over
+ * its digits, and writes one result line per input line: "VALID <NETWORK>" or
+ * "INVALID". Lines are validated with validate_card_line(), so surrounding whitespace
+ * is ignored and lines longer than CARD_LINE_MAX characters are reported as INVALID.
+ * Every card is counted by network and by rejection reason; when `stats->timing` is
+ * set, the time spent in each stage is measured as well.
+ *
+ * @param bins The issuer ranges.
+ * @param in The stream to read card numbers from.
+ * @param out The stream to write results to.
+ * @param stats Filled with the number of cards read, valid cards, the counts per network and
+ *              reason, and the elapsed and per-stage time; may be NULL.
+ * @return 0 on success, 1 if reading or writing failed.
+ */
+int validate_batch(const bin_table *bins, FILE *in, FILE *out, batch_stats *stats)
+{
+    return validate_stream(bins, in, out, NULL, stats);
+}
+
+/**
+ * @brief Validates every credit card number read from a stream into a columnar results file.
+ *
+ * The numbers are validated as with validate_batch(), but each result is appended
+ * to `columns` as a validity bit, a network byte and a rejection reason byte
+ * instead of being written as text. The writer is left open.
+ *
+ * @param bins The issuer ranges.
+ * @param in The stream to read card numbers from.
+ * @param columns The columnar writer to append results to.
+ * @param stats Filled as by validate_batch(); may be NULL.
+ * @return 0 on success, 1 if reading or writing failed.
+ */
+int validate_batch_columnar(const bin_table *bins, FILE *in, columnar_writer *columns, batch_stats *stats)
+{
+    return validate_stream(bins, in, NULL, columns, stats);
+}
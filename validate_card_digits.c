@@ -0,0 +1,87 @@
+#include "creditcard.h"
+
+/**
+ * @file validate_card_digits.c
+ * @brief Implementation of the functions to validate a credit card number held as a digit string.
+ */
+
+/**
+ * @brief Runs the Luhn check over a string of ASCII digits.
+ *
+ * This function walks the digits once from right to left, adding every last digit
+ * and the looked-up double of every second-to-last digit to the Luhn sum, so numbers
+ * of up to CARD_MAX_LENGTH digits are checked without any division per digit.
+ *
+ * @param digits The credit card number as ASCII digits, most significant first.
+ * @param count The number of digits.
+ * @return REASON_NONE if the sum is a multiple of 10, REASON_FORMAT if a character
+ *         is not a digit, or REASON_CHECKSUM otherwise.
+ */
+card_reason luhn_check_reason(const char *digits, int count)
+{
+    int sum = 0;
+
+    for (int i = count - 1, doubled = 0; i >= 0; --i, doubled ^= 1)
+    {
+        unsigned int digit = (unsigned int) (digits[i] - '0');
+
+        // Reject anything that is not a digit.
+        if (digit > 9)
+        {
+            return REASON_FORMAT;
+        }
+
+        sum += doubled ? luhn_double[digit] : (int) digit;
+    }
+
+    return sum % 10 == 0 ? REASON_NONE : REASON_CHECKSUM;
+}
+
+/**
+ * @brief Validates a credit card number given as a string of ASCII digits, and says why it was rejected.
+ *
+ * The length is checked first, then the Luhn sum with luhn_check_reason(), and the
+ * network is then looked up in the issuer prefix trie. The reason is the first of
+ * these checks the number fails.
+ *
+ * @param bins The issuer ranges.
+ * @param digits The credit card number as ASCII digits, most significant first.
+ * @param count The number of digits.
+ * @param reason Set to REASON_NONE for a valid card, or to the reason it was rejected.
+ * @return The network of the card, or CARD_INVALID if the number is not valid.
+ */
+card_network validate_card_reason(const bin_table *bins, const char *digits, int count, card_reason *reason)
+{
+    // Check if the length is valid.
+    if (get_count_outcome(count) == 1)
+    {
+        *reason = REASON_LENGTH;
+        return CARD_INVALID;
+    }
+
+    *reason = luhn_check_reason(digits, count);
+    if (*reason != REASON_NONE)
+    {
+        return CARD_INVALID;
+    }
+
+    // Find the issuing network from the card's prefix and length.
+    card_network network = bin_table_lookup(bins, digits, count);
+    *reason = network != CARD_INVALID ? REASON_NONE : REASON_ISSUER;
+    return network;
+}
+
+/**
+ * @brief Validates a credit card number given as a string of ASCII digits.
+ *
+ * @param bins The issuer ranges.
+ * @param digits The credit card number as ASCII digits, most significant first.
+ * @param count The number of digits.
+ * @return The network of the card, or CARD_INVALID if the number is not valid.
+ */
+card_network validate_card_digits(const bin_table *bins, const char *digits, int count)
+{
+    card_reason reason;
+
+    return validate_card_reason(bins, digits, count, &reason);
+}
@@ -0,0 +1,86 @@
+#include "creditcard.h"
+
+/**
+ * @file validate_card_line.c
+ * @brief Implementation of the functions to validate one line of a card number file.
+ */
+
+/**
+ * @brief Finds the card number in one line of input.
+ *
+ * Surrounding spaces and tabs, the newline and a trailing carriage return are
+ * trimmed.
+ *
+ * @param line The line, which need not be NUL-terminated.
+ * @param length The number of characters in the line.
+ * @param digits Set to the first character left after trimming.
+ * @return The number of characters left after trimming, or -1 if the line is longer
+ *         than CARD_LINE_MAX characters.
+ */
+int trim_card_line(const char *line, size_t length, const char **digits)
+{
+    const char *start = line;
+    const char *end = line + length;
+
+    if (length > CARD_LINE_MAX + 1)
+    {
+        return -1;
+    }
+
+    // Trim surrounding whitespace, including the newline.
+    while (start < end && (*start == ' ' || *start == '\t'))
+    {
+        start++;
+    }
+    while (end > start && (end[-1] == '\n' || end[-1] == '\r' || end[-1] == ' ' || end[-1] == '\t'))
+    {
+        end--;
+    }
+
+    *digits = start;
+    return (int) (end - start);
+}
+
+/**
+ * @brief Validates a credit card number read as one line of input, and says why it was rejected.
+ *
+ * The line is trimmed with trim_card_line(). Lines longer than CARD_LINE_MAX
+ * characters are rejected for their length.
+ *
+ * @param bins The issuer ranges.
+ * @param line The line, which need not be NUL-terminated.
+ * @param length The number of characters in the line.
+ * @param reason Set to REASON_NONE for a valid card, or to the reason it was rejected.
+ * @return The network of the card, or CARD_INVALID if the number is not valid.
+ */
+card_network validate_card_line_reason(const bin_table *bins, const char *line, size_t length, card_reason *reason)
+{
+    const char *digits;
+    int count = trim_card_line(line, length, &digits);
+
+    if (count < 0)
+    {
+        *reason = REASON_LENGTH;
+        return CARD_INVALID;
+    }
+
+    return validate_card_reason(bins, digits, count, reason);
+}
+
+/**
+ * @brief Validates a credit card number read as one line of input.
+ *
+ * Surrounding spaces and tabs, the newline and a trailing carriage return are
+ * ignored. Lines longer than CARD_LINE_MAX characters are not valid.
+ *
+ * @param bins The issuer ranges.
+ * @param line The line, which need not be NUL-terminated.
+ * @param length The number of characters in the line.
+ * @return The network of the card, or CARD_INVALID if the number is not valid.
+ */
+card_network validate_card_line(const bin_table *bins, const char *line, size_t length)
+{
+    card_reason reason;
+
+    return validate_card_line_reason(bins, line, length, &reason);
+}
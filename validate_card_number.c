@@ -0,0 +1,35 @@
+#include "creditcard.h"
+
+/**
+ * @file validate_card_number.c
+ * @brief Implementation of the function to validate a credit card number held as an integer.
+ */
+
+/**
+ * @brief Validates a credit card number given as an integer.
+ *
+ * This is a thin wrapper around validate_card_digits(): the number is written out
+ * as digits once, and validated from that buffer. Numbers with 19 digits above
+ * LLONG_MAX need the digit-string API.
+ *
+ * @param bins The issuer ranges.
+ * @param card The credit card number.
+ * @return The network of the card, or CARD_INVALID if the number is not valid.
+ */
+card_network validate_card_number(const bin_table *bins, long long card)
+{
+    char digits[CARD_MAX_LENGTH + 2];
+
+    if (card < 0)
+    {
+        return CARD_INVALID;
+    }
+
+    int count = snprintf(digits, sizeof(digits), "%lld", card);
+    if (count < 0 || count > CARD_MAX_LENGTH)
+    {
+        return CARD_INVALID;
+    }
+
+    return validate_card_digits(bins, digits, count);
+}
@@ -0,0 +1,39 @@
+#include "creditcard.h"
+
+#include <string.h>
+
+/**
+ * @file validate_card_records.c
+ * @brief Implementation of the function to validate an array of fixed-width card number records.
+ */
+
+/**
+ * @brief Validates an array of fixed-width card number records.
+ *
+ * Each record holds a card number of at most `width` characters, padded with NUL
+ * bytes or spaces, like a NumPy array of byte strings. This lets callers validate
+ * a whole column of numbers in one call.
+ *
+ * @param bins The issuer ranges.
+ * @param records The first record.
+ * @param width The size of each record in bytes.
+ * @param count The number of records.
+ * @param networks Set to the network of each record, or CARD_INVALID if it is not valid.
+ * @return The number of valid records.
+ */
+size_t validate_card_records(const bin_table *bins, const char *records, size_t width, size_t count,
+                             unsigned char *networks)
+{
+    size_t valid = 0;
+
+    for (size_t i = 0; i < count; i++, records += width)
+    {
+        const char *end = memchr(records, '\0', width);
+        size_t length = end != NULL ? (size_t) (end - records) : width;
+
+        networks[i] = (unsigned char) validate_card_line(bins, records, length);
+        valid += networks[i] != CARD_INVALID;
+    }
+
+    return valid;
+}
@@ -0,0 +1,435 @@
+#include "creditcard.h"
+
+#include <fcntl.h>
+#include <pthread.h>
+#include <stdlib.h>
+#include <string.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <time.h>
+#include <unistd.h>
+
+/**
+ * @file validate_parallel.c
+ * @brief Implementation of the functions to validate a file of card numbers on several threads.
+ */
+
+/**
+ * @brief Approximate number of input bytes in one shard.
+ */
+#define SHARD_SIZE (4 << 20)
+
+/**
+ * @brief Number of finished shards each worker may run ahead of the writer.
+ */
+#define SHARDS_AHEAD 4
+
+/**
+ * @brief The results of one shard, waiting to be written.
+ *
+ * `output` holds the result lines, or for a columnar file a network byte and a
+ * rejection reason byte per card.
+ */
+typedef struct
+{
+    char *output;
+    size_t length;
+    size_t capacity;
+    unsigned long long total;
+    unsigned long long valid;
+    unsigned long long reasons[REASON_COUNT];
+    unsigned long long networks[CARD_NETWORK_COUNT];
+    unsigned long long stage_ns[STAGE_COUNT];
+    int done;
+    int failed;
+} shard_result;
+
+/**
+ * @brief State shared by the writer and the worker threads.
+ *
+ * Workers claim shards in order, but never more than `window` shards past the
+ * last one written, so the buffered output stays bounded however large the file.
+ */
+typedef struct
+{
+    const bin_table *bins;
+    const char *data;
+    size_t size;
+    size_t shards;
+    size_t next;
+    size_t written;
+    size_t window;
+    int timing;
+    columnar_writer *columns;
+    shard_result *slots;
+    pthread_mutex_t lock;
+    pthread_cond_t changed;
+} parallel_job;
+
+/**
+ * @brief Moves a byte offset forward to the start of the next line.
+ */
+static size_t line_boundary(const parallel_job *job, size_t offset)
+{
+    if (offset == 0 || offset >= job->size)
+    {
+        return offset == 0 ? 0 : job->size;
+    }
+
+    const char *newline = memchr(job->data + offset - 1, '\n', job->size - offset + 1);
+    return newline != NULL ? (size_t) (newline - job->data) + 1 : job->size;
+}
+
+/**
+ * @brief Validates every line of a shard into its result buffer.
+ */
+static void validate_shard(const parallel_job *job, size_t shard, shard_result *result)
+{
+    const char *line = job->data + line_boundary(job, shard * SHARD_SIZE);
+    const char *end = job->data + line_boundary(job, (shard + 1) * SHARD_SIZE);
+
+    result->length = 0;
+    result->failed = 0;
+    result->total = 0;
+    result->valid = 0;
+    memset(result->reasons, 0, sizeof(result->reasons));
+    memset(result->networks, 0, sizeof(result->networks));
+    memset(result->stage_ns, 0, sizeof(result->stage_ns));
+
+    while (line < end)
+    {
+        const char *newline = memchr(line, '\n', (size_t) (end - line));
+        const char *next = newline != NULL ? newline + 1 : end;
+        card_reason reason;
+        card_network network;
+        unsigned long long output_start = 0;
+
+        if (job->timing)
+        {
+            network = validate_card_line_timed(job->bins, line, (size_t) (next - line), &reason, result->stage_ns);
+            output_start = clock_ns();
+        }
+        else
+        {
+            network = validate_card_line_reason(job->bins, line, (size_t) (next - line), &reason);
+        }
+
+        const char *name = card_network_name(network);
+        size_t name_length = job->columns != NULL ? 0 : strlen(name);
+
+        // Make room for "VALID <NETWORK>\n", or the network and reason bytes.
+        if (result->length + name_length + 8 > result->capacity)
+        {
+            size_t capacity = result->capacity ? result->capacity * 2 : SHARD_SIZE;
+            char *output = realloc(result->output, capacity);
+            if (output == NULL)
+            {
+                result->failed = 1;
+                return;
+            }
+            result->output = output;
+            result->capacity = capacity;
+        }
+
+        if (network != CARD_INVALID)
+        {
+            result->valid++;
+        }
+        if (job->columns != NULL)
+        {
+            result->output[result->length++] = (char) network;
+            result->output[result->length++] = (char) reason;
+        }
+        else
+        {
+            if (network != CARD_INVALID)
+            {
+                memcpy(result->output + result->length, "VALID ", 6);
+                result->length += 6;
+            }
+            memcpy(result->output + result->length, name, name_length);
+            result->length += name_length;
+            result->output[result->length++] = '\n';
+        }
+        result->total++;
+        result->reasons[reason]++;
+        result->networks[network]++;
+        if (output_start != 0)
+        {
+            result->stage_ns[STAGE_OUTPUT] += clock_ns() - output_start;
+        }
+
+        line = next;
+    }
+}
+
+/**
+ * @brief Worker thread: claims and validates shards until none are left.
+ */
+static void *validate_worker(void *argument)
+{
+    parallel_job *job = argument;
+
+    for (;;)
+    {
+        pthread_mutex_lock(&job->lock);
+        while (job->next < job->shards && job->next >= job->written + job->window)
+        {
+            pthread_cond_wait(&job->changed, &job->lock);
+        }
+        if (job->next >= job->shards)
+        {
+            pthread_mutex_unlock(&job->lock);
+            return NULL;
+        }
+        size_t shard = job->next++;
+        pthread_mutex_unlock(&job->lock);
+
+        shard_result *result = &job->slots[shard % job->window];
+        validate_shard(job, shard, result);
+
+        pthread_mutex_lock(&job->lock);
+        result->done = 1;
+        pthread_cond_broadcast(&job->changed);
+        pthread_mutex_unlock(&job->lock);
+    }
+}
+
+/**
+ * @brief Writes the results of a shard, as text or to the columnar writer.
+ *
+ * @return 0 on success, 1 if writing failed.
+ */
+static int write_shard(const parallel_job *job, const shard_result *result, FILE *out)
+{
+    if (job->columns == NULL)
+    {
+        return fwrite(result->output, 1, result->length, out) != result->length;
+    }
+
+    const unsigned char *record = (const unsigned char *) result->output;
+    for (size_t i = 0; i < result->length; i += 2)
+    {
+        if (columnar_writer_append(job->columns, (card_network) record[i], (card_reason) record[i + 1]) != 0)
+        {
+            return 1;
+        }
+    }
+    return 0;
+}
+
+/**
+ * @brief Validates every line of a memory-mapped file on a pool of threads.
+ *
+ * @param columns The columnar writer to append results to, or NULL to write text to `out`.
+ * @return 0 on success, 1 if the file could not be read or the results could not be written.
+ */
+static int validate_mapped(const bin_table *bins, const char *path, FILE *out, columnar_writer *columns, int threads,
+                           batch_stats *stats)
+{
+    parallel_job job;
+    struct timespec start, end;
+    struct stat info;
+    unsigned long long total = 0, valid = 0;
+    unsigned long long reasons[REASON_COUNT] = {0};
+    unsigned long long networks[CARD_NETWORK_COUNT] = {0};
+    unsigned long long stage_ns[STAGE_COUNT] = {0};
+    int failed = 0;
+
+    clock_gettime(CLOCK_MONOTONIC, &start);
+
+    int fd = open(path, O_RDONLY);
+    if (fd < 0)
+    {
+        return 1;
+    }
+    if (fstat(fd, &info) != 0)
+    {
+        close(fd);
+        return 1;
+    }
+    if (!S_ISREG(info.st_mode))
+    {
+        // A pipe, FIFO or device has no size to shard by: read it as a stream instead.
+        FILE *in = fdopen(fd, "r");
+        if (in == NULL)
+        {
+            close(fd);
+            return 1;
+        }
+        int result = columns != NULL ? validate_batch_columnar(bins, in, columns, stats)
+                                     : validate_batch(bins, in, out, stats);
+        fclose(in);
+        return result;
+    }
+
+    memset(&job, 0, sizeof(job));
+    job.bins = bins;
+    job.size = (size_t) info.st_size;
+    job.timing = stats != NULL && stats->timing;
+    job.columns = columns;
+
+    if (job.size > 0)
+    {
+        void *data = mmap(NULL, job.size, PROT_READ, MAP_PRIVATE, fd, 0);
+        if (data == MAP_FAILED)
+        {
+            close(fd);
+            return 1;
+        }
+        madvise(data, job.size, MADV_SEQUENTIAL);
+        job.data = data;
+    }
+    close(fd);
+
+    if (threads <= 0)
+    {
+        long cpus = sysconf(_SC_NPROCESSORS_ONLN);
+        threads = cpus > 0 ? (int) cpus : 1;
+    }
+
+    job.shards = (job.size + SHARD_SIZE - 1) / SHARD_SIZE;
+    if ((size_t) threads > job.shards)
+    {
+        threads = job.shards > 0 ? (int) job.shards : 1;
+    }
+    job.window = (size_t) threads * SHARDS_AHEAD;
+    job.slots = calloc(job.window, sizeof(shard_result));
+    pthread_t *workers = calloc((size_t) threads, sizeof(pthread_t));
+    if (job.slots == NULL || workers == NULL)
+    {
+        free(job.slots);
+        free(workers);
+        if (job.size > 0)
+        {
+            munmap((void *) job.data, job.size);
+        }
+        return 1;
+    }
+    pthread_mutex_init(&job.lock, NULL);
+    pthread_cond_init(&job.changed, NULL);
+
+    int started = 0;
+    while (started < threads && pthread_create(&workers[started], NULL, validate_worker, &job) == 0)
+    {
+        started++;
+    }
+    if (started == 0 && job.shards > 0)
+    {
+        // No worker could be started.
+        failed = 1;
+    }
+
+    // Write the shards in input order as they finish.
+    for (size_t shard = 0; shard < job.shards && started > 0; shard++)
+    {
+        shard_result *result = &job.slots[shard % job.window];
+
+        pthread_mutex_lock(&job.lock);
+        while (!result->done)
+        {
+            pthread_cond_wait(&job.changed, &job.lock);
+        }
+        pthread_mutex_unlock(&job.lock);
+
+        if (result->failed || write_shard(&job, result, out) != 0)
+        {
+            failed = 1;
+        }
+        total += result->total;
+        valid += result->valid;
+        for (int i = 0; i < REASON_COUNT; i++)
+        {
+            reasons[i] += result->reasons[i];
+        }
+        for (int i = 0; i < CARD_NETWORK_COUNT; i++)
+        {
+            networks[i] += result->networks[i];
+        }
+        for (int i = 0; i < STAGE_COUNT; i++)
+        {
+            stage_ns[i] += result->stage_ns[i];
+        }
+
+        pthread_mutex_lock(&job.lock);
+        result->done = 0;
+        job.written++;
+        pthread_cond_broadcast(&job.changed);
+        pthread_mutex_unlock(&job.lock);
+    }
+
+    for (int i = 0; i < started; i++)
+    {
+        pthread_join(workers[i], NULL);
+    }
+
+    for (size_t i = 0; i < job.window; i++)
+    {
+        free(job.slots[i].output);
+    }
+    free(job.slots);
+    free(workers);
+    pthread_mutex_destroy(&job.lock);
+    pthread_cond_destroy(&job.changed);
+    if (job.size > 0)
+    {
+        munmap((void *) job.data, job.size);
+    }
+
+    clock_gettime(CLOCK_MONOTONIC, &end);
+
+    if (stats != NULL)
+    {
+        stats->total = total;
+        stats->valid = valid;
+        memcpy(stats->reasons, reasons, sizeof(reasons));
+        memcpy(stats->networks, networks, sizeof(networks));
+        memcpy(stats->stage_ns, stage_ns, sizeof(stage_ns));
+        stats->seconds = (double) (end.tv_sec - start.tv_sec) + (double) (end.tv_nsec - start.tv_nsec) / 1e9;
+    }
+
+    return failed || (out != NULL && ferror(out)) ? 1 : 0;
+}
+
+/**
+ * @brief Validates every credit card number in a file using several threads.
+ *
+ * This function memory-maps the file and splits it into line-aligned shards, which
+ * a pool of worker threads validate in parallel. The results are written in input
+ * order, in the same format as validate_batch(). Each shard keeps its own counters
+ * per network, reason and stage, which are added up as its results are written.
+ * A path that is not a regular file, such as a pipe or /dev/stdin, cannot be
+ * memory-mapped and is read on one thread with validate_batch() instead.
+ *
+ * @param bins The issuer ranges.
+ * @param path The file to read card numbers from.
+ * @param out The stream to write results to.
+ * @param threads The number of worker threads, or 0 for one per online CPU.
+ * @param stats Filled with the number of cards read, valid cards, the counts per network and
+ *              reason, and the elapsed and per-stage time (if `stats->timing` is set); may be NULL.
+ * @return 0 on success, 1 if the file could not be read or the results could not be written.
+ */
+int validate_parallel(const bin_table *bins, const char *path, FILE *out, int threads, batch_stats *stats)
+{
+    return validate_mapped(bins, path, out, NULL, threads, stats);
+}
+
+/**
+ * @brief Validates every credit card number in a file using several threads, into a columnar results file.
+ *
+ * The file is validated as with validate_parallel(), but the results are appended
+ * to `columns` in input order, as a validity bit, a network byte and a rejection
+ * reason byte per card, instead of being written as text. The writer is left open.
+ *
+ * @param bins The issuer ranges.
+ * @param path The file to read card numbers from.
+ * @param columns The columnar writer to append results to.
+ * @param threads The number of worker threads, or 0 for one per online CPU.
+ * @param stats Filled as by validate_parallel(); may be NULL.
+ * @return 0 on success, 1 if the file could not be read or the results could not be written.
+ */
+int validate_parallel_columnar(const bin_table *bins, const char *path, columnar_writer *columns, int threads,
+                               batch_stats *stats)
+{
+    return validate_mapped(bins, path, NULL, columns, threads, stats);
+}
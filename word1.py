@@ -1,43 +1,301 @@
-def find_best_package_combination():
-    package_a_items = 15
-    package_a_cost = 10
-    package_b_items = 10
-    package_b_cost = 8
-    total_items = 100
-
-    min_cost = float('inf')
-    best_combinations = []
-
-    for num_a in range(total_items // package_a_items + 1):  # Max possible A packages
-        for num_b in range(total_items // package_b_items + 1):  # Max possible B packages
-            total_items_bought = num_a * package_a_items + num_b * package_b_items
-            if total_items_bought >= total_items:  # Only valid if it meets or exceeds the target
-                total_cost = num_a * package_a_cost + num_b * package_b_cost
-                unused_items = total_items_bought - total_items
-
-                # Check if this combination has a lower cost
-                if total_cost < min_cost:
-                    min_cost = total_cost
-                    best_combinations = [(num_a, num_b, unused_items)]
-                elif total_cost == min_cost:
-                    best_combinations.append((num_a, num_b, unused_items))
-
-    # If there are multiple combinations with the same cost, choose based on fewer unused items
-    best_combinations.sort(key=lambda x: x[2])  # Sort by unused items
-    best_choice = best_combinations[0]
+import argparse
+import csv
+import json
+import math
+import sys
+import time
+from array import array
+from functools import lru_cache
+from itertools import repeat
+from operator import add
+
+
+class PackageOptimizer:
+    """
+    Cheapest way to buy at least a target number of items from package types
+    that can each be bought any number of times (unbounded knapsack over quantity).
+    """
+
+    def __init__(self, packages):
+        """
+        Parameters:
+        - packages (sequence): (items, cost) pairs, one per package type.
+        """
+        self.packages = tuple((int(items), cost) for items, cost in packages)
+        if not self.packages:
+            raise ValueError("At least one package type is required.")
+        if any(items <= 0 or cost < 0 for items, cost in self.packages):
+            raise ValueError("Package sizes must be positive and costs non-negative.")
+        # A package never appears in an optimal purchase if another one holds at least
+        # as many items for strictly less, so the table is built from the rest only.
+        self.useful = [index for index, (items, cost) in enumerate(self.packages)
+                       if not any(other_items >= items and other_cost < cost
+                                  for other_items, other_cost in self.packages)]
+        self.smallest = min(self.packages[index][0] for index in self.useful)
+        self.largest = max(items for items, _ in self.packages)
+        # Past a bound, the cheapest-per-item package fills every extra stretch of its
+        # own size: an optimal purchase never holds `best_items` or more other packages,
+        # since some of them would add up to a multiple of `best_items` and could be
+        # swapped for best packages at no extra cost. Quantities beyond `limit` are
+        # therefore read from the table shifted down by whole best packages.
+        self.best = min(self.useful, key=lambda index: self.packages[index][1] / self.packages[index][0])
+        best_items = self.packages[self.best][0]
+        self.limit = best_items * self.largest + self.largest
+        # cost[q] is the cheapest price for exactly q items (inf if q cannot be made).
+        self.cost = array('d', [0.0])
+
+    def _extend(self, limit):
+        # Every package holds at least `smallest` items, so a block of that many
+        # quantities depends only on entries before the block and can be filled a
+        # whole package type at a time instead of one quantity at a time.
+        cost = self.cost
+        limit = min(limit, self.limit)
+        while len(cost) <= limit:
+            low = len(cost)
+            high = min(low + self.smallest, limit + 1)
+            best = [math.inf] * (high - low)
+            for index in self.useful:
+                items, price = self.packages[index]
+                start = max(low, items)
+                if start >= high:
+                    continue
+                candidates = map(add, cost[start - items:high - items], repeat(price))
+                best[start - low:] = map(min, best[start - low:], candidates)
+            cost.extend(best)
+
+    def _shift(self, quantity):
+        # Number of best packages to set aside so the rest of `quantity` fits in the table.
+        if quantity <= self.limit:
+            return 0
+        return -(-(quantity - self.limit) // self.packages[self.best][0])
+
+    def price(self, quantity):
+        """
+        Returns:
+        - float: The cheapest price for exactly `quantity` items, or inf if it cannot be made.
+        """
+        shift = self._shift(quantity)
+        items, cost = self.packages[self.best]
+        return self.cost[quantity - shift * items] + shift * cost
+
+    def counts(self, quantity):
+        """
+        Rebuild the package counts behind the table entry for an exact quantity.
+
+        Returns:
+        - tuple: How many of each package type to buy, in the order given.
+        """
+        cost = self.cost
+        counts = [0] * len(self.packages)
+        shift = self._shift(quantity)
+        counts[self.best] = shift
+        quantity -= shift * self.packages[self.best][0]
+        while quantity:
+            for index in self.useful:
+                items, price = self.packages[index]
+                if items <= quantity and cost[quantity - items] + price == cost[quantity]:
+                    counts[index] += 1
+                    quantity -= items
+                    break
+        return tuple(counts)
+
+    def options(self, target):
+        """
+        Every reachable purchase of at least `target` items that could be optimal.
+
+        With non-negative costs, buying `largest` or more unused items is never
+        cheaper than dropping a package, so only totals below target + largest
+        need to be considered.
+
+        Returns:
+        - list: (total_cost, unused_items, counts) tuples, cheapest first, then fewest unused items.
+        """
+        if target < 0:
+            raise ValueError("The target quantity cannot be negative.")
+        self._extend(target + self.largest - 1)
+        prices = [(self.price(quantity), quantity - target) for quantity in range(target, target + self.largest)]
+        reachable = [option for option in prices if option[0] != math.inf]
+        reachable.sort()
+        return [(total, unused, self.counts(target + unused)) for total, unused in reachable]
+
+    def solve(self, target):
+        """
+        Returns:
+        - tuple: (total_cost, unused_items, counts) for the cheapest purchase of at
+          least `target` items, preferring fewer unused items among equal costs,
+          or None if no combination reaches the target.
+        """
+        if target < 0:
+            raise ValueError("The target quantity cannot be negative.")
+        self._extend(target + self.largest - 1)
+        best = None
+        for quantity in range(target, target + self.largest):
+            price = self.price(quantity)
+            if best is None or price < best[0]:
+                best = (price, quantity)
+        if best[0] == math.inf:
+            return None
+        return best[0], best[1] - target, self.counts(best[1])
+
+
+@lru_cache(maxsize=32)
+def get_optimizer(packages):
+    # One memoized table per catalog; later queries reuse and extend it.
+    return PackageOptimizer(packages)
+
+
+def package_name(index):
+    return chr(ord('A') + index) if index < 26 else f"#{index + 1}"
+
+
+def find_best_package_combination(packages=((15, 10), (10, 8)), total_items=100):
+    optimizer = get_optimizer(tuple(packages))
+    options = optimizer.options(total_items)
+    if not options:
+        print("No combination of packages reaches the target.")
+        return None
 
     # Display the results
-    num_a, num_b, unused_items = best_choice
+    min_cost, unused_items, counts = options[0]
     print(f"Best combination:")
-    print(f"  Package A: {num_a} (15 items each)")
-    print(f"  Package B: {num_b} (10 items each)")
-    print(f"  Total Cost: ${min_cost}")
+    for index, count in enumerate(counts):
+        print(f"  Package {package_name(index)}: {count} ({optimizer.packages[index][0]} items each)")
+    print(f"  Total Cost: ${plain_number(min_cost)}")
     print(f"  Unused Items: {unused_items}")
 
-    if len(best_combinations) > 1:
+    ties = [option for option in options[1:] if option[0] == min_cost]
+    if ties:
         print("\nNote: Other combinations with the same cost but more unused items:")
-        for combination in best_combinations[1:]:
-            print(f"  Package A: {combination[0]}, Package B: {combination[1]}, Unused Items: {combination[2]}")
+        for _, unused, tie_counts in ties:
+            packages_text = ", ".join(f"Package {package_name(index)}: {count}" for index, count in enumerate(tie_counts))
+            print(f"  {packages_text}, Unused Items: {unused}")
+    return options[0]
+
+
+def parse_packages(text):
+    # "15:10,10:8" -> ((15, 10), (10, 8))
+    packages = []
+    for item in text.split(','):
+        items, _, cost = item.partition(':')
+        cost = float(cost)
+        packages.append((int(items), int(cost) if cost.is_integer() else cost))
+    return tuple(packages)
+
+
+def read_targets(file):
+    # One target quantity per line; blank lines and lines starting with '#' are skipped.
+    targets = []
+    for number, line in enumerate(file, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        try:
+            target = int(line)
+        except ValueError:
+            raise ValueError(f"line {number}: '{line}' is not a quantity")
+        if target < 0:
+            raise ValueError(f"line {number}: the quantity cannot be negative")
+        targets.append(target)
+    return targets
+
+
+def price_orders(packages, targets):
+    """
+    Price many orders against one catalog, building the DP table once for the largest order.
+
+    Returns:
+    - tuple: (results, timing), where results holds solve()'s answer for each target in
+      order, and timing has the seconds spent building the table and answering orders,
+      the table size, and how many entries pricing each order alone would have built.
+    """
+    optimizer = PackageOptimizer(packages)
+    started = time.perf_counter()
+    if targets:
+        optimizer._extend(max(targets) + optimizer.largest - 1)
+    built = time.perf_counter()
+    results = [optimizer.solve(target) for target in targets]
+    answered = time.perf_counter()
+    timing = {
+        "orders": len(targets),
+        "table_entries": len(optimizer.cost),
+        "unshared_entries": sum(min(target + optimizer.largest, optimizer.limit + 1) for target in targets),
+        "build_seconds": built - started,
+        "answer_seconds": answered - built,
+    }
+    return results, timing
+
+
+def plain_number(value):
+    # Prices are floats in the table; show whole amounts without a trailing ".0".
+    return int(value) if value.is_integer() else value
+
+
+def write_results(out, packages, targets, results, output_format):
+    names = [f"package_{package_name(index)}" for index in range(len(packages))]
+    if output_format == 'json':
+        orders = []
+        for target, result in zip(targets, results):
+            order = {"target": target, "total_cost": None, "unused_items": None, "counts": None}
+            if result is not None:
+                order.update(total_cost=plain_number(result[0]), unused_items=result[1], counts=dict(zip(names, result[2])))
+            orders.append(order)
+        json.dump(orders, out, indent=2)
+        out.write('\n')
+        return
+    writer = csv.writer(out)
+    writer.writerow(["target", "total_cost", "unused_items"] + names)
+    for target, result in zip(targets, results):
+        if result is None:
+            writer.writerow([target, "", ""] + [""] * len(names))
+        else:
+            writer.writerow([target, plain_number(result[0]), result[1]] + list(result[2]))
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Price a batch of orders against one package catalog.")
+    parser.add_argument("orders", help="file with one target quantity per line ('-' for stdin)")
+    parser.add_argument("--packages", default="15:10,10:8",
+                        help="comma-separated ITEMS:COST package types (default: 15:10,10:8)")
+    parser.add_argument("--format", choices=("csv", "json"), default="csv", help="output format (default: csv)")
+    parser.add_argument("-o", "--output", help="write the results to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    try:
+        packages = parse_packages(args.packages)
+    except ValueError:
+        parser.error(f"invalid --packages '{args.packages}': expected ITEMS:COST,ITEMS:COST,...")
+    try:
+        read_started = time.perf_counter()
+        if args.orders == '-':
+            targets = read_targets(sys.stdin)
+        else:
+            with open(args.orders) as file:
+                targets = read_targets(file)
+        read_seconds = time.perf_counter() - read_started
+        results, timing = price_orders(packages, targets)
+        write_started = time.perf_counter()
+        out = sys.stdout if args.output is None else open(args.output, 'w', newline='')
+        try:
+            write_results(out, packages, targets, results, args.format)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        write_seconds = time.perf_counter() - write_started
+    except (OSError, ValueError) as e:
+        print(f"An error occurred: {e}", file=sys.stderr)
+        return 1
+
+    orders = max(timing["orders"], 1)
+    print(f"Read {timing['orders']} orders in {read_seconds:.3f}s", file=sys.stderr)
+    print(f"Built one table of {timing['table_entries']} entries in {timing['build_seconds']:.3f}s "
+          f"(pricing each order alone would build {timing['unshared_entries']})", file=sys.stderr)
+    print(f"Answered orders in {timing['answer_seconds']:.3f}s "
+          f"({timing['answer_seconds'] / orders * 1e6:.1f} us per order)", file=sys.stderr)
+    print(f"Wrote results in {write_seconds:.3f}s", file=sys.stderr)
+    return 0
+
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(main(sys.argv[1:]))
     find_best_package_combination()
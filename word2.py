@@ -3,8 +3,10 @@ I have been enhancing the University Management System, but when I tried to assi
 
 ```python
 import sys
+import csv
 import json
 import os
+from contextlib import contextmanager
 
 class UniversitySystem:
     """
@@ -12,16 +14,22 @@ class UniversitySystem:
     with persistent data storage in a JSON file.
     """
 
-    def __init__(self, data_file="university_data.json"):
+    def __init__(self, data_file="university_data.json", compact=False):
         """
         Initialize the UniversitySystem.
 
         Parameters:
         - data_file (str): The path to the JSON file used for persistent data storage.
+        - compact (bool): Write the data file without indentation, which is smaller and faster for large systems.
         """
         self.data_file = data_file  # File to store persistent data
+        self.compact = compact     # Write compact JSON instead of indent=4
         self.students = {}         # Dictionary to store student data
         self.courses = {}          # Dictionary to store course data
+        self.course_students = {}  # Reverse index: course ID -> {student ID: None}, in enrollment order
+        self.course_grades = {}    # Per-course numeric grade aggregates: course ID -> {"count", "total"}
+        self.batch_depth = 0       # Number of open batch() blocks; saves are deferred while positive
+        self.unsaved = False       # True when a deferred save is pending
         self.load_data()           # Load data from file upon initialization
 
     def load_data(self):
@@ -35,6 +43,7 @@ class UniversitySystem:
                     data = json.load(file)
                     self.students = data.get("students", {})
                     self.courses = data.get("courses", {})
+                    self.rebuild_indexes()
                     print("Data loaded successfully.")
             else:
                 print("Data file not found. Starting with an empty system.")
@@ -43,22 +52,101 @@ class UniversitySystem:
         except Exception as e:
             print(f"An unexpected error occurred while loading data: {e}")
 
+    def rebuild_indexes(self):
+        """
+        Rebuild the course-to-students index and the per-course grade aggregates
+        from the student records, in one pass over all enrollments.
+        """
+        self.course_students = {course_id: {} for course_id in self.courses}
+        self.course_grades = {course_id: {"count": 0, "total": 0.0} for course_id in self.courses}
+        for student_id, student in self.students.items():
+            for course_id, course_info in student['courses'].items():
+                self.course_students.setdefault(course_id, {})[student_id] = None
+                self.update_grade_aggregate(course_id, None, course_info.get('grade'))
+
+    @staticmethod
+    def grade_value(grade):
+        """
+        Convert a stored grade to a number for the aggregates.
+
+        Parameters:
+        - grade: The grade as stored; may be None or a string entered at the prompt.
+
+        Returns:
+        - float: The numeric grade, or None if the grade is missing or not a number.
+        """
+        if grade is None:
+            return None
+        try:
+            return float(grade)
+        except (TypeError, ValueError):
+            return None
+
+    def update_grade_aggregate(self, course_id, old_grade, new_grade):
+        """
+        Replace one grade in a course's running count and total.
+
+        Parameters:
+        - course_id (str): The course the grade belongs to.
+        - old_grade: The grade being replaced, or None.
+        - new_grade: The new grade, or None.
+        """
+        aggregate = self.course_grades.setdefault(course_id, {"count": 0, "total": 0.0})
+        old_value = self.grade_value(old_grade)
+        new_value = self.grade_value(new_grade)
+        if old_value is not None:
+            aggregate["count"] -= 1
+            aggregate["total"] -= old_value
+        if new_value is not None:
+            aggregate["count"] += 1
+            aggregate["total"] += new_value
+
     def save_data(self):
         """
         Save student and course data to a JSON file.
+        Inside a batch() block the save is deferred until the outermost block ends.
+        The data is written to a temporary file that then replaces the data file, so an
+        interrupted save never leaves a truncated file behind.
         Handles unexpected errors during the save process.
         """
+        if self.batch_depth:
+            self.unsaved = True
+            return
+        temporary_file = self.data_file + ".tmp"
         try:
-            with open(self.data_file, "w") as file:
+            with open(temporary_file, "w") as file:
                 data = {
                     "students": self.students,
                     "courses": self.courses,
                 }
-                json.dump(data, file, indent=4)
-                print("Data saved successfully.")
+                if self.compact:
+                    json.dump(data, file, separators=(",", ":"))
+                else:
+                    json.dump(data, file, indent=4)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temporary_file, self.data_file)
+            self.unsaved = False
+            print("Data saved successfully.")
         except Exception as e:
             print(f"An error occurred while saving data: {e}")
 
+    @contextmanager
+    def batch(self):
+        """
+        Group several changes into a single save.
+
+        Every save_data() call made inside the block is collected, and the data file is
+        written once when the outermost block ends, even if the block raises.
+        """
+        self.batch_depth += 1
+        try:
+            yield self
+        finally:
+            self.batch_depth -= 1
+            if not self.batch_depth and self.unsaved:
+                self.save_data()
+
     def validate_student_id(self, student_id):
         """
         Validate the student ID to ensure it is non-empty and unique.
@@ -138,6 +226,8 @@ class UniversitySystem:
 
         # Add the course to the system
         self.courses[course_id] = {"name": course_name.strip()}
+        self.course_students[course_id] = {}
+        self.course_grades[course_id] = {"count": 0, "total": 0.0}
         print(f"Course '{course_name}' added successfully with ID: {course_id}")
         self.save_data()  # Save changes to the data file
 
@@ -179,6 +269,7 @@ class UniversitySystem:
                 print(f"Student '{student_id}' is already enrolled in the course '{course_id}'.")
             else:
                 student['courses'][course_id] = {"name": course['name'], "grade": None}
+                self.course_students.setdefault(course_id, {})[student_id] = None
                 print(f"Student '{student_id}' has been enrolled in course '{course_id}'.")
                 self.save_data()
         else:
@@ -187,12 +278,210 @@ class UniversitySystem:
     def assign_grade(self, student_id, course_id, grade):
         student = self.students.get(student_id)
         if student and course_id in student['courses']:
+            self.update_grade_aggregate(course_id, student['courses'][course_id]['grade'], grade)
             student['courses'][course_id]['grade'] = grade
             print(f"Grade '{grade}' assigned to student '{student_id}' for course '{course_id}'.")
             self.save_data()
         else:
             print(f"Error: Could not assign grade. Student '{student_id}' or course '{course_id}' not found.")
 
+    def bulk_enroll(self, enrollments):
+        """
+        Enroll many students at once and save the data file a single time.
+
+        Parameters:
+        - enrollments (iterable): (student_id, course_id) pairs.
+
+        Returns:
+        - int: The number of new enrollments; unknown IDs and existing enrollments are skipped.
+        """
+        enrolled = 0
+        skipped = 0
+        with self.batch():
+            for student_id, course_id in enrollments:
+                student = self.students.get(student_id)
+                course = self.courses.get(course_id)
+                if not student or not course or course_id in student['courses']:
+                    skipped += 1
+                    continue
+                student['courses'][course_id] = {"name": course['name'], "grade": None}
+                self.course_students.setdefault(course_id, {})[student_id] = None
+                enrolled += 1
+            if enrolled:
+                self.save_data()
+        print(f"Enrolled {enrolled} student(s); skipped {skipped} record(s).")
+        return enrolled
+
+    def bulk_assign_grades(self, grades):
+        """
+        Assign many grades at once and save the data file a single time.
+
+        Parameters:
+        - grades (iterable): (student_id, course_id, grade) tuples.
+
+        Returns:
+        - int: The number of grades assigned; records for missing enrollments are skipped.
+        """
+        assigned = 0
+        skipped = 0
+        with self.batch():
+            for student_id, course_id, grade in grades:
+                student = self.students.get(student_id)
+                if not student or course_id not in student['courses']:
+                    skipped += 1
+                    continue
+                self.update_grade_aggregate(course_id, student['courses'][course_id]['grade'], grade)
+                student['courses'][course_id]['grade'] = grade
+                assigned += 1
+            if assigned:
+                self.save_data()
+        print(f"Assigned {assigned} grade(s); skipped {skipped} record(s).")
+        return assigned
+
+    def students_in_course(self, course_id):
+        """
+        List the students enrolled in a course, using the reverse index.
+
+        Parameters:
+        - course_id (str): The ID of the course.
+
+        Returns:
+        - list: The IDs of the enrolled students, in enrollment order.
+        """
+        return list(self.course_students.get(course_id, ()))
+
+    def course_grade_report(self, course_id):
+        """
+        Summarize a course from its maintained aggregates, without scanning students.
+
+        Parameters:
+        - course_id (str): The ID of the course.
+
+        Returns:
+        - dict: "enrolled" and "graded" counts and the "average" numeric grade (None if nothing is graded).
+        """
+        aggregate = self.course_grades.get(course_id, {"count": 0, "total": 0.0})
+        return {
+            "enrolled": len(self.course_students.get(course_id, ())),
+            "graded": aggregate["count"],
+            "average": aggregate["total"] / aggregate["count"] if aggregate["count"] else None,
+        }
+
+    CSV_COLUMNS = {
+        "students": ("student_id", "name"),
+        "courses": ("course_id", "name"),
+        "enrollments": ("student_id", "course_id"),
+        "grades": ("student_id", "course_id", "grade"),
+    }
+
+    def import_csv(self, kind, path):
+        """
+        Import records from a CSV file, streaming it row by row, and save once at the end.
+
+        Parameters:
+        - kind (str): One of "students", "courses", "enrollments" or "grades".
+        - path (str): A CSV file with a header row naming the columns in CSV_COLUMNS[kind].
+
+        Returns:
+        - int: The number of records imported; duplicates, rows with unknown IDs and rows
+          with fewer fields than the header are skipped, and an unreadable file imports nothing.
+        """
+        columns = self.CSV_COLUMNS[kind]
+        try:
+            file = open(path, newline="")
+        except OSError as e:
+            print(f"Error: could not open '{path}': {e}")
+            return 0
+        incomplete = 0
+
+        def complete_rows(reader):
+            # DictReader fills the fields missing from a short row with None
+            nonlocal incomplete
+            for row in reader:
+                values = [row.get(column) for column in columns]
+                if any(value is None for value in values):
+                    incomplete += 1
+                    continue
+                yield [value.strip() for value in values]
+
+        with file:
+            reader = csv.DictReader(file)
+            missing = [column for column in columns if column not in (reader.fieldnames or ())]
+            if missing:
+                print(f"Error: '{path}' is missing column(s): {', '.join(missing)}")
+                return 0
+            rows = complete_rows(reader)
+            if kind == "enrollments":
+                imported = self.bulk_enroll(rows)
+            elif kind == "grades":
+                imported = self.bulk_assign_grades(rows)
+            else:
+                imported = self.import_records(kind, rows)
+        if incomplete:
+            print(f"Skipped {incomplete} incomplete row(s) in '{path}'.")
+        return imported
+
+    def import_records(self, kind, rows):
+        """
+        Add students or courses from (ID, name) rows, skipping duplicates and blank values.
+
+        Parameters:
+        - kind (str): "students" or "courses".
+        - rows (iterable): [record_id, name] pairs.
+
+        Returns:
+        - int: The number of records added.
+        """
+        imported = 0
+        with self.batch():
+            for record_id, name in rows:
+                if not record_id or not name:
+                    continue
+                if kind == "students" and record_id not in self.students:
+                    self.students[record_id] = {"name": name, "courses": {}}
+                elif kind == "courses" and record_id not in self.courses:
+                    self.courses[record_id] = {"name": name}
+                    self.course_students[record_id] = {}
+                    self.course_grades[record_id] = {"count": 0, "total": 0.0}
+                else:
+                    continue
+                imported += 1
+            if imported:
+                self.save_data()
+        print(f"Imported {imported} {kind}.")
+        return imported
+
+    def export_csv(self, kind, path):
+        """
+        Write records to a CSV file with a header row, one row at a time.
+
+        Parameters:
+        - kind (str): One of "students", "courses", "enrollments" or "grades".
+        - path (str): The CSV file to write.
+
+        Returns:
+        - int: The number of rows written.
+        """
+        if kind == "students":
+            rows = ((student_id, student['name']) for student_id, student in self.students.items())
+        elif kind == "courses":
+            rows = ((course_id, course['name']) for course_id, course in self.courses.items())
+        elif kind == "enrollments":
+            rows = ((student_id, course_id)
+                    for course_id, students in self.course_students.items() for student_id in students)
+        else:
+            rows = ((student_id, course_id, self.students[student_id]['courses'][course_id].get('grade'))
+                    for course_id, students in self.course_students.items() for student_id in students)
+        written = 0
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(self.CSV_COLUMNS[kind])
+            for row in rows:
+                if kind != "grades" or row[2] is not None:
+                    writer.writerow(row)
+                    written += 1
+        return written
+
 
     def main_menu(self):
         """